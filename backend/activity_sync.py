@@ -0,0 +1,88 @@
+"""Çevrimdışı çalışan istemciler için aktivite eşitleme.
+
+İstemci her aktiviteye kendi kimliğini (client_id) verir. Gönderimde her
+kimlik `activity_sync` tablosunun (user_id, client_id) benzersiz
+indeksine INSERT OR IGNORE ile yazılır: satırı ekleyen istek aktiviteyi
+kaydeder, yeniden gönderilen (ya da aynı anda iki kez gönderilen) kimlik
+yok sayılır ve ilk kaydın aktivite kimliği döner. Bir grup tek
+transaction içinde işlenir.
+
+Aktiviteler yalnızca eklendiği için aktivite kimliği eşitleme filigranı
+(watermark) olarak kullanılır: istemci son filigranından sonraki
+değişiklikleri ister.
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .database import ActivitySync, UserActivity
+
+MAX_BATCH = 500  # Tek gönderimde en fazla aktivite
+MAX_CLIENT_ID_LENGTH = 64
+MAX_CHANGES = 1000  # Tek değişiklik sayfasında en fazla aktivite
+
+
+def valid_client_id(client_id):
+    return 0 < len(client_id) <= MAX_CLIENT_ID_LENGTH
+
+
+def claim(connection, user_id, client_id, now):
+    """Kimliği bu istek için ayırır; kimlik daha önce görüldüyse False"""
+    return connection.execute(
+        sqlite_insert(ActivitySync.__table__).values(
+            user_id=user_id, client_id=client_id, synced_at=now
+        ).on_conflict_do_nothing(index_elements=["user_id", "client_id"])
+    ).rowcount == 1
+
+
+def link(connection, user_id, client_id, activity_id):
+    table = ActivitySync.__table__
+    connection.execute(
+        table.update().where(table.c.user_id == user_id, table.c.client_id == client_id).values(activity_id=activity_id)
+    )
+
+
+def existing_activity_ids(connection, user_id, client_ids):
+    """Daha önce eşitlenmiş kimlikler için client_id -> aktivite kimliği"""
+    table = ActivitySync.__table__
+    return dict(connection.execute(
+        select(table.c.client_id, table.c.activity_id).where(
+            table.c.user_id == user_id, table.c.client_id.in_(client_ids)
+        )
+    ).all())
+
+
+def parse_day(value, today=None):
+    """İstemcinin aktivite tarihi (YYYY-MM-DD); boşsa ya da gelecekteyse bugün, geçersizse ValueError"""
+    today = today or datetime.now().date()
+    if not value:
+        return today.strftime("%Y-%m-%d")
+    day = datetime.strptime(value, "%Y-%m-%d").date()
+    return min(day, today).strftime("%Y-%m-%d")
+
+
+def watermark(db, user_id):
+    """Kullanıcının en son aktivitesinin kimliği (hiç yoksa 0)"""
+    return db.query(UserActivity.id).filter(UserActivity.user_id == user_id).order_by(
+        UserActivity.id.desc()
+    ).limit(1).scalar() or 0
+
+
+def changes(db, user_id, since, limit=MAX_CHANGES):
+    """Filigrandan sonraki aktiviteler (kimlik sırasıyla) ve sonraki sayfa olup olmadığı.
+
+    İstemci kendi kuyruğunu eşleştirebilsin diye eşitlemeyle gelen
+    aktivitelerde client_id de döner (diğerlerinde None).
+    """
+    rows = db.query(
+        UserActivity.id,
+        ActivitySync.client_id,
+        UserActivity.activity_type,
+        UserActivity.duration,
+        UserActivity.notes,
+        UserActivity.completed_at
+    ).outerjoin(ActivitySync, ActivitySync.activity_id == UserActivity.id).filter(
+        UserActivity.user_id == user_id, UserActivity.id > since
+    ).order_by(UserActivity.id).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
@@ -1,21 +1,30 @@
+import os
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from typing import Optional
 from .database import User
+from .metrics import timed
 
 # JWT için sabitler
 SECRET_KEY = "yoursecretkey"  # Gerçek uygulamada güvenli bir şekilde saklanmalı
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Yönetici işlemlerine (tüm kullanıcıların dışa aktarımı vb.) yetkili kullanıcı adları, virgülle ayrılmış
+ADMIN_USERS = frozenset(name.strip() for name in os.getenv("ADMIN_USERS", "").split(",") if name.strip())
+# Sınıf oluşturup öğrenci ekleyebilen (ve öğrencilerinin analizini görebilen) kullanıcı adları, virgülle ayrılmış
+TEACHER_USERS = frozenset(name.strip() for name in os.getenv("TEACHER_USERS", "").split(",") if name.strip())
+
 # Şifre hashing işlemleri için
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@timed("bcrypt")
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+@timed("bcrypt")
 def get_password_hash(password):
     return pwd_context.hash(password)
 
@@ -35,4 +44,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt 
\ No newline at end of file
+    return encoded_jwt 
+
+def is_admin(username: str) -> bool:
+    return username in ADMIN_USERS
+
+def is_teacher(username: str) -> bool:
+    return username in TEACHER_USERS or is_admin(username)
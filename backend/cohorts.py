@@ -0,0 +1,248 @@
+"""Sınıf (kohort) analizleri.
+
+Öğretmen ekranı her öğrenci için ayrı özet sorgusu çalıştırmak yerine
+`user_period_totals` tablosundaki hazır toplamları sınıf üyeleriyle tek
+sorguda okur. Toplamlar iki yoldan güncellenir:
+
+- yeni aktivite kaydedilirken aynı transaction içinde üç periyodun
+  toplamına eklenir (record_activity),
+- gece çalışan toplu iş periyot dışına çıkan günleri düşmek için
+  toplamları aktivite tablosundan yeniden hesaplar (rollup).
+
+Dağılımlar (yüzdelikler, hedef oranları) öğrenci x aktivite türü matrisi
+üzerinde NumPy ile tek seferde hesaplanır. Sonuçlar sınıfın veri sürümüyle
+(class:<id>) önbelleğe alınır; üyelerin aktivitesi, profili ya da üyelik
+değiştiğinde sürüm artar.
+
+Çalıştırma: python -m backend.cohorts
+"""
+import argparse
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from . import metrics
+from .database import engine, init_db, bump_versions, class_scope, get_versions, Classroom, UserPeriodTotal
+from .recommendations import ACTIVITY_TYPES, PERIOD_DAYS, INACTIVE_DAYS, BATCH_SIZE, period_start, load_aggregates
+
+PERCENTILES = (25, 50, 75, 90)
+INACTIVE_LIST_LIMIT = 100  # Yanıtta listelenen en fazla pasif öğrenci (en uzun süredir pasif olanlar)
+CACHE_SIZE = 256  # (sınıf, periyot, gün) başına hesaplanmış analiz
+
+_cache = OrderedDict()  # (sınıf, periyot, gün) -> (sınıf veri sürümü, analiz)
+_cache_lock = threading.Lock()
+
+
+def record_activity(connection, user_id, activity_type, minutes, day):
+    """Yeni aktiviteyi tarihini kapsayan periyotların toplamına ekler (çağıranın transaction'ı içinde)"""
+    activity_type = activity_type.lower()
+    if activity_type not in ACTIVITY_TYPES:
+        return
+    today = datetime.now().date()
+    # Çevrimdışı eşitlenen aktiviteler geçmiş tarihli olabilir
+    periods = [period for period in PERIOD_DAYS if day >= period_start(period, today)[0]]
+    if not periods:
+        return
+    table = UserPeriodTotal.__table__
+    stmt = sqlite_insert(table).values([
+        {"user_id": user_id, "period": period, "activity_type": activity_type,
+         "minutes": minutes, "last_date": day, "computed_at": today.strftime("%Y-%m-%d")}
+        for period in periods
+    ])
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "period", "activity_type"],
+        set_={
+            "minutes": table.c.minutes + stmt.excluded.minutes,
+            "last_date": func.max(table.c.last_date, stmt.excluded.last_date),
+        }
+    ))
+
+
+def rollup(periods=tuple(PERIOD_DAYS), today=None):
+    """Periyot toplamlarını aktivite tablosundan yeniden hesaplar; periyot başına satır sayısı"""
+    init_db()
+    today = today or datetime.now().date()
+    end_date = today.strftime("%Y-%m-%d")
+    table = UserPeriodTotal.__table__
+    counts = {}
+
+    for period in periods:
+        start_date, _ = period_start(period, today)
+        # Okuma ve yazma tek transaction'da: arada kaydedilen aktiviteler kaybolmaz
+        with engine.begin() as conn:
+            aggregates = load_aggregates(conn, start_date, end_date)
+            aggregates["activity_type"] = aggregates["activity_type"].fillna("").str.lower()
+            aggregates = aggregates[aggregates["activity_type"].isin(ACTIVITY_TYPES)]
+            totals = aggregates.groupby(["user_id", "activity_type"], as_index=False).agg(
+                minutes=("minutes", "sum"), last_date=("last_date", "max")
+            )
+            rows = [
+                {"user_id": int(user_id), "period": period, "activity_type": activity_type,
+                 "minutes": int(minutes), "last_date": last_date, "computed_at": end_date}
+                for user_id, activity_type, minutes, last_date in totals.itertuples(index=False)
+            ]
+            conn.execute(table.delete().where(table.c.period == period))
+            for offset in range(0, len(rows), BATCH_SIZE):
+                conn.execute(table.insert(), rows[offset:offset + BATCH_SIZE])
+            # Önbellekteki sınıf analizleri geçersiz
+            class_ids = conn.execute(select(Classroom.__table__.c.id)).scalars().all()
+            bump_versions(conn, [class_scope(class_id) for class_id in class_ids])
+        counts[period] = len(rows)
+
+    return counts
+
+
+def load_cohort(conn, class_id, period):
+    """Sınıf üyelerini profilleri ve aktivite türü başına periyot toplamlarıyla yükler.
+
+    Toplamlar SQLite içinde öğrenci başına tek satıra çevrilir (minutes_0,
+    minutes_1, ... ACTIVITY_TYPES sırasıyla); böylece Python'a öğrenci
+    sayısı kadar satır gelir.
+    """
+    columns = ", ".join(
+        f"COALESCE(SUM(CASE WHEN t.activity_type = :type_{i} THEN t.minutes END), 0) AS minutes_{i}"
+        for i in range(len(ACTIVITY_TYPES))
+    )
+    return pd.read_sql(
+        text(
+            f"SELECT m.user_id, u.username, p.learning_purpose, p.daily_minutes, {columns}, "
+            "MAX(t.last_date) AS last_date, MIN(t.computed_at) AS computed_at "
+            "FROM class_members m "
+            "JOIN users u ON u.id = m.user_id "
+            "LEFT JOIN user_profiles p ON p.user_id = m.user_id "
+            "LEFT JOIN user_period_totals t ON t.user_id = m.user_id AND t.period = :period "
+            "WHERE m.class_id = :class_id "
+            "GROUP BY m.user_id "
+            "ORDER BY m.user_id"
+        ),
+        conn,
+        params={
+            "class_id": class_id,
+            "period": period,
+            **{f"type_{i}": activity_type for i, activity_type in enumerate(ACTIVITY_TYPES)},
+        },
+    )
+
+
+def _distribution(values, decimals=1):
+    """Sütun bazında ortalama ve yüzdelikler (values: öğrenci x sütun)"""
+    if not len(values):
+        empty = {"mean": 0.0}
+        empty.update({f"p{q}": 0.0 for q in PERCENTILES})
+        return [dict(empty) for _ in range(values.shape[1])]
+    means = values.mean(axis=0)
+    percentiles = np.percentile(values, PERCENTILES, axis=0)
+    result = []
+    for j in range(values.shape[1]):
+        column = {"mean": round(float(means[j]), decimals)}
+        column.update({f"p{q}": round(float(percentiles[i, j]), decimals) for i, q in enumerate(PERCENTILES)})
+        result.append(column)
+    return result
+
+
+def analyze_cohort(cohort, days, today):
+    """Sınıfın süre dağılımlarını, hedef başarısını ve pasif öğrencilerini hesaplar"""
+    n_students = len(cohort)
+    type_index = {activity_type: i for i, activity_type in enumerate(ACTIVITY_TYPES)}
+
+    # Öğrenci x aktivite türü süre matrisi
+    minutes = cohort[[f"minutes_{i}" for i in range(len(ACTIVITY_TYPES))]].to_numpy(dtype=np.float64)
+    last_active = pd.to_datetime(cohort["last_date"], errors="coerce").to_numpy().astype("datetime64[D]")
+
+    # Süre dağılımları: aktivite türleri ve toplam tek matriste
+    total = minutes.sum(axis=1)
+    columns = np.column_stack([minutes, total])
+    by_type = {}
+    for name, column_sum, distribution in zip(ACTIVITY_TYPES + ["total"], columns.sum(axis=0), _distribution(columns)):
+        by_type[name] = {"sum": int(column_sum), **distribution}
+
+    # Hedef başarısı: hedef aktivitenin günlük ortalaması / hedeflenen günlük dakika
+    target_idx = cohort["learning_purpose"].fillna("").str.lower().map(type_index).fillna(-1).to_numpy(dtype=np.int64)
+    target_minutes = cohort["daily_minutes"].fillna(0).to_numpy(dtype=np.float64)
+    has_goal = (target_idx >= 0) & (target_minutes > 0)
+    target_daily = minutes[np.arange(n_students), np.where(has_goal, target_idx, 0)] / days
+    ratio = target_daily[has_goal] / target_minutes[has_goal]
+    goal = {
+        "students_with_goal": int(has_goal.sum()),
+        "attained": int((ratio >= 1).sum()),
+        "attainment_rate": round(float((ratio >= 1).mean()), 3) if len(ratio) else 0.0,
+        "ratio": _distribution(ratio[:, None], decimals=2)[0] if len(ratio) else None,
+    }
+
+    # Pasif öğrenciler: periyotta hiç aktivitesi olmayanlar ya da son aktiviteden bu yana INACTIVE_DAYS geçenler
+    days_since_last = (np.datetime64(today, "D") - last_active).astype(np.int64)
+    never = np.isnat(last_active)
+    inactive = never | (days_since_last >= INACTIVE_DAYS)
+    # Önce hiç aktivitesi olmayanlar, sonra en uzun süredir pasif olanlar
+    order = np.lexsort((-days_since_last, ~never))
+    order = order[inactive[order]][:INACTIVE_LIST_LIMIT]
+    user_ids = cohort["user_id"].to_numpy()
+    usernames = cohort["username"].to_numpy()
+    inactive_students = [
+        {
+            "user_id": int(user_ids[i]),
+            "username": usernames[i],
+            "days_since_last": None if never[i] else int(days_since_last[i]),
+        }
+        for i in order
+    ]
+
+    computed_at = cohort["computed_at"].dropna()
+    return {
+        "students": n_students,
+        "minutes": by_type,
+        "goal": goal,
+        "inactive": {"count": int(inactive.sum()), "students": inactive_students},
+        # En eski toplu hesaplama tarihi (o günden eski günler periyotta sayılmış olabilir)
+        "computed_at": computed_at.min() if len(computed_at) else None,
+    }
+
+
+def cohort_analytics(conn, class_id, period, today=None):
+    """Sınıfın periyot analizini döndürür.
+
+    Sonuç sınıfın veri sürümüyle önbelleğe alınır; üyelerin aktivitesi,
+    profili ya da üyelik değişmedikçe tekrar hesaplanmaz.
+    """
+    today = today or datetime.now().date()
+    start_date, days = period_start(period, today)
+    end_date = today.strftime("%Y-%m-%d")
+    scope = class_scope(class_id)
+    version = get_versions(conn, [scope])[scope]
+    key = (class_id, period, end_date)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == version:
+            _cache.move_to_end(key)
+            metrics.record_cache("cohort", True)
+            return entry[1]
+    metrics.record_cache("cohort", False)
+
+    result = analyze_cohort(load_cohort(conn, class_id, period), days, today)
+    result.update({"class_id": class_id, "period": period, "start_date": start_date, "end_date": end_date})
+
+    with _cache_lock:
+        _cache[key] = (version, result)
+        _cache.move_to_end(key)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sınıf analizleri için periyot toplamlarını yeniden hesaplar")
+    parser.add_argument("--period", default="all", choices=["all"] + list(PERIOD_DAYS))
+    args = parser.parse_args()
+
+    periods = tuple(PERIOD_DAYS) if args.period == "all" else (args.period,)
+    started = time.perf_counter()
+    for period, count in rollup(periods).items():
+        print(f"{period}: {count} toplam satırı")
+    print(f"Süre: {time.perf_counter() - started:.1f} sn")
@@ -0,0 +1,146 @@
+"""Yerel okuma derlemi: alım ve seviyeye göre metin seçimi.
+
+Alım sırasında metinler gruplar halinde readability.score_texts ile tek
+geçişte puanlanır ve zorluk puanıyla birlikte `corpus_texts` tablosuna
+yazılır. Okuma uç noktası seviyenin zorluk aralığından (language,
+difficulty) indeksi üzerinde tek bir aralık sorgusuyla metin seçer.
+
+Girdi biçimleri:
+- .jsonl: her satırda {"title", "text", "url"?, "source"?}
+- .txt: dosya başına bir metin; başlık dosya adından alınır
+Dizinler verilirse içlerindeki .jsonl ve .txt dosyaları okunur.
+
+Çalıştırma: python -m backend.corpus derlem/ --language es --source "Yerel derlem"
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from . import language_packs
+from .database import engine, init_db, CorpusText
+from .readability import LEVEL_RANGES, score_texts
+from .srs import DATETIME_FORMAT
+
+BATCH_SIZE = 500
+MIN_TEXT_CHARS = 200
+MAX_TEXT_CHARS = 8000
+
+
+def read_documents(paths, default_source):
+    """Dosya ve dizinlerden (başlık, metin, adres, kaynak) sözlükleri üretir"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files = [os.path.join(root, name) for name in sorted(names) if name.endswith((".jsonl", ".txt"))]
+                yield from read_documents(files, default_source)
+        elif path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        document = json.loads(line)
+                        yield {
+                            "title": document["title"],
+                            "text": document["text"],
+                            "url": document.get("url"),
+                            "source": document.get("source", default_source),
+                        }
+        elif path.endswith(".txt"):
+            with open(path, encoding="utf-8") as f:
+                title = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+                yield {"title": title, "text": f.read(), "url": None, "source": default_source}
+
+
+def _insert_batch(connection, documents, language, now):
+    texts = [document["text"] for document in documents]
+    index = language_packs.get_pack(language).word_rank
+    rows = []
+    for document, scores in zip(documents, score_texts(texts, index)):
+        rows.append({
+            "content_hash": hashlib.sha256(document["text"].encode("utf-8")).hexdigest(),
+            "language": language,
+            "title": document["title"][:200],
+            "source": document["source"],
+            "url": document["url"],
+            "text": document["text"],
+            "difficulty": scores.difficulty,
+            "level": scores.level,
+            "fernandez_huerta": scores.fernandez_huerta,
+            "szigriszt_pazos": scores.szigriszt_pazos,
+            "rare_word_share": scores.rare_word_share,
+            "word_count": scores.words,
+            "created_at": now,
+        })
+    # SQLite değişken sınırı nedeniyle satırlar tek tek değil executemany ile eklenir
+    result = connection.execute(
+        sqlite_insert(CorpusText).on_conflict_do_nothing(index_elements=["content_hash"]),
+        rows
+    )
+    return result.rowcount
+
+
+def ingest(paths, language="es", source="Yerel derlem"):
+    """Belgeleri puanlayıp derleme ekler; (okunan, eklenen) döndürür"""
+    init_db()
+    now = datetime.now().strftime(DATETIME_FORMAT)
+    read = added = 0
+    batch = []
+    with engine.begin() as connection:
+        for document in read_documents(paths, source):
+            document["text"] = document["text"].strip()[:MAX_TEXT_CHARS]
+            if len(document["text"]) < MIN_TEXT_CHARS:
+                continue
+            read += 1
+            batch.append(document)
+            if len(batch) == BATCH_SIZE:
+                added += _insert_batch(connection, batch, language, now)
+                batch = []
+        if batch:
+            added += _insert_batch(connection, batch, language, now)
+    return read, added
+
+
+def pick_text(db, level, language="es", rng=random):
+    """Seviyenin zorluk aralığından rastgele bir derlem metni seçer; yoksa None.
+
+    Aralıkta rastgele bir nokta seçilir ve o noktadan büyük ilk metin
+    indeksten okunur; nokta ile aralık sonu arasında metin yoksa aralığın
+    başına dönülür. Her iki sorgu da (language, difficulty) indeksinde
+    tek bir arama.
+    """
+    low, high = LEVEL_RANGES.get(level, LEVEL_RANGES["b1"])
+    point = rng.uniform(low, high)
+    columns = (CorpusText.title, CorpusText.source, CorpusText.url, CorpusText.text, CorpusText.difficulty)
+    for start in (point, low):
+        row = db.execute(
+            select(*columns)
+            .where(CorpusText.language == language, CorpusText.difficulty >= start, CorpusText.difficulty < high)
+            .order_by(CorpusText.difficulty)
+            .limit(1)
+        ).first()
+        if row is not None:
+            return row
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Okuma derlemi alımı")
+    parser.add_argument("paths", nargs="+", help=".jsonl/.txt dosyaları ya da dizinler")
+    parser.add_argument("--language", default="es", choices=language_packs.SUPPORTED_LANGUAGES)
+    parser.add_argument("--source", default="Yerel derlem")
+    args = parser.parse_args()
+
+    start = time.time()
+    read, added = ingest(args.paths, language=args.language, source=args.source)
+    elapsed = time.time() - start
+    print(f"{read} metin okundu, {added} yeni metin eklendi ({elapsed:.1f} sn, {read / max(elapsed, 1e-9):.0f} metin/sn)")
+
+
+if __name__ == "__main__":
+    main()
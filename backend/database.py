@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, ForeignKey
+import os
+
+from sqlalchemy import create_engine, event, select, Column, Integer, String, Text, Boolean, Float, ForeignKey, UniqueConstraint, Index, LargeBinary
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
-# Create database connection
-DATABASE_URL = "sqlite:///./app.db"
+# Create database connection (benchmark ve testler için ortam değişkeniyle değiştirilebilir)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -53,6 +56,255 @@ class UserActivity(Base):
     # İlişki
     user = relationship("User", backref="activities")
 
+class ActivitySync(Base):
+    """İstemcinin ürettiği aktivite kimlikleri; yeniden gönderilen aktiviteler ikinci kez kaydedilmez"""
+    __tablename__ = "activity_sync"
+    __table_args__ = (UniqueConstraint("user_id", "client_id", name="uq_activity_sync_user_client"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    client_id = Column(String(64))
+    activity_id = Column(Integer, ForeignKey("user_activities.id"), nullable=True, index=True)  # Aktivite kaydedilince dolar
+    synced_at = Column(String(50))
+
+class UserProgress(Base):
+    """Kullanıcının günlük toplamı ve seri (streak) bilgisi; her aktivitede güncellenir"""
+    __tablename__ = "user_progress"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    streak = Column(Integer, default=0)  # last_day'de biten ardışık aktif gün sayısı
+    longest_streak = Column(Integer, default=0)
+    last_day = Column(String(50))  # Son aktif gün (YYYY-MM-DD)
+    day_minutes = Column(Integer, default=0)  # last_day'deki toplam dakika
+
+class UserRecommendation(Base):
+    __tablename__ = "user_recommendations"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="uq_user_recommendations_user_period"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    period = Column(String(10))  # week, month, year
+    recommendations = Column(Text)  # JSON listesi
+    computed_at = Column(String(50))  # Hesaplama tarihi
+
+class UserWord(Base):
+    __tablename__ = "user_words"
+    __table_args__ = (
+        UniqueConstraint("user_id", "language", "word", name="uq_user_words_user_language_word"),
+        # Tekrar kuyruğu: kullanıcının zamanı gelmiş kartları tek bir indeks aralığından okunur
+        Index("ix_user_words_user_due", "user_id", "due_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    language = Column(String(5), default="es")  # Kelimeler dile göre sözlük biçiminde saklanır
+    word = Column(String(100))
+    meaning = Column(Text, nullable=True)
+    # SM-2 tekrar alanları
+    ease_factor = Column(Float, default=2.5)
+    interval = Column(Integer, default=0)  # Gün cinsinden
+    repetitions = Column(Integer, default=0)
+    due_at = Column(String(50))  # Sonraki tekrar zamanı
+    last_reviewed_at = Column(String(50), nullable=True)
+    created_at = Column(String(50))
+
+class TextBlob(Base):
+    """İçerik adresli okuma metni; aynı metin kaç kullanıcı okursa okusun bir kez saklanır"""
+    __tablename__ = "text_blobs"
+    
+    hash = Column(String(64), primary_key=True)  # sha256(seviye + metin)
+    title = Column(String(200))
+    url = Column(Text)
+    source = Column(String(100))
+    level = Column(String(2))
+    data = Column(LargeBinary)  # zlib ile sıkıştırılmış JSON: metin, özet, kelimeler ve anlamları
+    size = Column(Integer)  # Sıkıştırılmamış boyut (bayt)
+    created_at = Column(String(50))
+
+class ReadingSession(Base):
+    __tablename__ = "reading_sessions"
+    __table_args__ = (
+        # Geçmiş sayfaları: kullanıcının kayıtları id'ye göre tek bir indeks aralığından okunur
+        Index("ix_reading_sessions_user_id_id", "user_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    text_hash = Column(String(64), ForeignKey("text_blobs.hash"))
+    read_at = Column(String(50))  # Okuma tarihi
+
+class CorpusText(Base):
+    """Yerel okuma derlemi; zorluk puanı alımda bir kez hesaplanır"""
+    __tablename__ = "corpus_texts"
+    __table_args__ = (
+        # Seviyeye göre seçim: (dil, zorluk) indeksi üzerinde aralık sorgusu
+        Index("ix_corpus_texts_language_difficulty", "language", "difficulty"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True)  # sha256(metin); aynı metin iki kez alınmaz
+    language = Column(String(5), default="es")
+    title = Column(String(200))
+    source = Column(String(100))
+    url = Column(Text, nullable=True)
+    text = Column(Text)
+    difficulty = Column(Float)  # 0 (kolay) - 100 (zor)
+    level = Column(String(2))  # Tahmini CEFR seviyesi
+    fernandez_huerta = Column(Float)
+    szigriszt_pazos = Column(Float)
+    rare_word_share = Column(Float, nullable=True)
+    word_count = Column(Integer)
+    created_at = Column(String(50))
+
+class Classroom(Base):
+    """Öğretmenin öğrenci grubu (sınıf)"""
+    __tablename__ = "classes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100))
+    teacher_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(String(50))
+
+class ClassMember(Base):
+    __tablename__ = "class_members"
+    __table_args__ = (UniqueConstraint("class_id", "user_id", name="uq_class_members_class_user"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    class_id = Column(Integer, ForeignKey("classes.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    joined_at = Column(String(50))
+
+class UserPeriodTotal(Base):
+    """Kullanıcının periyot (week, month, year) içindeki aktivite türü toplamları.
+
+    Sınıf analizleri bu tablodan okunur: yeni aktiviteler anında eklenir,
+    periyot dışına çıkan günler gece çalışan toplu işte düşülür.
+    """
+    __tablename__ = "user_period_totals"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "activity_type", name="uq_user_period_totals_user_period_type"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    period = Column(String(10))  # week, month, year
+    activity_type = Column(String(50))
+    minutes = Column(Integer, default=0)
+    last_date = Column(String(50))  # Periyottaki son aktivite tarihi
+    computed_at = Column(String(50))  # Son toplu hesaplama tarihi
+
+class LeaderboardScore(Base):
+    """Kullanıcının liderlik tablosundaki haftalık dakikası"""
+    __tablename__ = "leaderboard_scores"
+    __table_args__ = (
+        UniqueConstraint("board", "week", "user_id", name="uq_leaderboard_scores_board_week_user"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    board = Column(String(50))  # global, class:<id>
+    week = Column(String(10))  # ISO hafta, ör. 2026-W42
+    user_id = Column(Integer, ForeignKey("users.id"))
+    minutes = Column(Integer, default=0)
+
+# İlk N ve komşu sorguları: sıralama (dakika azalan, kullanıcı artan) doğrudan indeksten okunur
+Index(
+    "ix_leaderboard_scores_board_week_minutes",
+    LeaderboardScore.board, LeaderboardScore.week, LeaderboardScore.minutes.desc(), LeaderboardScore.user_id
+)
+
+class LeaderboardCount(Base):
+    """Skor başına kullanıcı sayılarının Fenwick ağacı düğümleri (sıra sorgusu için)"""
+    __tablename__ = "leaderboard_counts"
+    __table_args__ = (
+        UniqueConstraint("board", "week", "node", name="uq_leaderboard_counts_board_week_node"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    board = Column(String(50))
+    week = Column(String(10))
+    node = Column(Integer)
+    count = Column(Integer, default=0)
+
+class BackgroundJob(Base):
+    """Kalıcı arka plan işleri (JOB_BACKEND=sqlite); ayrı worker süreçleri de aynı tablodan iş alır"""
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        # Sıradaki iş: durum, öncelik ve zamana göre tek indeks aralığı
+        Index("ix_background_jobs_status_priority_run_at", "status", "priority", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100))
+    payload = Column(Text)  # JSON
+    priority = Column(Integer, default=5)  # Küçük değer önce çalışır
+    status = Column(String(10))  # queued, running, done, failed
+    dedup_key = Column(String(200), unique=True, nullable=True)  # Yalnızca bekleyen/çalışan işlerde dolu
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    repeat_seconds = Column(Float, nullable=True)  # Periyodik işlerde tekrar aralığı
+    run_at = Column(Float)  # Epoch sn; bu zamandan önce çalıştırılmaz
+    locked_until = Column(Float, nullable=True)  # Çalışan işin kilidi; süresi geçerse iş yeniden alınır
+    last_error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    created_at = Column(String(50))
+    updated_at = Column(String(50))
+
+class DataVersion(Base):
+    """Koşullu GET (ETag) için veri sürümleri; her yazmada ilgili kapsamın sürümü artar"""
+    __tablename__ = "data_versions"
+    
+    scope = Column(String(50), primary_key=True)  # user:<id>, class:<id>, items, recommendations
+    version = Column(Integer, default=0)
+
+ITEMS_SCOPE = "items"
+RECOMMENDATIONS_SCOPE = "recommendations"
+
+def user_scope(user_id):
+    return f"user:{user_id}"
+
+def class_scope(class_id):
+    return f"class:{class_id}"
+
+def member_class_scopes(connection, user_ids):
+    """Kullanıcıların üye olduğu sınıfların kapsamları (sınıf analizleri üyelerin verisine bağlı)"""
+    table = ClassMember.__table__
+    rows = connection.execute(select(table.c.class_id).where(table.c.user_id.in_(user_ids)).distinct())
+    return {class_scope(class_id) for class_id, in rows}
+
+def bump_versions(connection, scopes):
+    """Verilen kapsamların sürümlerini (aynı transaction içinde) bir artırır"""
+    table = DataVersion.__table__
+    for scope in sorted(scopes):
+        stmt = sqlite_insert(table).values(scope=scope, version=1)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=["scope"],
+            set_={"version": table.c.version + 1}
+        ))
+
+def get_versions(db, scopes):
+    """Kapsam -> sürüm sözlüğü döndürür (hiç yazılmamış kapsamlar 0)"""
+    table = DataVersion.__table__
+    rows = db.execute(select(table.c.scope, table.c.version).where(table.c.scope.in_(scopes)))
+    versions = dict.fromkeys(scopes, 0)
+    versions.update(rows.all())
+    return versions
+
+@event.listens_for(SessionLocal, "after_flush")
+def _bump_data_versions(session, flush_context):
+    # ORM üzerinden yapılan yazmalar kullanıcı/öğe sürümlerini artırır
+    scopes = set()
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (UserActivity, UserProfile)) and obj.user_id is not None:
+            scopes.add(user_scope(obj.user_id))
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, Item):
+            scopes.add(ITEMS_SCOPE)
+    if user_ids:
+        scopes |= member_class_scopes(session.connection(), user_ids)
+    if scopes:
+        bump_versions(session.connection(), scopes)
+
 # Create tables
 def init_db():
     Base.metadata.create_all(bind=engine)
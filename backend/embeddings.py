@@ -0,0 +1,334 @@
+"""Kelime vektörleri: benzer kelime ve çeldirici önerileri.
+
+Önceden eğitilmiş İspanyolca vektörler (ör. fastText cc.es.300.vec) bir kez
+`build` komutuyla gensim KeyedVectors biçimine çevrilir. Bu sırada yalnızca
+harflerden oluşan küçük harfli kelimeler tutulur ve vektörler birim uzunluğa
+normalize edilip float32 olarak kaydedilir. Uygulama dosyayı salt okunur
+bellek eşlemeli (mmap) açar: tüm işçi süreçleri aynı sayfaları işletim
+sisteminin önbelleğinden paylaşır ve kosinüs benzerliği düz nokta çarpımıdır.
+
+Bir kelime listesinin komşuları tek bir matris çarpımıyla (sözlük bloklar
+halinde taranarak) ve argpartition ile top-k seçimiyle bulunur. İsteğe bağlı
+IVF indeksi (küresel k-means ile bölümlenmiş sözlük) sorguyu en yakın birkaç
+bölümle sınırlar; 1M kelimelik sözlükte sorgu başına milisaniyenin altında
+kalır.
+
+EMBEDDINGS_PATH ayarlı değilse ya da gensim kurulu değilse alt sistem
+kullanılamaz (available() False döner).
+
+Çalıştırma:
+    python -m backend.embeddings build --input cc.es.300.vec --output data/es.kv --limit 1000000 --ivf-lists 4096
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    from gensim.models import KeyedVectors
+except ImportError:  # İsteğe bağlı bağımlılık
+    KeyedVectors = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_PATH = os.getenv("EMBEDDINGS_PATH")
+IVF_PROBES = int(os.getenv("EMBEDDINGS_IVF_PROBES", "8"))  # Sorgu başına taranan bölüm sayısı
+
+SCAN_BLOCK_ROWS = 131072  # Tam taramada tek matris çarpımına giren sözlük satırı
+KMEANS_SAMPLE = 100000
+KMEANS_ITERATIONS = 10
+RERANK_FACTOR = 4  # IVF'te tam vektörlerle yeniden sıralanan aday sayısı: k * RERANK_FACTOR
+
+STEM_PREFIX = 4  # Aynı ön eki paylaşan kelimeler aynı kelimenin çekimleri sayılır
+DISTRACTOR_MIN_SCORE = 0.3  # Çeldirici konuyla ilgili olmalı ...
+DISTRACTOR_MAX_SCORE = 0.75  # ... ama eş anlamlı olacak kadar yakın olmamalı
+
+_index = None
+_index_lock = threading.Lock()
+_load_failed = False
+
+
+def normalize(vectors):
+    """Satırları birim uzunluğa getirir (sıfır vektörler olduğu gibi kalır)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores, k):
+    """Her satırın en yüksek k skorunun (sütun indeksleri, skorlar) çiftini büyükten küçüğe döndürür"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(scores, ids, axis=1)
+    order = np.argsort(-part, axis=1)
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def _same_stem(a, b):
+    return a[:STEM_PREFIX] == b[:STEM_PREFIX]
+
+
+class IVFIndex:
+    """Küresel k-means ile bölümlenmiş, int8 ile nicemlenmiş sözlük (IVF-SQ8).
+
+    Kelimeler bölüm sırasına dizilir; her bölümün int8 kodları bitişik
+    durduğundan bir bölümün taranması tek bir dilim ve matris-vektör
+    çarpımıdır. Yaklaşık skorlarla seçilen adaylar tam vektörlerle yeniden
+    sıralanır.
+    """
+
+    def __init__(self, centroids, offsets, ids, codes, scales):
+        self.centroids = centroids  # (bölüm, boyut), birim uzunlukta
+        self.offsets = offsets  # bölüm i'nin satırları: offsets[i]:offsets[i + 1]
+        self.ids = ids  # satır -> kelime indeksi
+        self.codes = codes  # (kelime, boyut) int8, bölüm sırasında
+        self.scales = scales  # boyut başına nicemleme ölçeği
+
+    @classmethod
+    def build(cls, vectors, n_lists, seed=0):
+        """Normalize vektörlerden indeksi oluşturur"""
+        rng = np.random.default_rng(seed)
+        sample_ids = rng.choice(len(vectors), size=min(KMEANS_SAMPLE, len(vectors)), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_ids)], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            # Boş kalan bölümler rastgele örneklerle yeniden başlatılır
+            sums[~filled] = sample[rng.choice(len(sample), size=int((~filled).sum()), replace=False)]
+            centroids = normalize(sums)
+
+        assignment = np.empty(len(vectors), dtype=np.int32)
+        scales = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, len(vectors), SCAN_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+            scales = np.maximum(scales, np.abs(block).max(axis=0))
+        scales = np.where(scales > 0, scales / 127, 1.0).astype(np.float32)
+
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+        ids = np.argsort(assignment, kind="stable").astype(np.int64)
+
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for start in range(0, len(ids), SCAN_BLOCK_ROWS):
+            block = np.asarray(vectors[np.sort(ids[start:start + SCAN_BLOCK_ROWS])], dtype=np.float32)
+            # Sıralı okunan satırları bölüm sırasına geri diz
+            block = block[np.argsort(np.argsort(ids[start:start + SCAN_BLOCK_ROWS]))]
+            codes[start:start + len(block)] = np.clip(np.rint(block / scales), -127, 127)
+        return cls(centroids, offsets, ids, codes, scales)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in IVF_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory):
+        return cls(*(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in IVF_ARRAYS))
+
+    def candidates(self, query, probes, count):
+        """Sorguya en yakın `probes` bölümden yaklaşık skoru en yüksek `count` kelime indeksi"""
+        lists = top_k((self.centroids @ query)[np.newaxis, :], probes)[0][0]
+        rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+        codes = np.concatenate([self.codes[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        scores = codes.astype(np.float32) @ (query * self.scales)
+        best, _ = top_k(scores[np.newaxis, :], count)
+        return np.asarray(self.ids[rows[best[0]]])
+
+
+IVF_ARRAYS = ("centroids", "offsets", "ids", "codes", "scales")
+
+
+class EmbeddingIndex:
+    """Normalize kelime vektörleri üzerinde toplu en yakın komşu araması"""
+
+    def __init__(self, words, key_to_index, vectors, ivf=None):
+        self.words = words  # indeks -> kelime
+        self.key_to_index = key_to_index  # kelime -> indeks
+        self.vectors = vectors  # (kelime, boyut), birim uzunlukta, genellikle mmap
+        self.ivf = ivf
+
+    def lookup(self, words):
+        """Sözlükte bulunan kelimelerin (kelime, indeks) listesi"""
+        found = []
+        for word in words:
+            index = self.key_to_index.get(word.strip().lower())
+            if index is not None:
+                found.append((word, index))
+        return found
+
+    def search(self, query_ids, k, exact=False):
+        """Sözlük indekslerinin en yakın k komşusunu (indeksler, skorlar) olarak döndürür"""
+        queries = np.asarray(self.vectors[np.asarray(query_ids, dtype=np.int64)], dtype=np.float32)
+        if self.ivf is not None and not exact:
+            return self._search_ivf(queries, k)
+        return self._search_exact(queries, k)
+
+    def _search_exact(self, queries, k):
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.vectors), SCAN_BLOCK_ROWS):
+            # Tüm sorgular için tek bir (sorgu x blok) çarpımı; blok adayları mevcut en iyilerle birleşir
+            block = self.vectors[start:start + SCAN_BLOCK_ROWS]
+            ids, scores = top_k(queries @ block.T, k)
+            merged_ids = np.concatenate([best_ids, ids + start], axis=1)
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            order, best_scores = top_k(merged_scores, k)
+            best_ids = np.take_along_axis(merged_ids, order, axis=1)
+        return best_ids, best_scores
+
+    def _search_ivf(self, queries, k):
+        all_ids, all_scores = [], []
+        for query in queries:
+            # Nicemlenmiş skorlarla seçilen adaylar tam vektörlerle yeniden sıralanır
+            candidates = np.sort(self.ivf.candidates(query, IVF_PROBES, k * RERANK_FACTOR))
+            scores = np.asarray(self.vectors[candidates], dtype=np.float32) @ query
+            order, best = top_k(scores[np.newaxis, :], k)
+            all_ids.append(candidates[order[0]])
+            all_scores.append(best[0])
+        return all_ids, all_scores
+
+    def related_words(self, words, k=5):
+        """Her kelime için anlamca en yakın k kelime (aynı kelimenin çekimleri hariç)"""
+        result = {word: [] for word in words}
+        found = self.lookup(words)
+        if not found:
+            return result
+        neighbor_ids, _ = self.search([index for _, index in found], k * 3 + 1)
+        for (word, index), ids in zip(found, neighbor_ids):
+            query = self.words[index]
+            related = []
+            for neighbor in ids:
+                candidate = self.words[neighbor]
+                if neighbor == index or _same_stem(query, candidate):
+                    continue
+                if any(_same_stem(candidate, other) for other in related):
+                    continue
+                related.append(candidate)
+                if len(related) == k:
+                    break
+            result[word] = related
+        return result
+
+    def distractors(self, words, count=3):
+        """Test soruları için çeldiriciler: konuca yakın ama eş anlamlı olmayan kelimeler"""
+        result = {word: [] for word in words}
+        found = self.lookup(words)
+        if not found:
+            return result
+        neighbor_ids, neighbor_scores = self.search([index for _, index in found], count * 10)
+        for (word, index), ids, scores in zip(found, neighbor_ids, neighbor_scores):
+            query = self.words[index]
+            picked = []
+            for neighbor, score in zip(ids, scores):
+                candidate = self.words[neighbor]
+                if not DISTRACTOR_MIN_SCORE <= score <= DISTRACTOR_MAX_SCORE:
+                    continue
+                if _same_stem(query, candidate) or any(_same_stem(candidate, other) for other in picked):
+                    continue
+                picked.append(candidate)
+                if len(picked) == count:
+                    break
+            result[word] = picked
+        return result
+
+
+def ivf_directory(path):
+    return f"{path}.ivf"
+
+
+def load_index(path):
+    """Kaydedilmiş KeyedVectors dosyasını salt okunur mmap ile açar (varsa IVF indeksiyle)"""
+    kv = KeyedVectors.load(path, mmap="r")
+    ivf = IVFIndex.load(ivf_directory(path)) if os.path.isdir(ivf_directory(path)) else None
+    return EmbeddingIndex(kv.index_to_key, kv.key_to_index, kv.vectors, ivf)
+
+
+def get_index():
+    """Paylaşılan indeksi (ilk çağrıda yükleyerek) döndürür; kullanılamıyorsa None"""
+    global _index, _load_failed
+    if _index is None and not _load_failed:
+        with _index_lock:
+            if _index is None and not _load_failed:
+                if not EMBEDDINGS_PATH:
+                    _load_failed = True
+                    return None
+                if KeyedVectors is None or not os.path.exists(EMBEDDINGS_PATH):
+                    _load_failed = True
+                    logger.warning("Word embeddings unavailable", extra={"fields": {
+                        "path": EMBEDDINGS_PATH,
+                        "gensim": KeyedVectors is not None,
+                    }})
+                    return None
+                start = time.perf_counter()
+                _index = load_index(EMBEDDINGS_PATH)
+                logger.info("Word embeddings loaded", extra={"fields": {
+                    "path": EMBEDDINGS_PATH,
+                    "words": len(_index.words),
+                    "ivf": _index.ivf is not None,
+                    "seconds": round(time.perf_counter() - start, 3),
+                }})
+    return _index
+
+
+def available():
+    return get_index() is not None
+
+
+def build(input_path, output_path, limit=None, ivf_lists=0, binary=False):
+    """word2vec/fastText metin dosyasını normalize edilmiş, mmap ile açılabilir KeyedVectors'a çevirir"""
+    source = KeyedVectors.load_word2vec_format(input_path, binary=binary, limit=limit)
+
+    # Yalnızca harflerden oluşan kelimeler; büyük/küçük harf farkı olanlardan ilki (en sık) tutulur
+    keep, seen = [], set()
+    for index, word in enumerate(source.index_to_key):
+        key = word.lower()
+        if key.isalpha() and key not in seen:
+            seen.add(key)
+            keep.append((key, index))
+
+    kv = KeyedVectors(vector_size=source.vector_size, dtype=np.float32)
+    vectors = normalize(source.vectors[[index for _, index in keep]])
+    kv.add_vectors([key for key, _ in keep], vectors)
+    kv.save(output_path)
+
+    if ivf_lists:
+        IVFIndex.build(kv.vectors, ivf_lists).save(ivf_directory(output_path))
+    return len(keep)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kelime vektörü dosyası hazırlama")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="word2vec/fastText dosyasını dönüştür")
+    build_parser.add_argument("--input", required=True)
+    build_parser.add_argument("--output", required=True)
+    build_parser.add_argument("--limit", type=int, default=None, help="En sık N kelime")
+    build_parser.add_argument("--ivf-lists", type=int, default=0, help="IVF bölüm sayısı (0: tam tarama)")
+    build_parser.add_argument("--binary", action="store_true")
+    args = parser.parse_args()
+
+    if KeyedVectors is None:
+        parser.error("gensim kurulu değil")
+
+    start = time.time()
+    count = build(args.input, args.output, limit=args.limit, ivf_lists=args.ivf_lists, binary=args.binary)
+    print(f"{count} kelime {args.output} dosyasına yazıldı ({time.time() - start:.1f} sn)")
+
+
+if __name__ == "__main__":
+    main()
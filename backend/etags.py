@@ -0,0 +1,40 @@
+"""Koşullu GET yardımcıları.
+
+ETag'ler data_versions tablosundaki sürümlerden üretilir; istemcinin
+If-None-Match başlığı güncel ETag ile eşleşirse uç nokta asıl sorguyu
+çalıştırmadan ve yanıtı serileştirmeden 304 döndürür.
+"""
+from fastapi import Response
+
+from .database import get_versions
+
+
+def make_etag(versions, *parts):
+    """Sürümlerden ve ek parçalardan (periyot, tarih...) zayıf bir ETag üretir"""
+    tokens = [f"{scope}.{version}" for scope, version in sorted(versions.items())]
+    tokens.extend(str(part) for part in parts)
+    return 'W/"' + "-".join(tokens) + '"'
+
+
+def current_etag(db, scopes, *parts):
+    return make_etag(get_versions(db, scopes), *parts)
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match başlığı ETag ile eşleşiyor mu (zayıf karşılaştırma)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,163 @@
+"""Aktivite geçmişinin akışlı dışa aktarımı (CSV, NDJSON, Parquet).
+
+Satırlar sunucu tarafı imleçten (yield_per) EXPORT_BATCH_SIZE'lık gruplar
+halinde okunur ve her grup hemen yanıt parçasına çevrilir; bellekte en
+fazla bir grup tutulduğu için bellek kullanımı satır sayısından
+bağımsızdır. Parquet'te her grup ayrı bir satır grubu (row group) olarak
+yazılır ve yazıcının ürettiği baytlar her gruptan sonra gönderilir.
+
+Kullanıcı dışa aktarımı ile tüm kullanıcıları kapsayan yönetici dışa
+aktarımı aynı yolu kullanır (user_id=None: tüm kullanıcılar).
+"""
+import csv
+import io
+
+from fastapi.responses import StreamingResponse
+
+from .database import SessionLocal, User, UserActivity
+from .responses import ndjson_line
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pyarrow_parquet
+except ImportError:  # İsteğe bağlı bağımlılık (yalnızca Parquet için)
+    pyarrow = None
+
+EXPORT_BATCH_SIZE = 1000
+
+COLUMNS = ("id", "user_id", "username", "activity_type", "duration", "notes", "completed_at")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+FORMATS = tuple(MEDIA_TYPES)
+
+
+def parquet_available():
+    return pyarrow is not None
+
+
+def iter_batches(user_id=None, start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE):
+    """Aktivite satırlarını id sırasıyla gruplar halinde üretir.
+
+    Akış uç nokta döndükten sonra sürdüğü için istek oturumu yerine kendi
+    oturumunu açar.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(
+            UserActivity.id,
+            UserActivity.user_id,
+            User.username,
+            UserActivity.activity_type,
+            UserActivity.duration,
+            UserActivity.notes,
+            UserActivity.completed_at
+        ).join(User, User.id == UserActivity.user_id)
+
+        if user_id is not None:
+            query = query.filter(UserActivity.user_id == user_id)
+        if start_date:
+            query = query.filter(UserActivity.completed_at >= start_date)
+        if end_date:
+            query = query.filter(UserActivity.completed_at <= end_date)
+
+        batch = []
+        for row in query.order_by(UserActivity.id).yield_per(batch_size):
+            batch.append(tuple(row))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        db.close()
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Satır yoksa yalnızca başlık
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_chunks(batches):
+    for batch in batches:
+        yield b"".join(ndjson_line(dict(zip(COLUMNS, row))) for row in batch)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Parquet yazıcısının çıktısını biriktirip parça parça boşaltan dosya benzeri nesne"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_chunks(batches):
+    schema = pyarrow.schema([
+        ("id", pyarrow.int64()),
+        ("user_id", pyarrow.int64()),
+        ("username", pyarrow.string()),
+        ("activity_type", pyarrow.string()),
+        ("duration", pyarrow.int64()),
+        ("notes", pyarrow.string()),
+        ("completed_at", pyarrow.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pyarrow_parquet.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+CHUNK_WRITERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+    "parquet": parquet_chunks,
+}
+
+
+def export_response(export_format, filename, user_id=None, start_date=None, end_date=None):
+    """Dışa aktarımı parçalı (chunked) yanıt olarak döndürür; biçim önceden doğrulanmış olmalı"""
+    chunks = CHUNK_WRITERS[export_format](iter_batches(user_id, start_date, end_date))
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -1,31 +1,223 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime, timedelta
-from .database import get_db, Item, User, UserProfile, init_db, UserActivity
-from .auth import authenticate_user, create_access_token, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM
+from .database import get_db, engine, Item, User, UserProfile, init_db, UserActivity, UserWord, Classroom, ClassMember, user_scope, class_scope, bump_versions, ITEMS_SCOPE, RECOMMENDATIONS_SCOPE
+from .etags import current_etag, etag_matches, not_modified
+from .auth import authenticate_user, create_access_token, get_password_hash, is_admin, is_teacher, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM
+from .recommendations import ACTIVITY_TYPES, PERIOD_DAYS, period_start, build_recommendations, get_stored_recommendations
+from .text_analysis import POS_VERB
+from .summarizer import summarize, lead_summary
+from .readability import score_text, select_passage
+from .corpus import pick_text
+from . import language_detection
+from . import embeddings
+from . import language_packs
+from . import exports
+from . import cohorts
+from . import leaderboards
+from . import activity_sync
+from . import progress
+from . import pubsub
+from . import jobs
+from . import tasks
+from fastapi.concurrency import run_in_threadpool
+from . import metrics
+from .logging_setup import setup_logging, shutdown_logging, resolve_request_id, should_log_access, request_id_var, REQUEST_ID_HEADER, SLOW_REQUEST_SECONDS
+import asyncio
+import logging
+import time
+from .word_rank import select_words
+from .srs import sm2, next_due, DATETIME_FORMAT, MAX_QUALITY
+from .responses import FastJSONResponse, rows_to_dicts, ndjson_line
+from . import outbound
+from .outbound import OutboundError
+from .wikipedia import fetch_page
+from .reading_history import save_reading, record_reading, get_history, load_reading
+from .rate_limit import create_limiter, ROUTE_CLASS_BY_PATH, RATE_LIMIT_ENABLED
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from jose import JWTError, jwt
 import pandas as pd
-import wikipediaapi
-from langdetect import detect
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 import random
-import http.client
 import json
+import uuid
 import os
 from dotenv import load_dotenv
 
 app = FastAPI()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/token")
 
+# JSON günlük kaydını başlat
+setup_logging()
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("backend.access")
+
 # Veritabanı tablolarını oluştur
 init_db()
 
+# Açılışta dil profillerini yükle, kapanışta süreç havuzunu kapat
+@app.on_event("startup")
+def warm_up_language_detection():
+    language_detection.warm_up()
+
+@app.on_event("startup")
+def load_embeddings():
+    # Vektör dosyası mmap ile açılır; sayfalar ilk sorgularda diskten okunur
+    embeddings.get_index()
+
+@app.on_event("startup")
+def start_jobs():
+    # Arka plan worker'ları ve periyodik işler (periyodikler yalnızca JOB_BACKEND=sqlite ile zamanlanır)
+    jobs.start()
+    tasks.schedule_periodic_jobs()
+
+@app.on_event("shutdown")
+def stop_jobs():
+    jobs.stop()
+
+@app.on_event("startup")
+def start_pubsub():
+    # PUBSUB_SOCKET ayarlıysa diğer worker'lardaki olaylar aracı üzerinden gelir
+    pubsub.start()
+
+@app.on_event("shutdown")
+def stop_pubsub():
+    pubsub.stop()
+
+@app.on_event("shutdown")
+def shutdown_language_detection():
+    language_detection.shutdown()
+
+@app.on_event("shutdown")
+def flush_metrics():
+    # Çoklu worker modunda son sayımlar arşive eklenir, göstergeler kaybolur
+    metrics.shutdown()
+
+@app.on_event("shutdown")
+def flush_logs():
+    shutdown_logging()
+
+# Sorgu sürelerini metriklere kaydet
+metrics.instrument_engine(engine)
+
+# Endpoint fonksiyonu -> route şablonu (metrik etiketleri için)
+_route_paths = {}
+
+def route_template(request: Request):
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if not _route_paths:
+        _route_paths.update({route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")})
+    return _route_paths.get(endpoint, "unmatched")
+
+# Pahalı uç noktalar için hız sınırı ve eşzamanlılık sınırı
+limiter = create_limiter()
+
+def token_subject(request: Request):
+    """Authorization başlığındaki token'ın kullanıcı adını döndürür (geçersizse None)"""
+    authorization = request.headers.get("Authorization", "")
+    if not authorization.startswith("Bearer "):
+        return None
+    try:
+        return jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+@app.middleware("http")
+async def rate_limit_middleware(request: Request, call_next):
+    route_class = ROUTE_CLASS_BY_PATH.get(request.url.path) if RATE_LIMIT_ENABLED else None
+    if route_class is None:
+        return await call_next(request)
+    
+    ip = request.client.host if request.client else None
+    if limiter.buckets.blocking:
+        # SQLite kovaları kilit beklerken olay döngüsünü bloklamasın
+        rejection = await run_in_threadpool(limiter.admit, route_class, user=token_subject(request), ip=ip)
+    else:
+        rejection = limiter.admit(route_class, user=token_subject(request), ip=ip)
+    if rejection is not None:
+        metrics.inc("rate_limited_total", route_class=route_class, reason=rejection.reason)
+        if rejection.status_code == 429:
+            detail = "Çok fazla istek, lütfen daha sonra tekrar deneyin"
+        else:
+            detail = "Sunucu meşgul, lütfen daha sonra tekrar deneyin"
+        return JSONResponse(
+            status_code=rejection.status_code,
+            content={"detail": detail},
+            headers={"Retry-After": str(rejection.retry_after)}
+        )
+    
+    try:
+        response = await call_next(request)
+    except Exception:
+        limiter.release(route_class)
+        raise
+    
+    # Akışlı yanıtlar (okuma metni akışı) yuvayı gövde bitene kadar tutar
+    body_iterator = response.body_iterator
+    
+    async def release_after_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            limiter.release(route_class)
+    
+    response.body_iterator = release_after_body()
+    return response
+
+# Her isteğin süresini ve durum kodunu route bazında kaydet
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.observe_request(route_template(request), request.method, 500, time.perf_counter() - start)
+        raise
+    metrics.observe_request(route_template(request), request.method, response.status_code, time.perf_counter() - start)
+    return response
+
+# İstek kimliği, erişim kaydı ve yavaş istek kaydı
+@app.middleware("http")
+async def request_context_middleware(request: Request, call_next):
+    request_id = resolve_request_id(request.headers.get(REQUEST_ID_HEADER))
+    request_id_token = request_id_var.set(request_id)
+    stages = {}
+    stages_token = metrics.request_stages.set(stages)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        elapsed = time.perf_counter() - start
+        response.headers[REQUEST_ID_HEADER] = request_id
+        
+        if should_log_access(response.status_code, elapsed):
+            fields = {
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+            }
+            if elapsed >= SLOW_REQUEST_SECONDS:
+                fields["stages_ms"] = {stage: round(seconds * 1000, 2) for stage, seconds in stages.items()}
+                access_logger.warning("Slow request", extra={"fields": fields})
+            else:
+                access_logger.info("Request", extra={"fields": fields})
+        return response
+    finally:
+        metrics.request_stages.reset(stages_token)
+        request_id_var.reset(request_id_token)
+
 # CORS ayarlarını ekle
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +227,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bu boyuttan (bayt) büyük yanıtları gzip ile sıkıştır (okuma metinleri, uzun listeler)
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+# Akışlar sıkıştırılmaz: gzip küçük parçaları tamponda bekletir
+GZIP_EXCLUDED_PATHS = {"/api/events/stream", "/api/reading/text/stream"}
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in GZIP_EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # Pydantic models
 class ItemBase(BaseModel):
     name: str
@@ -85,6 +293,18 @@ class ActivityCreate(BaseModel):
     activity_type: str
     duration: int
     notes: Optional[str] = None
+    client_id: Optional[str] = None  # İstemcinin ürettiği kimlik; yeniden gönderim ikinci kayıt oluşturmaz
+
+class ActivitySyncItem(BaseModel):
+    client_id: str
+    activity_type: str
+    duration: int
+    notes: Optional[str] = None
+    completed_at: Optional[str] = None  # YYYY-MM-DD; çevrimdışı kaydedilen aktivitenin tarihi
+
+class ActivitySyncBatch(BaseModel):
+    activities: List[ActivitySyncItem] = []
+    since: Optional[int] = None  # Verilirse bu filigrandan sonraki değişiklikler de döner
 
 class ActivityResponse(BaseModel):
     id: int
@@ -96,6 +316,40 @@ class ActivityResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class ClassCreate(BaseModel):
+    name: str
+
+class ClassMembersAdd(BaseModel):
+    usernames: List[str]
+
+class VocabularyWordCreate(BaseModel):
+    word: str
+    meaning: Optional[str] = None
+
+class VocabularyBulkCreate(BaseModel):
+    words: List[VocabularyWordCreate]
+    language: str = "es"  # Kelimelerin dili (sözlük biçimine indirgeme için)
+
+class VocabularyCardResponse(BaseModel):
+    id: int
+    language: str
+    word: str
+    meaning: Optional[str]
+    ease_factor: float
+    interval: int
+    repetitions: int
+    due_at: str
+    
+    class Config:
+        orm_mode = True
+
+class ReviewCreate(BaseModel):
+    quality: int  # 0-5
+
+class WordListRequest(BaseModel):
+    words: List[str]
+    count: int = 5  # Kelime başına öneri sayısı
+
 # İlk çalıştırmada NLTK verilerini indir
 try:
     # Tokenizasyon için gerekli verileri indir
@@ -106,7 +360,7 @@ try:
     # İspanyolca için ek kaynaklar
     nltk.download('spanish')
 except Exception as e:
-    print(f"NLTK veri indirme hatası: {str(e)}")
+    logger.warning("NLTK veri indirme hatası", exc_info=True)
 
 # Örnek seviyeye göre hazır metinler
 predefined_texts = {
@@ -128,10 +382,49 @@ predefined_texts = {
 load_dotenv()
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 RAPIDAPI_HOST = "scrapedino.p.rapidapi.com"
+TRANSLATION_API_URL = os.getenv("TRANSLATION_API_URL", f"https://{RAPIDAPI_HOST}")
 
 # Kelime çevirilerini önbelleğe alan bir sözlük
 translation_cache = {}
 
+# Akışlı okuma metninde aynı anda yapılan en fazla çeviri isteği
+STREAM_TRANSLATION_CONCURRENCY = 4
+
+# Seviyeye göre okuma metni uzunluğu (karakter)
+READING_TEXT_LENGTH = {
+    "a1": 500,    # Çok kısa ve basit
+    "a2": 800,    # Kısa ve temel
+    "b1": 1500,   # Orta uzunluk
+    "b2": 2500,   # Orta-uzun
+    "c1": 4000,   # Uzun ve karmaşık
+    "c2": 8000    # Çok uzun ve detaylı
+}
+
+# Kelime defterine toplu eklemede tek sorgudaki satır sayısı
+VOCABULARY_INSERT_CHUNK = 100
+# IN listeleri ve toplu eklemelerde tek sorgudaki öğe sayısı (SQLite parametre sınırının altında)
+SQLITE_PARAM_CHUNK = 100
+
+# SSE ilerleme akışı
+SSE_HEARTBEAT_SECONDS = 15.0  # Olay yokken yorum satırı gönderme aralığı (proxy zaman aşımlarına karşı)
+SSE_RETRY_MS = 3000  # Bağlantı koparsa istemcinin yeniden bağlanma beklemesi
+
+def sse_event(message):
+    """Olayı SSE biçimine çevirir (olay adı mesaj türü)"""
+    return f"event: {message['type']}\ndata: {json.dumps(message, ensure_ascii=False)}\n\n".encode("utf-8")
+
+# Toplu dil algılamada tek istekteki en fazla metin sayısı
+MAX_DETECT_BATCH = 500
+
+# Benzer kelime/çeldirici isteklerinde en fazla kelime ve kelime başına öneri sayısı
+MAX_EMBEDDING_WORDS = 100
+MAX_EMBEDDING_COUNT = 20
+
+# Prometheus metrikleri
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return metrics.render()
+
 # Authentication routes
 @app.post("/api/register")
 async def register_user_json(user_data: dict):
@@ -176,9 +469,7 @@ async def register_user_json(user_data: dict):
         raise he
     except Exception as e:
         # Hata günlüğü
-        print(f"Register error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Register error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
@@ -236,7 +527,7 @@ async def login_json(user_data: dict):
         
     except Exception as e:
         # Hata günlüğü
-        print(f"Login error: {str(e)}")
+        logger.exception("Login error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
@@ -244,7 +535,11 @@ async def login_json(user_data: dict):
 
 # Routes
 @app.get("/api/items", response_model=List[ItemResponse])
-def get_items(db: Session = Depends(get_db)):
+def get_items(response: Response, db: Session = Depends(get_db), if_none_match: Optional[str] = Header(None)):
+    etag = current_etag(db, [ITEMS_SCOPE])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     items = db.query(Item).all()
     return items
 
@@ -257,10 +552,14 @@ def create_item(item: ItemCreate, db: Session = Depends(get_db)):
     return db_item
 
 @app.get("/api/items/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
+def get_item(item_id: int, response: Response, db: Session = Depends(get_db), if_none_match: Optional[str] = Header(None)):
+    etag = current_etag(db, [ITEMS_SCOPE])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     item = db.query(Item).filter(Item.id == item_id).first()
     if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    response.headers["ETag"] = etag
     return item
 
 @app.post("/api/profile", response_model=UserProfileResponse)
@@ -317,7 +616,7 @@ async def create_profile(
             headers={"WWW-Authenticate": "Bearer"},
         )
     except Exception as e:
-        print(f"Profile error: {str(e)}")
+        logger.exception("Profile error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
@@ -325,8 +624,10 @@ async def create_profile(
 
 @app.get("/api/profile", response_model=UserProfileResponse)
 async def get_profile(
+    response: Response,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
         # Token'dan kullanıcı kimliğini çıkarma
@@ -346,6 +647,11 @@ async def get_profile(
                 detail="Kullanıcı bulunamadı"
             )
         
+        # Veri değişmediyse profili okumadan 304 döndür
+        etag = current_etag(db, [user_scope(user.id)])
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
         # Kullanıcı profilini bul
         if not user.profile:
             raise HTTPException(
@@ -353,6 +659,7 @@ async def get_profile(
                 detail="Profil henüz oluşturulmamış"
             )
         
+        response.headers["ETag"] = etag
         return user.profile
     
     except JWTError:
@@ -361,13 +668,43 @@ async def get_profile(
             detail="Geçersiz kimlik bilgileri",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Get profile error: {str(e)}")
+        logger.exception("Get profile error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
         )
 
+def add_activity(db: Session, user_id: int, activity_type: str, duration: int, notes: Optional[str], completed_at: str):
+    """Aktiviteyi ve türetilmiş toplamları (sınıf analizleri, liderlik tabloları) aynı transaction'a ekler"""
+    new_activity = UserActivity(
+        user_id=user_id,
+        activity_type=activity_type,
+        duration=duration,
+        notes=notes,
+        completed_at=completed_at
+    )
+    db.add(new_activity)
+    cohorts.record_activity(db.connection(), user_id, activity_type, duration, completed_at)
+    leaderboards.record_activity(db.connection(), user_id, duration, completed_at)
+    before, after = progress.record_activity(db.connection(), user_id, duration, completed_at)
+    db.flush()
+    
+    # Kullanıcının açık bağlantılarına gönderilecek olaylar (transaction tamamlanınca)
+    channel = user_scope(user_id)
+    pubsub.publish_after_commit(db, channel, {"type": "activity", "activity": {
+        "id": new_activity.id,
+        "activity_type": activity_type,
+        "duration": duration,
+        "notes": notes,
+        "completed_at": completed_at
+    }})
+    for message in progress.events(before, after):
+        pubsub.publish_after_commit(db, channel, message)
+    return new_activity
+
 # Aktivite kaydetme endpoint'i
 @app.post("/api/activities", response_model=ActivityResponse)
 async def create_activity(
@@ -384,19 +721,28 @@ async def create_activity(
         if not user:
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
-        # Yeni aktivite oluştur
-        new_activity = UserActivity(
-            user_id=user.id,
-            activity_type=activity.activity_type,
-            duration=activity.duration,
-            notes=activity.notes,
-            completed_at=datetime.now().strftime("%Y-%m-%d")
-        )
+        now = datetime.now()
+        if activity.client_id is not None:
+            if not activity_sync.valid_client_id(activity.client_id):
+                raise HTTPException(status_code=400, detail="Geçersiz client_id")
+            # Yeniden gönderim: ilk isteğin kaydettiği aktivite döner
+            if not activity_sync.claim(db.connection(), user.id, activity.client_id, now.strftime(DATETIME_FORMAT)):
+                db.rollback()
+                activity_id = activity_sync.existing_activity_ids(db.connection(), user.id, [activity.client_id])
+                return db.query(UserActivity).filter(UserActivity.id == activity_id[activity.client_id]).first()
         
-        db.add(new_activity)
+        # Yeni aktivite oluştur (sınıf toplamları ve liderlik tabloları aynı transaction'da güncellenir)
+        new_activity = add_activity(
+            db, user.id, activity.activity_type, activity.duration, activity.notes, now.strftime("%Y-%m-%d")
+        )
+        if activity.client_id is not None:
+            activity_sync.link(db.connection(), user.id, activity.client_id, new_activity.id)
         db.commit()
         db.refresh(new_activity)
         
+        # Öneriler arka planda yenilenir (ardışık kayıtlar tek işte birleşir)
+        tasks.enqueue_recommendation_refresh(user.id)
+        
         return new_activity
     
     except JWTError:
@@ -405,20 +751,21 @@ async def create_activity(
             detail="Geçersiz kimlik bilgileri",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Activity error: {str(e)}")
+        logger.exception("Activity error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
         )
 
-# Aktiviteleri sorgulama endpoint'i
-@app.get("/api/activities", response_model=List[ActivityResponse])
-async def get_activities(
+# Çevrimdışı aktivite kuyruğunu toplu gönderme: client_id'ye göre tekilleştirilir, tek transaction
+@app.post("/api/activities/sync", response_class=FastJSONResponse)
+async def sync_activities(
+    batch: ActivitySyncBatch,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    db: Session = Depends(get_db)
 ):
     try:
         # Token'dan kullanıcı kimliğini çıkarma
@@ -429,17 +776,55 @@ async def get_activities(
         if not user:
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
-        # Aktiviteleri sorgula
-        query = db.query(UserActivity).filter(UserActivity.user_id == user.id)
+        if len(batch.activities) > activity_sync.MAX_BATCH:
+            raise HTTPException(
+                status_code=400, detail=f"Tek seferde en fazla {activity_sync.MAX_BATCH} aktivite gönderilebilir"
+            )
+        for item in batch.activities:
+            if not activity_sync.valid_client_id(item.client_id):
+                raise HTTPException(status_code=400, detail=f"Geçersiz client_id: {item.client_id!r}")
+            try:
+                item.completed_at = activity_sync.parse_day(item.completed_at)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Geçersiz tarih: {item.completed_at}")
         
-        if start_date:
-            query = query.filter(UserActivity.completed_at >= start_date)
-        if end_date:
-            query = query.filter(UserActivity.completed_at <= end_date)
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        results = {}
+        for item in batch.activities:
+            # Aynı grupta tekrar eden kimlik: ilki geçerli
+            if item.client_id in results:
+                continue
+            if activity_sync.claim(db.connection(), user.id, item.client_id, now):
+                new_activity = add_activity(
+                    db, user.id, item.activity_type, item.duration, item.notes, item.completed_at
+                )
+                activity_sync.link(db.connection(), user.id, item.client_id, new_activity.id)
+                results[item.client_id] = {"client_id": item.client_id, "id": new_activity.id, "status": "created"}
+            else:
+                results[item.client_id] = {"client_id": item.client_id, "id": None, "status": "duplicate"}
         
-        activities = query.order_by(UserActivity.completed_at.desc()).all()
+        # Yinelenenler için ilk kaydın aktivite kimliği
+        duplicates = [client_id for client_id, result in results.items() if result["status"] == "duplicate"]
+        for offset in range(0, len(duplicates), SQLITE_PARAM_CHUNK):
+            chunk = duplicates[offset:offset + SQLITE_PARAM_CHUNK]
+            for client_id, activity_id in activity_sync.existing_activity_ids(db.connection(), user.id, chunk).items():
+                results[client_id]["id"] = activity_id
+        db.commit()
+        
+        created = len(results) - len(duplicates)
+        if created:
+            tasks.enqueue_recommendation_refresh(user.id)
         
-        return activities
+        response = {"created": created, "duplicates": len(duplicates), "results": list(results.values())}
+        if batch.since is not None:
+            # Gönderim ve çekme tek istekte: filigrandan sonraki tüm değişiklikler (bu gönderim dahil)
+            changes, has_more = activity_sync.changes(db, user.id, batch.since)
+            response["changes"] = rows_to_dicts(changes)
+            response["has_more"] = has_more
+            response["watermark"] = changes[-1].id if changes else batch.since
+        else:
+            response["watermark"] = activity_sync.watermark(db, user.id)
+        return FastJSONResponse(response)
     
     except JWTError:
         raise HTTPException(
@@ -447,19 +832,22 @@ async def get_activities(
             detail="Geçersiz kimlik bilgileri",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Get activities error: {str(e)}")
+        logger.exception("Activity sync error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
         )
 
-# Aktivite özeti endpoint'i
-@app.get("/api/activities/summary")
-async def get_activity_summary(
+# Filigrandan sonraki aktiviteler (tüm liste yerine yalnızca değişiklikler)
+@app.get("/api/activities/changes", response_class=FastJSONResponse)
+async def get_activity_changes(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-    period: Optional[str] = "week"  # week, month, year
+    since: int = 0,
+    limit: int = activity_sync.MAX_CHANGES
 ):
     try:
         # Token'dan kullanıcı kimliğini çıkarma
@@ -470,87 +858,13 @@ async def get_activity_summary(
         if not user:
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
-        # Tarih aralığını belirle
-        today = datetime.now().date()
-        
-        if period == "week":
-            start_date = (today - timedelta(days=7)).strftime("%Y-%m-%d")
-        elif period == "month":
-            start_date = (today - timedelta(days=30)).strftime("%Y-%m-%d")
-        elif period == "year":
-            start_date = (today - timedelta(days=365)).strftime("%Y-%m-%d")
-        else:
-            start_date = (today - timedelta(days=7)).strftime("%Y-%m-%d")
-        
-        end_date = today.strftime("%Y-%m-%d")
-        
-        # Aktiviteleri sorgula
-        activities = db.query(UserActivity).filter(
-            UserActivity.user_id == user.id,
-            UserActivity.completed_at >= start_date,
-            UserActivity.completed_at <= end_date
-        ).all()
-        
-        # Aktivite türlerine göre toplam süreleri hesapla
-        summary = {
-            "konuşma": 0,
-            "yazma": 0,
-            "dinleme": 0,
-            "okuma": 0,
-            "gramer öğrenme": 0,
-            "kelime dağarcığı geliştirme": 0,
-            "total": 0
-        }
-        
-        for activity in activities:
-            activity_type = activity.activity_type.lower()
-            if activity_type in summary:
-                summary[activity_type] += activity.duration
-                summary["total"] += activity.duration
-        
-        # Günlük ortalama süreyi hesapla
-        days = (today - datetime.strptime(start_date, "%Y-%m-%d").date()).days or 1
-        summary["daily_average"] = summary["total"] / days
-        
-        # Öneriler oluştur
-        recommendations = []
-        profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-        
-        if profile:
-            target_activity = profile.learning_purpose.lower()
-            target_minutes = profile.daily_minutes
-            
-            # Hedef aktivite kontrolü
-            if target_activity in summary:
-                daily_avg = summary[target_activity] / days
-                
-                if daily_avg < target_minutes * 0.5:
-                    recommendations.append(f"{target_activity.capitalize()} hedefinize ulaşmak için daha fazla zaman ayırmalısınız.")
-            
-            # Aktivite dengesi
-            if summary["total"] > 0:
-                for activity_type, minutes in summary.items():
-                    if activity_type not in ["total", "daily_average"]:
-                        percentage = (minutes / summary["total"]) * 100 if summary["total"] > 0 else 0
-                        
-                        if percentage < 10 and minutes < 30:
-                            recommendations.append(f"{activity_type.capitalize()} pratiği eksik görünüyor, daha fazla zaman ayırın.")
-            
-            # Çalışma rutini
-            if summary["total"] < 30:
-                recommendations.append("Düzenli çalışma alışkanlığı geliştirmelisiniz. Her gün en az 15 dakika ayırın.")
-            
-            # Başarı durumu
-            if summary["daily_average"] > target_minutes * 1.2:
-                recommendations.append("Harika ilerliyorsunuz! Hedeflerinizi biraz daha yükseltmeyi düşünebilirsiniz.")
-        
-        return {
-            "summary": summary,
-            "period": period,
-            "start_date": start_date,
-            "end_date": end_date,
-            "recommendations": recommendations
-        }
+        limit = max(1, min(limit, activity_sync.MAX_CHANGES))
+        changes, has_more = activity_sync.changes(db, user.id, since, limit)
+        return FastJSONResponse({
+            "changes": rows_to_dicts(changes),
+            "has_more": has_more,
+            "watermark": changes[-1].id if changes else since
+        })
     
     except JWTError:
         raise HTTPException(
@@ -558,303 +872,1490 @@ async def get_activity_summary(
             detail="Geçersiz kimlik bilgileri",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Summary error: {str(e)}")
+        logger.exception("Activity changes error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
         )
 
-# İspanyolca metin alma endpoint'i
-@app.get("/api/reading/text")
-async def get_reading_text(
+# Kullanıcının ilerleme olayları (SSE): yeni aktivite, günlük toplam ve seri değişimi.
+# İlk olay güncel durumdur; istemci sonrasında yalnızca değişiklikleri uygular
+@app.get("/api/events/stream")
+async def stream_events(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    topic: Optional[str] = None,
-    level: str = "b1"  # a1, a2, b1, b2, c1, c2
+    db: Session = Depends(get_db)
 ):
     try:
-        # Kullanıcı doğrulama
+        # Token'dan kullanıcı kimliğini çıkarma
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
         
-        # Hazır metin kullanılabilir mi kontrol et
-        if level in predefined_texts and random.random() < 0.7:  # %70 olasılıkla hazır metin kullan
-            text_data = random.choice(predefined_texts[level])
-            title = text_data["title"]
-            text = text_data["text"]
-            source = text_data["source"]
-            source_url = "#"  # Hazır metinler için kaynak URL yok
-        else:
-            # Wikipedia API'yi başlat
-            wiki_wiki = wikipediaapi.Wikipedia('tr.wikipedia.org', 'es')
-            
-            # Seviyeye göre konuları belirle
-            topics = {
-                "a1": [
-                    "Familia", "Casa", "Comida", "Color", "Animal", 
-                    "Número", "Día", "Mes", "Hora", "Fruta"
-                ],
-                "a2": [
-                    "Deporte", "Escuela", "Música", "Tiempo", "Salud",
-                    "Ropa", "Viaje", "Restaurante", "Compras", "Hobby"
-                ],
-                "b1": [
-                    "Historia de España", "Geografía de España", "Cultura de México",
-                    "Turismo en España", "Gastronomía española", "Deportes en España",
-                    "Parques nacionales", "Fiestas populares", "Tradiciones", "Música española"
-                ],
-                "b2": [
-                    "Literatura española", "Arte español", "Cine español", 
-                    "Política de España", "Medio ambiente", "Sociedad española",
-                    "Educación en España", "Historia de México", "Cocina latinoamericana",
-                    "Religión en España"
-                ],
-                "c1": [
-                    "Filosofía española", "Ciencia en España", "Economía de España",
-                    "Arquitectura española", "Literatura latinoamericana",
-                    "Historia del arte español", "Política internacional española",
-                    "Empresas españolas", "Sistema político español", "Derecho español"
-                ],
-                "c2": [
-                    "Arqueología en España", "Lingüística española", "Antropología española",
-                    "Historia de la filosofía española", "Economía global",
-                    "Política latinoamericana", "Corrientes literarias españolas",
-                    "Movimientos artísticos españoles", "Crítica social", "Academia española"
-                ]
-            }
-            
-            # Konu belirtilmemişse, seviyeye göre rastgele bir konu seç
-            if not topic:
-                selected_topic = random.choice(topics.get(level, topics["b1"]))
-            else:
-                selected_topic = topic
-            
-            # Wikipedia'dan sayfayı al
-            page = wiki_wiki.page(selected_topic)
-            
-            if not page.exists():
-                # Konu bulunamadıysa rastgele bir konu seç
-                selected_topic = random.choice(topics.get(level, topics["b1"]))
-                page = wiki_wiki.page(selected_topic)
-                
-                if not page.exists():
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Konu bulunamadı"
-                    )
-            
-            # Tam metni al
-            full_text = page.text[:8000]  # Metni sınırla
-            
-            # Metin uzunluğunu seviyeye göre ayarla
-            text_length = {
-                "a1": min(500, len(full_text)),    # Çok kısa ve basit
-                "a2": min(800, len(full_text)),    # Kısa ve temel
-                "b1": min(1500, len(full_text)),   # Orta uzunluk
-                "b2": min(2500, len(full_text)),   # Orta-uzun
-                "c1": min(4000, len(full_text)),   # Uzun ve karmaşık
-                "c2": min(8000, len(full_text))    # Çok uzun ve detaylı
-            }
-            
-            text = full_text[:text_length.get(level, text_length["b1"])]
-            
-            # Özet uzunluğunu da seviyeye göre ayarla
-            summary_length = {
-                "a1": 2,  # Sadece 2 cümle
-                "a2": 3,  # 3 cümle
-                "b1": 4,  # 4 cümle
-                "b2": 5,  # 5 cümle
-                "c1": 6,  # 6 cümle
-                "c2": 8   # 8 cümle
-            }
-            
-            # Özet oluştur
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        # Önce abone ol, sonra durumu oku: arada yazılan olay kaybolmaz (en fazla iki kez uygulanır)
+        subscription = pubsub.subscribe(user_scope(user.id))
+        state = {"type": "progress", **progress.snapshot(db.connection(), user.id),
+                 "watermark": activity_sync.watermark(db, user.id)}
+        db.close()  # Bağlantı uzun süre açık kalır; veritabanı oturumunu tutma
+        
+        async def events():
             try:
-                # Seviyeye göre uyarlanmış özet uzunluğu
-                sentence_count = summary_length.get(level, 4)
-                summary = simple_summarize(text, sentence_count=sentence_count)
-            except Exception as e:
-                # Özet oluşturma başarısız olursa, daha basit bir özet oluştur
-                sentences = text.split('. ')
-                summary = '. '.join(sentences[:3]) + '.'
-            
-            # Bilinmeyen kelimeler için temel kelime listesi (İspanyolca için)
-            basic_spanish_words = {"el", "la", "los", "las", "un", "una", "unos", "unas", "y", "o", "pero", "porque", "como", "qué", "quién", "cuándo", "dónde", "por", "para", "con", "sin", "en", "de", "a", "al", "del", "es", "son", "estar", "ser", "haber", "tener", "hacer", "ir", "venir", "ver", "oír", "decir", "hablar", "comer", "beber", "dormir", "vivir", "trabajar", "estudiar", "sí", "no", "tal vez", "quizás", "hoy", "ayer", "mañana", "ahora", "luego", "después", "antes", "siempre", "nunca", "todo", "nada", "mucho", "poco", "más", "menos", "bien", "mal"}
-            
-            # Metindeki kelimeleri analiz et
-            words = simple_tokenize(text.lower())
-            unique_words = set([word for word in words if word.isalpha()])
-            
-            # "Bilinmeyen" kelimeler (basit kelime listesinde olmayan kelimeler)
-            unknown_words = list(unique_words - basic_spanish_words)
-            
-            # Seviyeye göre gösterilecek bilinmeyen kelime sayısını ayarla
-            unknown_word_count = {
-                "a1": 5,   # Çok az
-                "a2": 8,   # Az
-                "b1": 12,  # Orta
-                "b2": 15,  # Biraz fazla
-                "c1": 20,  # Fazla
-                "c2": 25   # Çok fazla
-            }
-            
-            # Seviyeye göre kelime sayısını sınırla
-            max_words = unknown_word_count.get(level, 15)
-            unknown_words = unknown_words[:max_words]
-            
-            # Kelime anlamları için basit bir sözlük oluştur (gerçek bir API ile değiştirilecek)
-            word_meanings = {}
-            
-            # Fiil listesi
-            verbs = []
-            # İsim listesi
-            nouns = []
-            
-            for word in unknown_words:
-                # API ile çeviri yap
-                turkish_meaning = translate_word_api(word, source_lang="es", target_lang="tr")
-                
-                # Fiil/isim kontrolü yap
-                if word.endswith(('ar', 'er', 'ir')) and len(word) > 2:
-                    verbs.append(word)
-                    word_meanings[word] = turkish_meaning + " (fiil)"
-                else:
-                    nouns.append(word)
-                    word_meanings[word] = turkish_meaning + " (isim/sıfat)"
-            
-            title = page.title
-            source = "Wikipedia"
-            source_url = page.fullurl
-        return {
-            "title": title,
-            "url": source_url,
-            "text": text,
-            "summary": summary,
-            "level": level,
-            "unknown_words": unknown_words,
-            "verbs": verbs,  # Fiiller
-            "nouns": nouns,  # İsimler/Sıfatlar
-            "word_meanings": word_meanings,
-            "source": source
-        }
+                yield b"retry: " + str(SSE_RETRY_MS).encode() + b"\n\n"
+                yield sse_event(state)
+                while not await request.is_disconnected():
+                    message = await subscription.get(SSE_HEARTBEAT_SECONDS)
+                    # Olay yoksa bağlantıyı canlı tutan yorum satırı
+                    yield sse_event(message) if message is not None else b": ping\n\n"
+            finally:
+                pubsub.unsubscribe(subscription)
         
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Geçersiz kimlik bilgileri",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Reading error: {str(e)}")
+        logger.exception("Event stream error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
         )
 
-# Dil algılama endpoint'i
-@app.post("/api/reading/detect-language")
-async def detect_language(
-    text_data: dict,
-    token: str = Depends(oauth2_scheme)
+# Aktiviteleri sorgulama endpoint'i
+@app.get("/api/activities", response_model=List[ActivityResponse], response_class=FastJSONResponse)
+async def get_activities(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
-        # Kullanıcı doğrulama
+        # Token'dan kullanıcı kimliğini çıkarma
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
         
-        if "text" not in text_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Metin alanı gereklidir"
-            )
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
-        text = text_data["text"]
+        # Veri değişmediyse sorguyu çalıştırmadan 304 döndür
+        etag = current_etag(db, [user_scope(user.id)])
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
         
-        # Dil algılama
-        try:
-            detected_language = detect(text)
-        except:
-            detected_language = "unknown"
+        # Aktiviteleri sorgula (ORM nesnesi ve Pydantic dönüşümü olmadan yalnızca gereken sütunlar)
+        query = db.query(
+            UserActivity.id,
+            UserActivity.activity_type,
+            UserActivity.duration,
+            UserActivity.notes,
+            UserActivity.completed_at
+        ).filter(UserActivity.user_id == user.id)
         
-        return {
-            "language": detected_language
-        }
+        if start_date:
+            query = query.filter(UserActivity.completed_at >= start_date)
+        if end_date:
+            query = query.filter(UserActivity.completed_at <= end_date)
+        
+        activities = query.order_by(UserActivity.completed_at.desc()).all()
         
+        return FastJSONResponse(rows_to_dicts(activities), headers={"ETag": etag})
+    
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Geçersiz kimlik bilgileri",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Language detection error: {str(e)}")
+        logger.exception("Get activities error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Sunucu hatası: {str(e)}"
         )
 
-# Basit özetleme fonksiyonu
-def simple_summarize(text, sentence_count=3):
-    sentences = text.split('. ')
-    if len(sentences) <= sentence_count:
-        return text
-    else:
-        return '. '.join(sentences[:sentence_count]) + '.'
-
-# Metindeki kelimeleri analiz et
-def simple_tokenize(text):
-    """Basit kelime tokenizasyon fonksiyonu"""
-    return [word.strip('.,;:!?()[]{}"\'-').lower() for word in text.split() if word.strip('.,;:!?()[]{}"\'-')]
-
-# Google Translate API için (ücretli)
-# from googletrans import Translator
-
-# Basit çeviri fonksiyonu - gerçek uygulamada API kullanılmalı
-def translate_word(word, source_lang="es", target_lang="tr"):
-    # Google Translate API yerine basit önceden tanımlanmış çeviriler
-    spanish_turkish = {
-        "animales": "hayvanlar",
-        "constituyen": "oluşturur",
-        "reino": "krallık",
-        "seres": "varlıklar",
-        "vivos": "canlı",
-        "eucariotas": "ökaryot",
-        "heterótrofos": "heterotrof",
-        "pluricelulares": "çok hücreli",
-        "tisulares": "dokusal",
-        "poríferos": "süngerler",
-        "capacidad": "kapasite",
-        "movimiento": "hareket",
-        "cloroplasto": "kloroplast",
-        "excepciones": "istisnalar",
-        "chlorotica": "klorotik",
-        "celular": "hücresel",
-        "desarrollo": "gelişim",
-        "embrionario": "embriyonik",
-        "blástula": "blastula",
-        "determina": "belirler",
-        "plan": "plan",
-        "corporal": "vücut",
-        # Fiiller
-        "reúne": "toplar",
-        "caracterizan": "karakterize eder",
-        "tener": "sahip olmak",
-        "atraviesa": "geçer"
-    }
-    
-    # Kelimeyi küçük harfe çevirip temizle
-    word = word.lower().strip('.,;:!?()[]{}"\'-')
-    
-    # Sözlükte varsa çevirisini döndür, yoksa "Çeviri bulunamadı" mesajı döndür
-    return spanish_turkish.get(word, "Çeviri bulunamadı")
+def check_export_format(export_format):
+    if export_format not in exports.FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Desteklenmeyen biçim: {export_format} ({', '.join(exports.FORMATS)})"
+        )
+    if export_format == "parquet" and not exports.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Parquet dışa aktarımı için pyarrow kurulu değil"
+        )
 
-def translate_word_api(word, source_lang="es", target_lang="tr"):
-    """API ile kelime çevirisi yap"""
-    # Önbellekte varsa oradan al
-    cache_key = f"{word.lower()}_{source_lang}_{target_lang}"
-    if cache_key in translation_cache:
-        return translation_cache[cache_key]
+# Aktivite geçmişini dışa aktarma endpoint'i (akışlı; bellek kullanımı satır sayısından bağımsız)
+@app.get("/api/activities/export")
+async def export_activities(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    format: str = "csv",  # csv, ndjson, parquet
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        check_export_format(format)
+        return exports.export_response(format, f"aktiviteler_{user.username}", user.id, start_date, end_date)
     
-    # Zaten çevirisini bildiğimiz kelimeleri kontrol et
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Activity export error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Tüm kullanıcıların aktivitelerini dışa aktarma (analiz için, yalnızca ADMIN_USERS)
+@app.get("/api/admin/activities/export")
+async def export_all_activities(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    format: str = "csv",  # csv, ndjson, parquet
+    user_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        if not is_admin(user.username):
+            raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+        
+        check_export_format(format)
+        return exports.export_response(format, "aktiviteler", user_id, start_date, end_date)
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Admin activity export error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Tüm kullanıcıların aktivitelerini arka planda dosyaya aktarma (yalnızca ADMIN_USERS)
+@app.post("/api/admin/activities/export/jobs")
+async def create_export_job(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    format: str = "csv",  # csv, ndjson, parquet
+    user_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        if not is_admin(user.username):
+            raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+        
+        check_export_format(format)
+        export_id = uuid.uuid4().hex
+        job_id = jobs.enqueue("activities.export", {
+            "export_id": export_id,
+            "format": format,
+            "user_id": user_id,
+            "start_date": start_date,
+            "end_date": end_date
+        }, max_attempts=1)
+        return {"job_id": job_id, "export_id": export_id,
+                "download_url": f"/api/admin/activities/export/files/{export_id}"}
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Export job error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Arka planda hazırlanan dışa aktarım dosyasını indirme (yalnızca ADMIN_USERS)
+@app.get("/api/admin/activities/export/files/{export_id}")
+async def download_export(
+    export_id: str,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        if not is_admin(user.username):
+            raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+        
+        found = tasks.find_export(export_id)
+        if found is None:
+            raise HTTPException(status_code=404, detail="Dışa aktarım dosyası bulunamadı")
+        path, export_format = found
+        try:
+            # Dosyayı şimdi aç: temizlik işi arada silse de akış tamamlanır
+            f = open(path, "rb")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Dışa aktarım dosyası bulunamadı")
+        
+        def chunks():
+            with f:
+                while True:
+                    chunk = f.read(64 * 1024)
+                    if not chunk:
+                        break
+                    yield chunk
+        
+        return StreamingResponse(
+            chunks(),
+            media_type=exports.MEDIA_TYPES[export_format],
+            headers={
+                "Content-Length": str(os.fstat(f.fileno()).st_size),
+                "Content-Disposition": f'attachment; filename="aktiviteler_{export_id}.{export_format}"'
+            }
+        )
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Export download error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Arka plan işinin durumu (yalnızca ADMIN_USERS)
+@app.get("/api/admin/jobs/{job_id}")
+async def get_job_status(
+    job_id: int,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        if not is_admin(user.username):
+            raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+        
+        job = await run_in_threadpool(jobs.get_job, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="İş bulunamadı")
+        return job
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Job status error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Aktivite özeti endpoint'i
+@app.get("/api/activities/summary")
+async def get_activity_summary(
+    response: Response,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    period: Optional[str] = "week",  # week, month, year
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        # Tarih aralığını belirle
+        today = datetime.now().date()
+        start_date, days = period_start(period, today)
+        end_date = today.strftime("%Y-%m-%d")
+        
+        # Özet tarihe de bağlı olduğu için ETag periyodu ve günü içerir
+        etag = current_etag(db, [user_scope(user.id), RECOMMENDATIONS_SCOPE], period, end_date)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        # Aktiviteleri sorgula
+        activities = db.query(UserActivity).filter(
+            UserActivity.user_id == user.id,
+            UserActivity.completed_at >= start_date,
+            UserActivity.completed_at <= end_date
+        ).all()
+        
+        # Aktivite türlerine göre toplam süreleri hesapla
+        summary = {activity_type: 0 for activity_type in ACTIVITY_TYPES}
+        summary["total"] = 0
+        last_date = None
+
+        for activity in activities:
+            activity_type = activity.activity_type.lower()
+            if activity_type in summary:
+                summary[activity_type] += activity.duration
+                summary["total"] += activity.duration
+                last_date = max(last_date or activity.completed_at, activity.completed_at)
+
+        # Günlük ortalama süreyi hesapla
+        summary["daily_average"] = summary["total"] / days
+
+        # Önerileri gece çalışan toplu işin tablosundan oku, yoksa anlık hesapla
+        recommendations = get_stored_recommendations(db, user.id, period, today)
+
+        if recommendations is None:
+            recommendations = []
+            profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+
+            if profile:
+                days_since_last = None
+                if last_date:
+                    days_since_last = (today - datetime.strptime(last_date, "%Y-%m-%d").date()).days
+                recommendations = build_recommendations(
+                    summary, days, profile.learning_purpose.lower(), profile.daily_minutes, days_since_last
+                )
+        
+        response.headers["ETag"] = etag
+        return {
+            "summary": summary,
+            "period": period,
+            "start_date": start_date,
+            "end_date": end_date,
+            "recommendations": recommendations
+        }
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Summary error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+def get_teacher_class(db: Session, class_id: int, user: User):
+    """Sınıfı döndürür; yalnızca sınıfın öğretmeni (TEACHER_USERS) ve ADMIN_USERS erişebilir"""
+    classroom = db.query(Classroom).filter(Classroom.id == class_id).first()
+    if not classroom:
+        raise HTTPException(status_code=404, detail="Sınıf bulunamadı")
+    if not is_admin(user.username) and (classroom.teacher_id != user.id or not is_teacher(user.username)):
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    return classroom
+
+# Sınıf oluşturma endpoint'i (yalnızca TEACHER_USERS; oluşturan kullanıcı sınıfın öğretmeni olur)
+@app.post("/api/classes")
+async def create_class(
+    data: ClassCreate,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        # Öğrenciler onay vermeden eklendiği için sınıfı yalnızca yetkili öğretmenler açabilir
+        if not is_teacher(user.username):
+            raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+        
+        name = data.name.strip()
+        if not name:
+            raise HTTPException(status_code=400, detail="Sınıf adı boş olamaz")
+        
+        classroom = Classroom(name=name, teacher_id=user.id, created_at=datetime.now().strftime(DATETIME_FORMAT))
+        db.add(classroom)
+        db.commit()
+        db.refresh(classroom)
+        
+        return {"id": classroom.id, "name": classroom.name, "students": 0, "created_at": classroom.created_at}
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Class create error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Öğretmenin sınıflarını listeleme endpoint'i
+@app.get("/api/classes")
+async def get_classes(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        # Öğrenci sayıları tek sorguda
+        result = db.query(
+            Classroom.id,
+            Classroom.name,
+            func.count(ClassMember.id).label("students"),
+            Classroom.created_at
+        ).outerjoin(ClassMember, ClassMember.class_id == Classroom.id).filter(
+            Classroom.teacher_id == user.id
+        ).group_by(Classroom.id).order_by(Classroom.id).all()
+        
+        return rows_to_dicts(result)
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Class list error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Sınıfa kullanıcı adlarıyla toplu öğrenci ekleme endpoint'i
+@app.post("/api/classes/{class_id}/members")
+async def add_class_members(
+    class_id: int,
+    data: ClassMembersAdd,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        get_teacher_class(db, class_id, user)
+        
+        usernames = list(dict.fromkeys(name.strip() for name in data.usernames if name.strip()))
+        students = {}
+        # SQLite parametre sınırını aşmamak için parçalar halinde
+        for offset in range(0, len(usernames), SQLITE_PARAM_CHUNK):
+            chunk = usernames[offset:offset + SQLITE_PARAM_CHUNK]
+            students.update(db.query(User.username, User.id).filter(User.username.in_(chunk)).all())
+        
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        values = [{"class_id": class_id, "user_id": user_id, "joined_at": now} for user_id in students.values()]
+        
+        # Zaten üye olanlar (class_id, user_id) benzersiz indeksinde atlanır
+        added = 0
+        new_members = []
+        for offset in range(0, len(values), SQLITE_PARAM_CHUNK):
+            chunk = values[offset:offset + SQLITE_PARAM_CHUNK]
+            existing = {
+                user_id for user_id, in db.query(ClassMember.user_id).filter(
+                    ClassMember.class_id == class_id,
+                    ClassMember.user_id.in_([row["user_id"] for row in chunk])
+                )
+            }
+            result = db.execute(
+                sqlite_insert(ClassMember).values(chunk).on_conflict_do_nothing(
+                    index_elements=["class_id", "user_id"]
+                )
+            )
+            added += result.rowcount
+            new_members.extend(row["user_id"] for row in chunk if row["user_id"] not in existing)
+        if added:
+            bump_versions(db.connection(), [class_scope(class_id)])
+            # Yeni üyelerin bu haftaki dakikaları sınıf liderlik tablosuna
+            leaderboards.add_class_members(db.connection(), class_id, new_members)
+        db.commit()
+        
+        return {
+            "added": added,
+            "skipped": len(values) - added,
+            "not_found": [name for name in usernames if name not in students]
+        }
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Class members error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Sınıf analizi: aktivite türüne göre süre dağılımları, hedef başarısı ve pasif öğrenciler
+@app.get("/api/classes/{class_id}/analytics", response_class=FastJSONResponse)
+async def get_class_analytics(
+    class_id: int,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    period: str = "week",  # week, month, year
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        classroom = get_teacher_class(db, class_id, user)
+        
+        if period not in PERIOD_DAYS:
+            raise HTTPException(status_code=400, detail=f"Geçersiz periyot: {period}")
+        
+        # Analiz tarihe de bağlı olduğu için ETag periyodu ve günü içerir
+        etag = current_etag(db, [class_scope(class_id)], period, datetime.now().strftime("%Y-%m-%d"))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        # Hazır periyot toplamlarından tek sorgu ve vektörel hesaplama
+        with metrics.timed("cohort_analytics"):
+            analytics = await run_in_threadpool(cohorts.cohort_analytics, db.connection(), class_id, period)
+        
+        return FastJSONResponse({**analytics, "name": classroom.name}, headers={"ETag": etag})
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Class analytics error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+def leaderboard_board(db: Session, class_id: Optional[int], user: User):
+    """Liderlik tablosu adı; sınıf tablosunu yalnızca üyeler, öğretmen ve ADMIN_USERS görebilir"""
+    if class_id is None:
+        return leaderboards.GLOBAL_BOARD
+    classroom = db.query(Classroom).filter(Classroom.id == class_id).first()
+    if not classroom:
+        raise HTTPException(status_code=404, detail="Sınıf bulunamadı")
+    is_member = db.query(ClassMember.id).filter(
+        ClassMember.class_id == class_id, ClassMember.user_id == user.id
+    ).first() is not None
+    if not is_member and classroom.teacher_id != user.id and not is_admin(user.username):
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    return leaderboards.class_board(class_id)
+
+# Haftalık dakika liderlik tablosu: ilk N kullanıcı (class_id verilmezse genel tablo)
+@app.get("/api/leaderboards", response_class=FastJSONResponse)
+async def get_leaderboard(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    class_id: Optional[int] = None,
+    limit: int = 10,
+    week: Optional[str] = None  # ör. 2026-W42; varsayılan bu hafta
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        board = leaderboard_board(db, class_id, user)
+        
+        limit = max(1, min(limit, leaderboards.MAX_LIMIT))
+        return FastJSONResponse(leaderboards.top(db.connection(), board, week or leaderboards.current_week(), limit))
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Leaderboard error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Kullanıcının sırası ve tabloda çevresindeki k kullanıcı
+@app.get("/api/leaderboards/me", response_class=FastJSONResponse)
+async def get_my_leaderboard_rank(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    class_id: Optional[int] = None,
+    k: int = 3,
+    week: Optional[str] = None  # ör. 2026-W42; varsayılan bu hafta
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        board = leaderboard_board(db, class_id, user)
+        
+        k = max(0, min(k, leaderboards.MAX_AROUND))
+        return FastJSONResponse(
+            leaderboards.around(db.connection(), board, week or leaderboards.current_week(), user.id, k)
+        )
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Leaderboard rank error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Okuma metni hazırlığı: metni (hazır metin ya da Wikipedia) seçer, özetler ve
+# seviyeye uygun bilinmeyen kelimeleri belirler; normal ve akış uç noktaları ortak kullanır
+async def prepare_reading(db: Session, topic: Optional[str], level: str, language: str = "es"):
+    if language not in language_packs.PACK_SPECS:
+        raise HTTPException(status_code=400, detail=f"Desteklenmeyen dil: {language}")
+    
+    # Dil paketi bu worker'da ilk kullanımda yüklenir
+    pack = await run_in_threadpool(language_packs.get_pack, language)
+    max_length = READING_TEXT_LENGTH.get(level, READING_TEXT_LENGTH["b1"])
+    
+    # Hazır metinler yalnızca İspanyolca
+    level_texts = predefined_texts.get(level) if language == "es" else None
+    
+    # Konu belirtilmemişse önce yerel derlemden seviyenin zorluk aralığında bir metin seç
+    corpus_text = pick_text(db, level, language) if not topic else None
+    
+    # Hazır metin kullanılabilir mi kontrol et
+    text_data = None
+    if corpus_text is not None:
+        text_data = {
+            "title": corpus_text.title,
+            "text": select_passage(corpus_text.text, level, max_length, pack.word_rank),
+            "source": corpus_text.source,
+            "url": corpus_text.url
+        }
+    elif level_texts and random.random() < 0.7:  # %70 olasılıkla hazır metin kullan
+        text_data = random.choice(level_texts)
+    else:
+        # Konu belirtilmemişse, seviyeye göre rastgele bir konu seç
+        if not topic:
+            selected_topic = random.choice(pack.topics(level))
+        else:
+            selected_topic = topic
+        
+        with metrics.timed("wiki_fetch"):
+            try:
+                # Wikipedia'dan sayfayı al (engelleyici G/Ç iş parçacığı havuzunda)
+                page = await run_in_threadpool(fetch_page, selected_topic, language)
+                
+                if page is None:
+                    # Konu bulunamadıysa rastgele bir konu seç
+                    selected_topic = random.choice(pack.topics(level))
+                    page = await run_in_threadpool(fetch_page, selected_topic, language)
+            except OutboundError:
+                # Wikipedia'ya ulaşılamıyor ve önbellekte yok: hazır metinlere düş
+                if not level_texts:
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Metin servisine şu anda ulaşılamıyor",
+                        headers={"Retry-After": str(int(outbound.RESET_TIMEOUT))}
+                    )
+                logger.warning("Wikipedia unavailable, serving predefined text", exc_info=True)
+                text_data = random.choice(level_texts)
+        
+        if text_data is None:
+            if page is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Konu bulunamadı"
+                )
+            
+            # Tam metni al
+            full_text = page["text"][:30000]  # Pasaj seçimi için metni sınırla
+            
+            # Seviye uzunluğundaki, zorluğu seviyeye en yakın paragrafları seç
+            with metrics.timed("readability"):
+                text = select_passage(full_text, level, max_length, pack.word_rank)
+            
+            title = page["title"]
+            source = "Wikipedia"
+            source_url = page["url"]
+            
+            # Aynı seviyedeki bir sonraki istek için başka bir konuyu arka planda önbelleğe al
+            jobs.enqueue("wikipedia.prefetch", {"language": language, "level": level},
+                         priority=jobs.PRIORITY_LOW, dedup_key=f"wikipedia:{language}:{level}",
+                         max_attempts=1, local=True)
+    
+    if text_data is not None:
+        title = text_data["title"]
+        text = text_data["text"]
+        source = text_data["source"]
+        source_url = text_data.get("url") or "#"  # Hazır metinler için kaynak URL yok
+    
+    # Özet uzunluğunu da seviyeye göre ayarla
+    summary_length = {
+        "a1": 2,  # Sadece 2 cümle
+        "a2": 3,  # 3 cümle
+        "b1": 4,  # 4 cümle
+        "b2": 5,  # 5 cümle
+        "c1": 6,  # 6 cümle
+        "c2": 8   # 8 cümle
+    }
+    
+    # Özet oluştur
+    try:
+        # Seviyeye göre uyarlanmış özet uzunluğu
+        sentence_count = summary_length.get(level, 4)
+        with metrics.timed("summarize"):
+            summary = summarize(text, sentence_count=sentence_count, stopwords=pack.stopwords)
+    except Exception as e:
+        # Özet oluşturma başarısız olursa, ilk cümlelerden basit bir özet oluştur
+        logger.exception("Summarize error")
+        summary = lead_summary(text, sentence_count=3)
+    
+    # Metindeki kelimeleri tek geçişte analiz et
+    with metrics.timed("tokenize"):
+        analysis = pack.analyze_text(text)
+    
+    # Seviyeye göre gösterilecek bilinmeyen kelime sayısını ayarla
+    unknown_word_count = {
+        "a1": 5,   # Çok az
+        "a2": 8,   # Az
+        "b1": 12,  # Orta
+        "b2": 15,  # Biraz fazla
+        "c1": 20,  # Fazla
+        "c2": 25   # Çok fazla
+    }
+    
+    # "Bilinmeyen" kelimeler: temel kelime listesinde olmayanlardan seviyeye en uygun olanlar
+    max_words = unknown_word_count.get(level, 15)
+    unknown_words = select_words(analysis.counts, analysis.candidates, level, max_words, index=pack.word_rank)
+    
+    # Metnin tahmini zorluğu ve CEFR seviyesi
+    with metrics.timed("readability"):
+        readability = score_text(text, pack.word_rank)
+    
+    reading = {
+        "title": title,
+        "url": source_url,
+        "text": text,
+        "summary": summary,
+        "level": level,
+        "language": language,
+        "unknown_words": unknown_words,
+        "source": source,
+        "readability": readability._asdict(),
+        "lemmas": {word: analysis.lemmas[word] for word in unknown_words}  # Sözlük biçimleri
+    }
+    return reading, analysis.pos_hints
+
+def format_meaning(turkish_meaning, pos_hint):
+    """Çeviriye fiil/isim ipucunu ekler"""
+    if pos_hint == POS_VERB:
+        return turkish_meaning + " (fiil)"
+    return turkish_meaning + " (isim/sıfat)"
+
+# Okuma metni alma endpoint'i
+@app.get("/api/reading/text", response_class=FastJSONResponse)
+async def get_reading_text(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    topic: Optional[str] = None,
+    level: str = "b1",  # a1, a2, b1, b2, c1, c2
+    language: str = "es"  # es, en, de, fr
+):
+    try:
+        # Kullanıcı doğrulama
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        reading, pos_hints = await prepare_reading(db, topic, level, language)
+        unknown_words = reading["unknown_words"]
+        
+        # Kelime anlamları için basit bir sözlük oluştur (gerçek bir API ile değiştirilecek)
+        word_meanings = {}
+        
+        with metrics.timed("translate_batch"):
+            # API ile çeviri yap (engelleyici G/Ç iş parçacığı havuzunda)
+            meanings = await run_in_threadpool(translate_words, unknown_words, language, "tr")
+        
+        for word, turkish_meaning in zip(unknown_words, meanings):
+            word_meanings[word] = format_meaning(turkish_meaning, pos_hints[word])
+        
+        reading.update({
+            "verbs": [word for word in unknown_words if pos_hints[word] == POS_VERB],  # Fiiller
+            "nouns": [word for word in unknown_words if pos_hints[word] != POS_VERB],  # İsimler/Sıfatlar
+            "word_meanings": word_meanings
+        })
+        
+        # Okuma geçmişine ekle (metin depoda yoksa bir kez yazılır)
+        reading["session_id"] = save_reading(db, user.id, reading)
+        
+        return FastJSONResponse(reading)
+        
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Reading error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Akışlı okuma metni: önce metin ve özet, ardından çeviriler hazır oldukça
+# kelime anlamları NDJSON satırları olarak gönderilir
+@app.get("/api/reading/text/stream")
+async def stream_reading_text(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    topic: Optional[str] = None,
+    level: str = "b1",  # a1, a2, b1, b2, c1, c2
+    language: str = "es"  # es, en, de, fr
+):
+    try:
+        # Kullanıcı doğrulama (akış başlamadan önce, hata kodları normal dönsün)
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        user_id = user.id
+        
+        reading, pos_hints = await prepare_reading(db, topic, level, language)
+        
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Reading stream error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+    
+    unknown_words = reading["unknown_words"]
+    semaphore = asyncio.Semaphore(STREAM_TRANSLATION_CONCURRENCY)
+    
+    async def translate(word):
+        async with semaphore:
+            return word, await run_in_threadpool(translate_word_api, word, language, "tr")
+    
+    async def events():
+        yield ndjson_line({"type": "text", **reading})
+        
+        word_meanings = {}
+        tasks = [asyncio.ensure_future(translate(word)) for word in unknown_words]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                word, turkish_meaning = await next_done
+                word_meanings[word] = format_meaning(turkish_meaning, pos_hints[word])
+                yield ndjson_line({
+                    "type": "meaning",
+                    "word": word,
+                    "meaning": word_meanings[word],
+                    "pos": pos_hints[word]
+                })
+        except Exception:
+            logger.exception("Reading stream translation error")
+            yield ndjson_line({"type": "error", "detail": "Çeviriler tamamlanamadı"})
+            return
+        finally:
+            # İstemci bağlantıyı kestiyse bekleyen çevirileri iptal et
+            for task in tasks:
+                task.cancel()
+        
+        verbs = [word for word in unknown_words if pos_hints[word] == POS_VERB]
+        nouns = [word for word in unknown_words if pos_hints[word] != POS_VERB]
+        
+        # Tamamlanan metni okuma geçmişine ekle (istek oturumu bu noktada kapanmış olabilir)
+        try:
+            session_id = await run_in_threadpool(record_reading, user_id, {
+                **reading, "verbs": verbs, "nouns": nouns, "word_meanings": word_meanings
+            })
+        except Exception:
+            logger.exception("Reading history save error")
+            session_id = None
+        
+        yield ndjson_line({"type": "done", "verbs": verbs, "nouns": nouns, "session_id": session_id})
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+# Okuma geçmişi endpoint'i (anahtar tabanlı sayfalama: before=<önceki sayfanın next_before değeri>)
+@app.get("/api/reading/history", response_class=FastJSONResponse)
+async def get_reading_history(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    before: Optional[int] = None,
+    limit: int = 20
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        return FastJSONResponse(get_history(db, user.id, before=before, limit=limit))
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Reading history error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Geçmişteki bir metni yeniden açma endpoint'i (dış servise gitmeden, depodan)
+@app.get("/api/reading/history/{session_id}", response_class=FastJSONResponse)
+async def get_reading_history_entry(
+    session_id: int,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        reading = load_reading(db, user.id, session_id)
+        if reading is None:
+            raise HTTPException(status_code=404, detail="Okuma kaydı bulunamadı")
+        
+        return FastJSONResponse(reading)
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Reading history entry error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Dil algılama endpoint'i
+@app.post("/api/reading/detect-language")
+async def detect_language(
+    text_data: dict,
+    token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Kullanıcı doğrulama
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        
+        if "text" not in text_data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Metin alanı gereklidir"
+            )
+        
+        text = text_data["text"]
+        with_confidence = bool(text_data.get("with_confidence", False))
+        
+        # Dil algılama (deterministik ve önbellekli)
+        return await run_in_threadpool(language_detection.detect_language, text, with_confidence)
+        
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Language detection error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Toplu dil algılama endpoint'i
+@app.post("/api/reading/detect-language/batch")
+async def detect_language_batch(
+    text_data: dict,
+    token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Kullanıcı doğrulama
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        
+        texts = text_data.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Metin listesi (texts) gereklidir"
+            )
+        
+        if len(texts) > MAX_DETECT_BATCH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tek istekte en fazla {MAX_DETECT_BATCH} metin gönderilebilir"
+            )
+        
+        with_confidence = bool(text_data.get("with_confidence", False))
+        
+        # Önbellekte olmayan metinler büyük gruplarda süreç havuzunda algılanır
+        results = await run_in_threadpool(language_detection.detect_languages, texts, with_confidence)
+        
+        return {"results": results}
+        
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Batch language detection error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Benzer kelimeler endpoint'i (okuma metnindeki kelime listesi tek toplu sorguda)
+@app.post("/api/words/related")
+async def get_related_words(
+    data: WordListRequest,
+    token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Kullanıcı doğrulama
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        
+        index = check_embedding_request(data)
+        with metrics.timed("embedding_search"):
+            related = await run_in_threadpool(index.related_words, data.words, data.count)
+        
+        return {"related": related}
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Related words error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Test soruları için çeldirici kelimeler endpoint'i
+@app.post("/api/words/distractors")
+async def get_distractors(
+    data: WordListRequest,
+    token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Kullanıcı doğrulama
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        
+        index = check_embedding_request(data)
+        with metrics.timed("embedding_search"):
+            distractors = await run_in_threadpool(index.distractors, data.words, data.count)
+        
+        return {"distractors": distractors}
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Distractors error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+def check_embedding_request(data):
+    """İstek sınırlarını doğrular ve kelime vektörü indeksini döndürür"""
+    if len(data.words) > MAX_EMBEDDING_WORDS or not 1 <= data.count <= MAX_EMBEDDING_COUNT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek istekte en fazla {MAX_EMBEDDING_WORDS} kelime ve kelime başına 1-{MAX_EMBEDDING_COUNT} öneri istenebilir"
+        )
+    index = embeddings.get_index()
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Kelime vektörleri yüklü değil"
+        )
+    return index
+
+# Kelime defterine toplu kelime ekleme endpoint'i
+@app.post("/api/vocabulary")
+async def add_vocabulary(
+    data: VocabularyBulkCreate,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        if data.language not in language_packs.PACK_SPECS:
+            raise HTTPException(status_code=400, detail=f"Desteklenmeyen dil: {data.language}")
+        pack = language_packs.get_pack(data.language)
+        
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        rows = {}
+        for item in data.words:
+            # Kelime sözlük biçimiyle saklanır (reúne ve reunieron tek kayıt)
+            word = pack.lemma(item.word.strip()) if item.word.strip() else ""
+            if word and word not in rows:
+                rows[word] = {
+                    "user_id": user.id,
+                    "language": data.language,
+                    "word": word,
+                    "meaning": item.meaning,
+                    "ease_factor": 2.5,
+                    "interval": 0,
+                    "repetitions": 0,
+                    "due_at": now,
+                    "created_at": now
+                }
+        
+        # Zaten kayıtlı kelimeler (user_id, language, word) benzersiz indeksinde atlanır
+        # SQLite parametre sınırını aşmamak için parçalar halinde tek işlemde ekle
+        added = 0
+        values = list(rows.values())
+        for offset in range(0, len(values), VOCABULARY_INSERT_CHUNK):
+            result = db.execute(
+                sqlite_insert(UserWord).values(values[offset:offset + VOCABULARY_INSERT_CHUNK]).on_conflict_do_nothing(
+                    index_elements=["user_id", "language", "word"]
+                )
+            )
+            added += result.rowcount
+        db.commit()
+        
+        # Anlamı girilmemiş kelimelerin çevirileri arka planda önbelleğe alınır
+        missing = [word for word, row in rows.items() if not row["meaning"]]
+        if missing:
+            jobs.enqueue("translation.prefetch", {"words": missing, "language": data.language},
+                         priority=jobs.PRIORITY_LOW, local=True)
+        
+        return {"added": added, "skipped": len(rows) - added}
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Vocabulary add error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Tekrar zamanı gelmiş kartları getiren endpoint
+@app.get("/api/vocabulary/due", response_model=List[VocabularyCardResponse], response_class=FastJSONResponse)
+async def get_due_vocabulary(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    limit: int = 20
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        # (user_id, due_at) indeksi üzerinde tek bir aralık taraması
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        cards = db.query(
+            UserWord.id,
+            UserWord.language,
+            UserWord.word,
+            UserWord.meaning,
+            UserWord.ease_factor,
+            UserWord.interval,
+            UserWord.repetitions,
+            UserWord.due_at
+        ).filter(
+            UserWord.user_id == user.id,
+            UserWord.due_at <= now
+        ).order_by(UserWord.due_at).limit(max(1, min(limit, 100))).all()
+        
+        return FastJSONResponse(rows_to_dicts(cards))
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Vocabulary due error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Tekrar sonucunu kaydetme endpoint'i
+@app.post("/api/vocabulary/{word_id}/review", response_model=VocabularyCardResponse)
+async def review_vocabulary(
+    word_id: int,
+    review: ReviewCreate,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        # Token'dan kullanıcı kimliğini çıkarma
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username = payload.get("sub")
+        
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
+        if not 0 <= review.quality <= MAX_QUALITY:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Puan 0 ile {MAX_QUALITY} arasında olmalıdır"
+            )
+        
+        card = db.query(UserWord).filter(UserWord.id == word_id, UserWord.user_id == user.id).first()
+        if not card:
+            raise HTTPException(status_code=404, detail="Kelime bulunamadı")
+        
+        # SM-2 ile bir sonraki tekrar zamanını hesapla
+        now = datetime.now()
+        card.repetitions, card.interval, card.ease_factor = sm2(
+            review.quality, card.repetitions, card.interval, card.ease_factor
+        )
+        card.due_at = next_due(card.interval, now)
+        card.last_reviewed_at = now.strftime(DATETIME_FORMAT)
+        db.commit()
+        db.refresh(card)
+        
+        return card
+    
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz kimlik bilgileri",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Vocabulary review error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Sunucu hatası: {str(e)}"
+        )
+
+# Google Translate API için (ücretli)
+# from googletrans import Translator
+
+# Basit çeviri fonksiyonu - gerçek uygulamada API kullanılmalı
+def translate_word(word, source_lang="es", target_lang="tr"):
+    # Google Translate API yerine dil paketinin yerleşik sözlüğü
+    if source_lang not in language_packs.PACK_SPECS or target_lang != "tr":
+        return "Çeviri bulunamadı"
+    
+    # Kelimeyi küçük harfe çevirip temizle
+    word = word.lower().strip('.,;:!?()[]{}"\'-')
+    
+    # Sözlükte varsa çevirisini döndür (çekimli biçim yoksa sözlük biçimine bakılır)
+    return language_packs.get_pack(source_lang).translate_offline(word) or "Çeviri bulunamadı"
+
+def translate_words(words, source_lang="es", target_lang="tr"):
+    """Kelime listesini sırasıyla çevirir"""
+    return [translate_word_api(word, source_lang=source_lang, target_lang=target_lang) for word in words]
+
+@jobs.handler("translation.prefetch")
+def prefetch_translations(payload):
+    # Çeviri önbelleği süreç içinde olduğu için yalnızca yerel kuyruktan çalışır
+    translate_words(payload["words"], payload["language"], "tr")
+    return {"words": len(payload["words"])}
+
+def translate_word_api(word, source_lang="es", target_lang="tr"):
+    """API ile kelime çevirisi yap"""
+    # Önbellek anahtarı sözlük biçimi: aynı fiilin çekimleri (reúne, reunieron) tek kayıt
+    if source_lang in language_packs.PACK_SPECS:
+        query = language_packs.get_pack(source_lang).lemma(word)
+    else:
+        query = word.lower()
+    
+    # Önbellekte varsa oradan al
+    cache_key = f"{query}_{source_lang}_{target_lang}"
+    if cache_key in translation_cache:
+        metrics.record_cache("translation", True)
+        return translation_cache[cache_key]
+    metrics.record_cache("translation", False)
+    
+    # Zaten çevirisini bildiğimiz kelimeleri kontrol et
     known_translations = {
         "animales": "hayvanlar",
         "constituyen": "oluşturur",
@@ -866,14 +2367,12 @@ def translate_word_api(word, source_lang="es", target_lang="tr"):
     if word.lower() in known_translations:
         return known_translations[word.lower()]
     
-    # API'ye bağlan
+    # API'ye bağlan (zaman aşımı, devre kesici ve hata sayımı outbound katmanında)
     try:
-        conn = http.client.HTTPSConnection(RAPIDAPI_HOST)
-        
         # Gerçek bir çeviri servisi URL'si - örnek: Google Translate URL'si
         # Bu örnek yapmacık bir URL; gerçek implementasyonda bu URL'yi bir çeviri
         # servisinin URL'si ile değiştirmeniz gerekecek
-        target_url = f"https://translate.google.com/?sl={source_lang}&tl={target_lang}&text={word}"
+        target_url = f"https://translate.google.com/?sl={source_lang}&tl={target_lang}&text={query}"
         
         payload = json.dumps({
             "method": "GET",
@@ -890,10 +2389,8 @@ def translate_word_api(word, source_lang="es", target_lang="tr"):
             'Content-Type': "application/json"
         }
         
-        conn.request("POST", "/js", payload, headers)
-        
-        res = conn.getresponse()
-        data = res.read().decode("utf-8")
+        res = outbound.translation.post(f"{TRANSLATION_API_URL}/js", data=payload, headers=headers)
+        data = res.text
         
         # Burada data içindeki çeviriyi çıkaran bir parser yazmanız gerekecek
         # Örnek: data içinde "<span class='result'>çeviri</span>" şeklinde bir yapı varsa
@@ -901,9 +2398,10 @@ def translate_word_api(word, source_lang="es", target_lang="tr"):
         # Gerçek uygulamada scraping yapacak kod eklenmelidir
         result = "API çevirisi"
         
-    except Exception as e:
-        print(f"Çeviri API hatası: {str(e)}")
-        result = "Çeviri bulunamadı"
+    except OutboundError as e:
+        # Servis yok ya da devre açık: çevrimdışı sözlüğe düş, sonucu önbelleğe alma
+        logger.warning("Çeviri API hatası", extra={"fields": {"word": word, "error": str(e)}})
+        return translate_word(word, source_lang, target_lang)
     
     # Önbelleğe ekle ve döndür
     translation_cache[cache_key] = result
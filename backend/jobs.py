@@ -0,0 +1,421 @@
+"""Arka plan iş kuyruğu.
+
+İstek işleyicilerinde beklemesi gerekmeyen işler (öneri hesaplama,
+önbellek ısıtma, dışa aktarım dosyaları) kuyruğa eklenir ve worker iş
+parçacıklarında çalışır. Desteklenenler:
+
+- öncelik: küçük değer önce çalışır (PRIORITY_HIGH / NORMAL / LOW),
+- yeniden deneme: hata veren iş üstel geri çekilme ve rastgele sapmayla
+  max_attempts kez denenir,
+- tekilleştirme: aynı dedup_key ile bekleyen ya da çalışan iş varsa yeni
+  iş eklenmez, mevcut işin kimliği döner,
+- zamanlama: delay / run_at ile ileri tarihli işler; repeat ile periyodik
+  işler (tamamlanınca aynı anahtarla, ilk zamanlandığı saate hizalı olarak
+  yeniden zamanlanır).
+
+İki kuyruk vardır:
+
+- yerel kuyruk: her zaman süreç içi bellekte; yalnızca bu sürecin
+  önbelleklerini ısıtan işler için (local=True),
+- kalıcı kuyruk: JOB_BACKEND=memory (varsayılan) ise bellekte,
+  JOB_BACKEND=sqlite ise `background_jobs` tablosunda. SQLite kuyruğunu
+  ayrı bir worker süreci de işleyebilir:
+
+      JOB_BACKEND=sqlite JOB_EXTERNAL_WORKER=1 uvicorn ...   (uygulama yalnızca ekler)
+      JOB_BACKEND=sqlite python -m backend.jobs --workers 2   (ayrı worker)
+
+İş işleyicileri @handler("tür") ile kaydedilir; yükler JSON'a
+çevrilebilir olmalıdır. Uygulamanın açılışında start(), kapanışında
+stop() çağrılır.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from . import metrics
+from .database import engine, init_db, BackgroundJob
+from .srs import DATETIME_FORMAT
+
+logger = logging.getLogger(__name__)
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")  # memory, sqlite
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Süreç içi worker iş parçacığı sayısı
+# Kalıcı kuyruk ayrı bir worker sürecinde işleniyorsa uygulama yalnızca yerel işleri çalıştırır
+JOB_EXTERNAL_WORKER = os.getenv("JOB_EXTERNAL_WORKER", "0") == "1"
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 600.0
+POLL_INTERVAL = 1.0  # SQLite kuyruğunda yeni iş kontrol aralığı (sn)
+LOCK_SECONDS = 600.0  # Çalışan işin kilidi; worker çökerse iş bu süreden sonra yeniden alınır
+MAX_FINISHED_JOBS = 1000  # Bellek kuyruğunda durumu sorgulanabilen biten iş sayısı
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """İş türü için işleyici kaydeder; işleyici yükü (sözlük) alır, sonucu JSON'a çevrilebilir olmalı"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def retry_delay(attempts):
+    """attempts. denemeden sonra bekleme süresi (üstel, %50'ye kadar rastgele kısaltılır)"""
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return delay * (0.5 + random.random() / 2)
+
+
+def next_repeat_at(job, now):
+    """Periyodik işin bir sonraki çalışma anı: planlanan zamandan `repeat_seconds` adımlarla ilk gelecek an.
+
+    Bitiş anına eklenmez; böylece işin süresi ya da worker'ın gecikmesi
+    zamanlamayı her turda kaydırmaz (gece 03:00'te başlayan iş 03:00'te kalır).
+    """
+    run_at = job.run_at + job.repeat_seconds
+    if run_at <= now:
+        run_at += ((now - run_at) // job.repeat_seconds + 1) * job.repeat_seconds
+    return run_at
+
+
+class Job:
+    __slots__ = ("id", "kind", "payload", "priority", "status", "dedup_key", "attempts", "max_attempts",
+                 "repeat_seconds", "run_at", "last_error", "result")
+
+    def __init__(self, id, kind, payload, priority, run_at, dedup_key=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 repeat_seconds=None, status=QUEUED, attempts=0, last_error=None, result=None):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.priority = priority
+        self.status = status
+        self.dedup_key = dedup_key
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.repeat_seconds = repeat_seconds
+        self.run_at = run_at
+        self.last_error = last_error
+        self.result = result
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "run_at": datetime.fromtimestamp(self.run_at).strftime(DATETIME_FORMAT),
+            "last_error": self.last_error,
+            "result": self.result,
+        }
+
+
+class MemoryQueue:
+    """Süreç içi kuyruk: zamanı gelmemiş işler run_at'e, hazır işler önceliğe göre yığında"""
+
+    def __init__(self, wake):
+        self._wake = wake
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._scheduled = []  # (run_at, id)
+        self._ready = []      # (öncelik, id)
+        self._jobs = {}
+        self._active_keys = {}  # dedup_key -> iş kimliği
+        self._finished = deque()
+
+    def enqueue(self, kind, payload, priority, run_at, dedup_key, max_attempts, repeat_seconds):
+        with self._lock:
+            if dedup_key is not None and dedup_key in self._active_keys:
+                return self._active_keys[dedup_key]
+            job = Job(next(self._ids), kind, payload, priority, run_at, dedup_key, max_attempts, repeat_seconds)
+            self._jobs[job.id] = job
+            if dedup_key is not None:
+                self._active_keys[dedup_key] = job.id
+            heapq.heappush(self._scheduled, (run_at, job.id))
+        self._wake.set()
+        return job.id
+
+    def claim(self, now):
+        with self._lock:
+            while self._scheduled and self._scheduled[0][0] <= now:
+                _, job_id = heapq.heappop(self._scheduled)
+                heapq.heappush(self._ready, (self._jobs[job_id].priority, job_id))
+            if not self._ready:
+                return None
+            _, job_id = heapq.heappop(self._ready)
+            job = self._jobs[job_id]
+            job.status = RUNNING
+            job.attempts += 1
+            return job
+
+    def finish(self, job, now, result=None, error=None):
+        """İşi tamamlar; hata varsa deneme hakkı kaldıkça yeniden zamanlar. Yeni durumu döndürür"""
+        with self._lock:
+            if error is not None and job.attempts < job.max_attempts:
+                job.status, job.last_error = QUEUED, error
+                job.run_at = now + retry_delay(job.attempts)
+                heapq.heappush(self._scheduled, (job.run_at, job.id))
+                return QUEUED
+            job.status = DONE if error is None else FAILED
+            job.last_error, job.result = error, result
+            if job.dedup_key is not None:
+                self._active_keys.pop(job.dedup_key, None)
+            self._finished.append(job.id)
+            while len(self._finished) > MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.popleft(), None)
+        if job.repeat_seconds:
+            self.enqueue(job.kind, job.payload, job.priority, next_repeat_at(job, now), job.dedup_key,
+                         job.max_attempts, job.repeat_seconds)
+        return job.status
+
+    def next_run_at(self):
+        with self._lock:
+            if self._ready:
+                return 0.0
+            return self._scheduled[0][0] if self._scheduled else None
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.as_dict() if job else None
+
+
+class SqliteQueue:
+    """`background_jobs` tablosu üzerinde kalıcı kuyruk; birden çok süreç aynı anda iş alabilir.
+
+    İş alma koşullu bir UPDATE ile yapılır: aynı işi iki worker seçerse
+    yalnızca birinin güncellemesi satırı etkiler.
+    """
+
+    def __init__(self):
+        init_db()
+        self.table = BackgroundJob.__table__
+
+    def enqueue(self, kind, payload, priority, run_at, dedup_key, max_attempts, repeat_seconds):
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        with engine.begin() as conn:
+            result = conn.execute(
+                sqlite_insert(self.table).values(
+                    kind=kind, payload=json.dumps(payload, ensure_ascii=False), priority=priority, status=QUEUED,
+                    dedup_key=dedup_key, attempts=0, max_attempts=max_attempts, repeat_seconds=repeat_seconds,
+                    run_at=run_at, created_at=now, updated_at=now
+                ).on_conflict_do_nothing(index_elements=["dedup_key"])
+            )
+            if result.rowcount:
+                return result.inserted_primary_key[0]
+            return conn.execute(select(self.table.c.id).where(self.table.c.dedup_key == dedup_key)).scalar()
+
+    def claim(self, now):
+        t = self.table
+        claimable = ((t.c.status == QUEUED) & (t.c.run_at <= now)) | ((t.c.status == RUNNING) & (t.c.locked_until < now))
+        for _ in range(3):
+            with engine.begin() as conn:
+                row = conn.execute(
+                    select(t).where(claimable).order_by(t.c.priority, t.c.run_at, t.c.id).limit(1)
+                ).first()
+                if row is None:
+                    return None
+                claimed = conn.execute(
+                    t.update()
+                    .where(t.c.id == row.id, t.c.status == row.status, t.c.attempts == row.attempts)
+                    .values(status=RUNNING, attempts=row.attempts + 1, locked_until=now + LOCK_SECONDS,
+                            updated_at=datetime.now().strftime(DATETIME_FORMAT))
+                ).rowcount
+            if claimed:
+                return Job(row.id, row.kind, json.loads(row.payload), row.priority, row.run_at, row.dedup_key,
+                           row.max_attempts, row.repeat_seconds, RUNNING, row.attempts + 1)
+        return None
+
+    def finish(self, job, now, result=None, error=None):
+        t = self.table
+        values = {"last_error": error, "locked_until": None, "updated_at": datetime.now().strftime(DATETIME_FORMAT)}
+        if error is not None and job.attempts < job.max_attempts:
+            values.update(status=QUEUED, run_at=now + retry_delay(job.attempts))
+        else:
+            values.update(status=DONE if error is None else FAILED, dedup_key=None,
+                          result=json.dumps(result, ensure_ascii=False) if result is not None else None)
+        with engine.begin() as conn:
+            conn.execute(t.update().where(t.c.id == job.id).values(**values))
+        if values["status"] != QUEUED and job.repeat_seconds:
+            self.enqueue(job.kind, job.payload, job.priority, next_repeat_at(job, now), job.dedup_key,
+                         job.max_attempts, job.repeat_seconds)
+        return values["status"]
+
+    def next_run_at(self):
+        t = self.table
+        with engine.connect() as conn:
+            return conn.execute(select(func.min(t.c.run_at)).where(t.c.status == QUEUED)).scalar()
+
+    def get(self, job_id):
+        with engine.connect() as conn:
+            row = conn.execute(select(self.table).where(self.table.c.id == job_id)).first()
+        if row is None:
+            return None
+        return Job(row.id, row.kind, None, row.priority, row.run_at, status=row.status, attempts=row.attempts,
+                   last_error=row.last_error, result=json.loads(row.result) if row.result else None).as_dict()
+
+
+class Worker:
+    """Kuyrukları sırayla yoklayan worker iş parçacıkları (önce yerel kuyruk)"""
+
+    def __init__(self, queues, wake, threads=JOB_WORKERS):
+        self.queues = queues
+        self.wake = wake
+        self.threads = threads
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self.wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _wait_seconds(self):
+        wait = POLL_INTERVAL
+        for queue in self.queues:
+            if isinstance(queue, MemoryQueue):
+                run_at = queue.next_run_at()
+                if run_at is not None:
+                    wait = min(wait, max(run_at - time.time(), 0.0))
+        return wait
+
+    def _run(self):
+        while not self._stopping.is_set():
+            job = None
+            try:
+                for queue in self.queues:
+                    job = queue.claim(time.time())
+                    if job is not None:
+                        self.execute(queue, job)
+                        break
+            except Exception:
+                # Kuyruk hatası (ör. veritabanı kilidi) worker'ı durdurmaz
+                logger.exception("Job queue error")
+            if job is None:
+                self.wake.wait(self._wait_seconds())
+                self.wake.clear()
+
+    @staticmethod
+    def execute(queue, job):
+        func = HANDLERS.get(job.kind)
+        result = error = None
+        try:
+            if func is None:
+                raise LookupError(f"Bilinmeyen iş türü: {job.kind}")
+            with metrics.timed(f"job:{job.kind}"):
+                result = func(job.payload)
+        except Exception as e:
+            logger.warning("Job failed", exc_info=True,
+                           extra={"fields": {"job_id": job.id, "kind": job.kind, "attempt": job.attempts}})
+            error = f"{type(e).__name__}: {e}"
+        outcome = queue.finish(job, time.time(), result, error)
+        metrics.inc("jobs_total", kind=job.kind, outcome="retry" if outcome == QUEUED else outcome)
+
+
+_wake = threading.Event()
+_local_queue = MemoryQueue(_wake)
+_durable_queue = None
+_durable_lock = threading.Lock()
+_worker = None
+
+
+def durable_queue():
+    global _durable_queue
+    if _durable_queue is None:
+        with _durable_lock:
+            if _durable_queue is None:
+                _durable_queue = SqliteQueue() if JOB_BACKEND == "sqlite" else MemoryQueue(_wake)
+    return _durable_queue
+
+
+def enqueue(kind, payload=None, priority=PRIORITY_NORMAL, delay=0.0, run_at=None, dedup_key=None,
+            max_attempts=DEFAULT_MAX_ATTEMPTS, repeat=None, local=False):
+    """İşi kuyruğa ekler ve kimliğini döndürür (aynı dedup_key ile bekleyen iş varsa onun kimliği)"""
+    queue = _local_queue if local else durable_queue()
+    run_at = run_at if run_at is not None else time.time() + delay
+    return queue.enqueue(kind, payload or {}, priority, run_at, dedup_key, max_attempts, repeat)
+
+
+def schedule_periodic(kind, interval, payload=None, priority=PRIORITY_LOW, delay=0.0):
+    """Periyodik iş: `interval` saniyede bir; türe göre tekilleştirildiği için birden çok kez çağrılabilir"""
+    return enqueue(kind, payload, priority=priority, delay=delay, dedup_key=f"periodic:{kind}", repeat=interval)
+
+
+def get_job(job_id):
+    """Kalıcı kuyruktaki işin durumu; bulunamazsa None"""
+    return durable_queue().get(job_id)
+
+
+def start(threads=JOB_WORKERS, external=JOB_EXTERNAL_WORKER):
+    """Uygulama açılışında worker iş parçacıklarını başlatır"""
+    global _worker
+    if _worker is not None or threads <= 0:
+        return
+    queues = [_local_queue] if external else [_local_queue, durable_queue()]
+    _worker = Worker(queues, _wake, threads)
+    _worker.start()
+
+
+def stop(timeout=5.0):
+    """Worker'ları durdurur; çalışan işlerin bitmesi en fazla `timeout` sn beklenir"""
+    global _worker
+    if _worker is not None:
+        _worker.stop(timeout)
+        _worker = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kalıcı iş kuyruğu worker süreci (JOB_BACKEND=sqlite)")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args()
+    if JOB_BACKEND != "sqlite":
+        parser.error("Ayrı worker süreci için JOB_BACKEND=sqlite gerekir")
+
+    # İş işleyicilerini ve periyodik işleri kaydet
+    from . import tasks
+    tasks.schedule_periodic_jobs()
+
+    worker = Worker([durable_queue()], _wake, args.workers)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    worker.start()
+    print(f"{args.workers} worker çalışıyor (durdurmak için Ctrl+C)")
+    try:
+        while not stopping.is_set():
+            stopping.wait(1.0)
+    except KeyboardInterrupt:
+        pass
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Deterministik ve önbellekli dil algılama.
+
+langdetect profillerini tembel yükler ve rastgele örnekleme yaptığı için
+aynı metne farklı sonuç verebilir. Bu modül profilleri açılışta yükler,
+algılamayı sabit bir tohumla yapar, sonuçları metin hash'ine göre sınırlı
+bir LRU önbellekte tutar ve büyük toplu istekleri bir süreç havuzunda
+çalıştırır.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from langdetect import DetectorFactory, detect_langs
+from langdetect.detector_factory import init_factory
+from langdetect.lang_detect_exception import LangDetectException
+
+from . import metrics
+
+DETECTION_SEED = 0
+UNKNOWN_LANGUAGE = "unknown"
+
+CACHE_SIZE = 4096
+# Bu sayıdan az önbellek dışı metin içeren toplu istekler süreç havuzuna gönderilmez
+PROCESS_POOL_MIN_BATCH = 16
+MAX_WORKERS = int(os.getenv("LANGDETECT_WORKERS", "2"))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def warm_up():
+    """Tohumu sabitler ve dil profillerini yükler"""
+    DetectorFactory.seed = DETECTION_SEED
+    init_factory()
+
+
+def _detect_uncached(text):
+    try:
+        best = detect_langs(text)[0]
+        return {"language": best.lang, "confidence": round(best.prob, 4)}
+    except LangDetectException:
+        return {"language": UNKNOWN_LANGUAGE, "confidence": 0.0}
+
+
+def _cache_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+    metrics.record_cache("language_detection", result is not None)
+    return result
+
+
+def _cache_put(key, result):
+    with _cache_lock:
+        _cache[key] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=warm_up)
+    return _pool
+
+
+def shutdown():
+    """Süreç havuzunu kapatır"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _format(result, with_confidence):
+    return dict(result) if with_confidence else {"language": result["language"]}
+
+
+def detect_language(text, with_confidence=False):
+    """Tek bir metnin dilini algılar"""
+    key = _cache_key(text)
+    result = _cache_get(key)
+    if result is None:
+        result = _detect_uncached(text)
+        _cache_put(key, result)
+    return _format(result, with_confidence)
+
+
+def detect_languages(texts, with_confidence=False):
+    """Metin listesinin dillerini girdi sırasıyla algılar"""
+    results = [None] * len(texts)
+    pending = OrderedDict()  # hash -> (metin, sonuç indeksleri)
+
+    for i, text in enumerate(texts):
+        key = _cache_key(text)
+        result = _cache_get(key)
+        if result is not None:
+            results[i] = result
+        else:
+            pending.setdefault(key, (text, []))[1].append(i)
+
+    if pending:
+        unique_texts = [text for text, _ in pending.values()]
+        if len(unique_texts) >= PROCESS_POOL_MIN_BATCH:
+            chunksize = max(1, len(unique_texts) // (MAX_WORKERS * 4))
+            detected = list(_get_pool().map(_detect_uncached, unique_texts, chunksize=chunksize))
+        else:
+            detected = [_detect_uncached(text) for text in unique_texts]
+
+        for (key, (_, indices)), result in zip(pending.items(), detected):
+            _cache_put(key, result)
+            for i in indices:
+                results[i] = result
+
+    return [_format(result, with_confidence) for result in results]
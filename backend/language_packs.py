@@ -0,0 +1,371 @@
+"""Dil paketleri: okuma hattının dile özgü kaynakları.
+
+Her paket bir dilin kaynaklarını bir arada tutar: durdurma kelimeleri,
+temel kelime kümesi, tokenizasyon kuralları (kesme işaretiyle ayrılan
+ekler), çevrimdışı sözlük (hedef dil Türkçe), kelime sıklığı indeksi
+(word_rank biçiminde, mmap) ve biçim çözümleyici. İspanyolca için
+çözümleyici kural tabanlı morphology modülü; diğer dillerde varsa aynı
+biçimdeki önceden hesaplanmış tablo kullanılır.
+
+Paket tanımları (PACK_SPECS) yalnızca sabit verilerdir; kaynaklar bir
+worker'da dilin ilk kullanımında yüklenir, böylece yeni dil eklemek
+açılış süresini ve bellek kullanımını artırmaz. Yüklü paketlerin tahmini
+bellek kullanımı izlenir (mmap ile açılan diziler işletim sisteminin
+sayfa önbelleğinde paylaşıldığı için sayılmaz). Toplam PACK_MEMORY_LIMIT
+sınırını aşarsa ya da bir paket PACK_IDLE_SECONDS boyunca kullanılmazsa en
+uzun süredir kullanılmayan paketler bırakılır; varsayılan dil bırakılmaz.
+
+Diğer diller için kaynak dosyaları (backend/data altında, hepsi isteğe bağlı):
+- {dil}_word_rank.*.npy: python -m backend.word_rank liste.txt --out backend/data/{dil}_word_rank
+- {dil}_morphology.*.npy: python -m backend.morphology --language {dil} --lemmas liste.txt
+- {dil}_tr_dictionary.json: {"kelime": "çeviri", ...}
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from . import metrics, morphology, word_rank
+from .morphology import Analysis, MorphologyTable, POS_NOUN
+from .text_analysis import BASIC_SPANISH_WORDS, analyze_text, tokenize
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_LANGUAGE = "es"
+
+PACK_MEMORY_LIMIT = int(os.getenv("LANGUAGE_PACK_MEMORY_MB", "128")) * 1024 * 1024
+PACK_IDLE_SECONDS = float(os.getenv("LANGUAGE_PACK_IDLE_SECONDS", "1800"))
+
+
+class LanguageSpec(NamedTuple):
+    code: str
+    name: str                       # Arayüzde gösterilen Türkçe ad
+    stopwords_name: str             # NLTK durdurma kelimesi listesi
+    basic_words: frozenset          # Bilinmeyen kelime seçiminde atlanan temel kelimeler
+    elisions: frozenset             # Kesme işaretiyle ayrılıp atılan parçalar (l'homme -> homme)
+    dictionary: Dict[str, str]      # Yerleşik çevrimdışı sözlük
+    topics: Dict[str, Tuple[str, ...]]  # Seviye -> Wikipedia konu başlıkları
+
+
+ES_DICTIONARY = {
+    "animales": "hayvanlar",
+    "constituyen": "oluşturur",
+    "reino": "krallık",
+    "seres": "varlıklar",
+    "vivos": "canlı",
+    "eucariotas": "ökaryot",
+    "heterótrofos": "heterotrof",
+    "pluricelulares": "çok hücreli",
+    "tisulares": "dokusal",
+    "poríferos": "süngerler",
+    "capacidad": "kapasite",
+    "movimiento": "hareket",
+    "cloroplasto": "kloroplast",
+    "excepciones": "istisnalar",
+    "chlorotica": "klorotik",
+    "celular": "hücresel",
+    "desarrollo": "gelişim",
+    "embrionario": "embriyonik",
+    "blástula": "blastula",
+    "determina": "belirler",
+    "plan": "plan",
+    "corporal": "vücut",
+    # Fiiller
+    "reúne": "toplar",
+    "caracterizan": "karakterize eder",
+    "tener": "sahip olmak",
+    "atraviesa": "geçer"
+}
+
+PACK_SPECS = {
+    "es": LanguageSpec(
+        code="es",
+        name="İspanyolca",
+        stopwords_name="spanish",
+        basic_words=BASIC_SPANISH_WORDS,
+        elisions=frozenset(),
+        dictionary=ES_DICTIONARY,
+        topics={
+            "a1": ("Familia", "Casa", "Comida", "Color", "Animal", "Número", "Día", "Mes", "Hora", "Fruta"),
+            "a2": ("Deporte", "Escuela", "Música", "Tiempo", "Salud", "Ropa", "Viaje", "Restaurante",
+                   "Compras", "Hobby"),
+            "b1": ("Historia de España", "Geografía de España", "Cultura de México", "Turismo en España",
+                   "Gastronomía española", "Deportes en España", "Parques nacionales", "Fiestas populares",
+                   "Tradiciones", "Música española"),
+            "b2": ("Literatura española", "Arte español", "Cine español", "Política de España",
+                   "Medio ambiente", "Sociedad española", "Educación en España", "Historia de México",
+                   "Cocina latinoamericana", "Religión en España"),
+            "c1": ("Filosofía española", "Ciencia en España", "Economía de España", "Arquitectura española",
+                   "Literatura latinoamericana", "Historia del arte español", "Política internacional española",
+                   "Empresas españolas", "Sistema político español", "Derecho español"),
+            "c2": ("Arqueología en España", "Lingüística española", "Antropología española",
+                   "Historia de la filosofía española", "Economía global", "Política latinoamericana",
+                   "Corrientes literarias españolas", "Movimientos artísticos españoles", "Crítica social",
+                   "Academia española"),
+        },
+    ),
+    "en": LanguageSpec(
+        code="en",
+        name="İngilizce",
+        stopwords_name="english",
+        basic_words=frozenset("""
+            the a an and or but because as what who when where why how for to with without in on at of
+            from by is are was were be been being have has had do does did go come see hear say speak
+            eat drink sleep live work study yes no not maybe today yesterday tomorrow now then after
+            before always never all nothing much many little more less well bad good this that these
+            those it he she they we you i my your his her their our there here don doesn didn isn
+            aren wasn weren won can couldn wouldn shouldn haven hasn
+        """.split()),
+        elisions=frozenset({"s", "t", "ll", "re", "ve", "d", "m"}),
+        dictionary={},
+        topics={
+            "a1": ("Family", "House", "Food", "Colour", "Animal", "Number", "Day", "Month", "Fruit", "Dog"),
+            "a2": ("Sport", "School", "Music", "Weather", "Health", "Clothing", "Travel", "Restaurant",
+                   "Shopping", "Hobby"),
+            "b1": ("History of England", "Geography of the United Kingdom", "Culture of Australia",
+                   "Tourism in the United States", "British cuisine", "National park", "Festival",
+                   "Tradition", "Football", "Rock music"),
+            "b2": ("English literature", "Art of the United Kingdom", "Cinema of the United States",
+                   "Politics of the United Kingdom", "Environmentalism", "Education in England",
+                   "History of Canada", "Religion in the United Kingdom", "Industrial Revolution",
+                   "Victorian era"),
+            "c1": ("British philosophy", "Science in the United Kingdom", "Economy of the United Kingdom",
+                   "Gothic Revival architecture", "American literature", "Common law",
+                   "Foreign relations of the United States", "Constitution of the United Kingdom",
+                   "Scientific method", "Enlightenment in Scotland"),
+            "c2": ("Archaeology of the United Kingdom", "Linguistics", "Anthropology", "Epistemology",
+                   "Globalization", "Literary modernism", "Postmodernism", "Critical theory",
+                   "Philosophy of language", "Political economy"),
+        },
+    ),
+    "de": LanguageSpec(
+        code="de",
+        name="Almanca",
+        stopwords_name="german",
+        basic_words=frozenset("""
+            der die das den dem des ein eine einen einem einer und oder aber weil wie was wer wann wo
+            warum für mit ohne in im an am auf aus von zu zum zur bei ist sind war waren sein haben hat
+            hatte werden wird machen gehen kommen sehen hören sagen sprechen essen trinken schlafen
+            leben arbeiten lernen ja nein nicht vielleicht heute gestern morgen jetzt dann nach vor
+            immer nie alles nichts viel wenig mehr weniger gut schlecht ich du er sie es wir ihr
+        """.split()),
+        elisions=frozenset(),
+        dictionary={},
+        topics={
+            "a1": ("Familie", "Haus", "Essen", "Farbe", "Tier", "Zahl", "Tag", "Monat", "Obst", "Hund"),
+            "a2": ("Sport", "Schule", "Musik", "Wetter", "Gesundheit", "Kleidung", "Reise", "Restaurant",
+                   "Einkaufen", "Hobby"),
+            "b1": ("Geschichte Deutschlands", "Geographie Deutschlands", "Kultur Österreichs",
+                   "Tourismus in Deutschland", "Deutsche Küche", "Fußball in Deutschland", "Nationalpark",
+                   "Volksfest", "Brauchtum", "Musik in Deutschland"),
+            "b2": ("Deutsche Literatur", "Deutsche Kunst", "Deutscher Film", "Politisches System Deutschlands",
+                   "Umweltschutz", "Bildungssystem in Deutschland", "Geschichte der Schweiz",
+                   "Religion in Deutschland", "Weimarer Republik", "Deutsche Wiedervereinigung"),
+            "c1": ("Deutsche Philosophie", "Wissenschaft in Deutschland", "Wirtschaft Deutschlands",
+                   "Architektur in Deutschland", "Österreichische Literatur", "Grundgesetz",
+                   "Außenpolitik Deutschlands", "Föderalismus in Deutschland", "Aufklärung", "Romantik"),
+            "c2": ("Archäologie", "Sprachwissenschaft", "Ethnologie", "Erkenntnistheorie", "Globalisierung",
+                   "Expressionismus", "Frankfurter Schule", "Kritische Theorie", "Sprachphilosophie",
+                   "Politische Ökonomie"),
+        },
+    ),
+    "fr": LanguageSpec(
+        code="fr",
+        name="Fransızca",
+        stopwords_name="french",
+        basic_words=frozenset("""
+            le la les un une des et ou mais parce que quoi qui quand où pourquoi comment pour avec sans
+            dans en sur à au aux de du par est sont était être avoir a ont faire aller venir voir
+            entendre dire parler manger boire dormir vivre travailler étudier oui non pas peut-être
+            aujourd hui hier demain maintenant puis après avant toujours jamais tout rien beaucoup peu
+            plus moins bien mal je tu il elle nous vous ils elles ce cette ces
+        """.split()),
+        elisions=frozenset({"l", "d", "j", "m", "n", "s", "t", "c", "qu", "jusqu", "lorsqu", "puisqu"}),
+        dictionary={},
+        topics={
+            "a1": ("Famille", "Maison", "Nourriture", "Couleur", "Animal", "Nombre", "Jour", "Mois",
+                   "Fruit", "Chien"),
+            "a2": ("Sport", "École", "Musique", "Météorologie", "Santé", "Vêtement", "Voyage", "Restaurant",
+                   "Shopping", "Loisir"),
+            "b1": ("Histoire de France", "Géographie de la France", "Culture du Québec", "Tourisme en France",
+                   "Cuisine française", "Sport en France", "Parc national", "Fête populaire", "Tradition",
+                   "Musique française"),
+            "b2": ("Littérature française", "Art français", "Cinéma français", "Politique en France",
+                   "Environnement", "Système éducatif français", "Histoire de la Belgique",
+                   "Religion en France", "Révolution française", "Belle Époque"),
+            "c1": ("Philosophie française", "Science en France", "Économie de la France",
+                   "Architecture en France", "Littérature francophone", "Code civil",
+                   "Politique étrangère de la France", "Constitution française du 4 octobre 1958",
+                   "Siècle des Lumières", "Existentialisme"),
+            "c2": ("Archéologie en France", "Linguistique", "Anthropologie", "Épistémologie",
+                   "Mondialisation", "Structuralisme", "Nouveau roman", "Théorie critique",
+                   "Philosophie du langage", "Économie politique"),
+        },
+    ),
+}
+
+SUPPORTED_LANGUAGES = tuple(PACK_SPECS)
+
+
+def _sizeof(value):
+    """Nesnenin yaklaşık bellek kullanımı (bayt); mmap dizileri sayılmaz"""
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items())
+    if isinstance(value, (set, frozenset)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _load_stopwords(name):
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words(name))
+    except (ImportError, LookupError, OSError):
+        return frozenset()
+
+
+def _load_dictionary(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {word.lower(): meaning for word, meaning in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def _load_word_rank(code):
+    if code == DEFAULT_LANGUAGE:
+        return word_rank.get_index()
+    try:
+        return word_rank.WordRankIndex.load(os.path.join(DATA_DIR, f"{code}_word_rank"))
+    except FileNotFoundError:
+        # Boş indeks: tüm kelimeler "listede yok" sayılır (İspanyolca indekse düşülmez)
+        return word_rank.WordRankIndex(np.array([], dtype="<U1"), np.array([], dtype=np.int32))
+
+
+def _load_morphology(code):
+    try:
+        return MorphologyTable.load(os.path.join(DATA_DIR, f"{code}_morphology"))
+    except FileNotFoundError:
+        return None
+
+
+class LanguagePack:
+    """Bir dilin yüklenmiş kaynakları"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.code = spec.code
+        self.basic_words = spec.basic_words | spec.elisions
+        # Özetlemede cümle benzerliğine katılmayan kelimeler
+        self.stopwords = _load_stopwords(spec.stopwords_name) | self.basic_words
+        self.dictionary = {**spec.dictionary, **_load_dictionary(os.path.join(DATA_DIR, f"{spec.code}_tr_dictionary.json"))}
+        self.word_rank = _load_word_rank(spec.code)
+        # İspanyolcada kural tabanlı çözümleyici kendi tablosunu ve önbelleğini yönetir
+        self.morphology = _load_morphology(spec.code) if spec.code != DEFAULT_LANGUAGE else None
+        self.memory_bytes = sum(_sizeof(value) for value in (
+            self.basic_words, self.stopwords, self.dictionary, self.morphology and self.morphology.verb_lemmas,
+        ))
+        self.last_used = time.monotonic()
+
+    @property
+    def name(self):
+        return self.spec.name
+
+    def topics(self, level):
+        return self.spec.topics.get(level, self.spec.topics["b1"])
+
+    def tokenize(self, text):
+        tokens = tokenize(text)
+        if not self.spec.elisions:
+            return tokens
+        return [token for token in tokens if token not in self.spec.elisions]
+
+    def analyze(self, word):
+        """Kelimenin (lemma, tür) çözümlemesi; tablo yoksa kelimenin kendisi, isim"""
+        if self.code == DEFAULT_LANGUAGE:
+            return morphology.analyze(word)
+        word = word.lower()
+        return (self.morphology and self.morphology.get(word)) or Analysis(word, POS_NOUN)
+
+    def analyze_many(self, words):
+        if self.code == DEFAULT_LANGUAGE:
+            return morphology.analyze_many(words)
+        return [self.analyze(word) for word in words]
+
+    def lemma(self, word):
+        return self.analyze(word).lemma
+
+    def analyze_text(self, text):
+        return analyze_text(text, self.basic_words, analyzer=self.analyze_many, tokenizer=self.tokenize)
+
+    def translate_offline(self, word):
+        """Yerleşik sözlükten çeviri; çekimli biçim yoksa sözlük biçimine bakılır"""
+        word = word.lower()
+        if word in self.dictionary:
+            return self.dictionary[word]
+        return self.dictionary.get(self.lemma(word))
+
+
+_packs = OrderedDict()  # dil -> LanguagePack (en uzun süredir kullanılmayan başta)
+_packs_lock = threading.Lock()
+_load_locks = {code: threading.Lock() for code in PACK_SPECS}
+
+
+def _record_memory():
+    metrics.set_gauge("language_packs_loaded", len(_packs))
+    for code in PACK_SPECS:
+        pack = _packs.get(code)
+        metrics.set_gauge("language_pack_bytes", pack.memory_bytes if pack else 0, language=code)
+
+
+def _evict(keep):
+    """Bellek sınırı aşıldıysa ya da boşta kaldıysa soğuk paketleri bırakır (kilit tutulurken çağrılır)"""
+    now = time.monotonic()
+    for code in list(_packs):
+        if code in (keep, DEFAULT_LANGUAGE):
+            continue
+        over_limit = sum(pack.memory_bytes for pack in _packs.values()) > PACK_MEMORY_LIMIT
+        idle = now - _packs[code].last_used > PACK_IDLE_SECONDS
+        if not over_limit and not idle:
+            break
+        del _packs[code]
+
+
+def get_pack(code):
+    """Dil paketini döndürür; ilk kullanımda yükler. Desteklenmeyen dilde KeyError"""
+    spec = PACK_SPECS[code]
+    with _packs_lock:
+        pack = _packs.get(code)
+        if pack is not None:
+            pack.last_used = time.monotonic()
+            _packs.move_to_end(code)
+    metrics.record_cache("language_pack", pack is not None)
+    if pack is not None:
+        return pack
+
+    # Aynı dil için eşzamanlı isteklerde paket bir kez yüklenir
+    with _load_locks[code]:
+        with _packs_lock:
+            pack = _packs.get(code)
+        if pack is None:
+            with metrics.timed("language_pack_load"):
+                pack = LanguagePack(spec)
+            with _packs_lock:
+                _packs[code] = pack
+                _evict(keep=code)
+                _record_memory()
+    return pack
+
+
+def loaded_languages():
+    """Yüklü paketler ve tahmini bellek kullanımları (bayt)"""
+    with _packs_lock:
+        return {code: pack.memory_bytes for code, pack in _packs.items()}
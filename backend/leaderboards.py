@@ -0,0 +1,250 @@
+"""Haftalık dakika liderlik tabloları (genel ve sınıf bazında).
+
+Her aktivite kaydında kullanıcının haftalık skoru, aktiviteyle aynı
+transaction içinde `leaderboard_scores` tablosuna eklenir. Tablo adı
+(board: "global" ya da "class:<id>") ve hafta ("2026-W42") anahtarlıdır;
+yeni hafta yeni anahtar demektir, devir için tarama gerekmez. Eski
+haftalar periyodik işle silinir (prune).
+
+Sorgular:
+
+- ilk N: (board, hafta, dakika azalan, kullanıcı) indeksinden N satır,
+- sıra: skoru benimkinden büyük kullanıcı sayısı `leaderboard_counts`
+  tablosunda tutulan Fenwick ağacından okunur (skor başına kullanıcı
+  sayısı; O(log MAX_SCORE) düğüm),
+- benim sıram ± k: aynı indeksten skorun üstünde ve altında k satır.
+
+Mevcut aktivitelerden bu haftanın tablolarını yeniden kurmak için:
+python -m backend.leaderboards --rebuild
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .database import engine, init_db, ClassMember, LeaderboardCount, LeaderboardScore, User, UserActivity
+
+GLOBAL_BOARD = "global"
+MAX_SCORE = 7 * 24 * 60  # Haftalık dakika üst sınırı; daha büyük skorlar sıralamada bu değerde sayılır
+TREE_SIZE = 1 << (MAX_SCORE + 1).bit_length()  # Fenwick ağacı boyutu (2'nin kuvveti)
+KEEP_WEEKS = 8  # Saklanan hafta sayısı (bu hafta dahil)
+MAX_LIMIT = 100  # İlk N sorgusunda en fazla satır
+MAX_AROUND = 25  # Benim sıram ± k sorgusunda en fazla k
+
+
+def class_board(class_id):
+    return f"class:{class_id}"
+
+
+def week_key(day):
+    """ISO hafta anahtarı (sözlük sırası zaman sırasıyla aynı)"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def current_week():
+    return week_key(datetime.now().date())
+
+
+def _node(score):
+    """Skorun Fenwick düğüm indeksi (1 tabanlı)"""
+    return min(max(score, 0), MAX_SCORE) + 1
+
+
+def _update_nodes(score):
+    i = _node(score)
+    while i <= TREE_SIZE:
+        yield i
+        i += i & -i
+
+
+def _prefix_nodes(score):
+    """Skoru `score` ve altında olan kullanıcı sayısını veren düğümler"""
+    i = _node(score)
+    while i > 0:
+        yield i
+        i -= i & -i
+
+
+def _add_counts(connection, board, week, score, delta):
+    table = LeaderboardCount.__table__
+    stmt = sqlite_insert(table).values([
+        {"board": board, "week": week, "node": node, "count": delta} for node in _update_nodes(score)
+    ])
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=["board", "week", "node"],
+        set_={"count": table.c.count + stmt.excluded.count}
+    ))
+
+
+def _add_score(connection, board, week, user_id, minutes):
+    """Kullanıcının skoruna ekler ve sayım ağacını günceller"""
+    table = LeaderboardScore.__table__
+    stmt = sqlite_insert(table).values(board=board, week=week, user_id=user_id, minutes=minutes)
+    # Önce yaz: yazma kilidi alındıktan sonra okunan skor başka bir istekle yarışmaz
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=["board", "week", "user_id"],
+        set_={"minutes": table.c.minutes + stmt.excluded.minutes}
+    ))
+    new = connection.execute(select(table.c.minutes).where(
+        table.c.board == board, table.c.week == week, table.c.user_id == user_id
+    )).scalar()
+    old = new - minutes
+    if old > 0:
+        if _node(old) == _node(new):
+            return
+        _add_counts(connection, board, week, old, -1)
+    _add_counts(connection, board, week, new, 1)
+
+
+def user_boards(connection, user_id):
+    """Kullanıcının skorunun yazıldığı tablolar: genel ve üye olduğu sınıflar"""
+    table = ClassMember.__table__
+    class_ids = connection.execute(select(table.c.class_id).where(table.c.user_id == user_id)).scalars().all()
+    return [GLOBAL_BOARD] + [class_board(class_id) for class_id in class_ids]
+
+
+def record_activity(connection, user_id, minutes, day):
+    """Aktivite süresini kullanıcının tüm tablolarına ekler (çağıranın transaction'ı içinde)"""
+    if minutes <= 0:
+        return
+    week = week_key(datetime.strptime(day, "%Y-%m-%d").date())
+    for board in user_boards(connection, user_id):
+        _add_score(connection, board, week, user_id, minutes)
+
+
+def add_class_members(connection, class_id, user_ids, week=None):
+    """Sınıfa yeni eklenen öğrencilerin bu haftaki genel skorlarını sınıf tablosuna taşır"""
+    week = week or current_week()
+    table = LeaderboardScore.__table__
+    rows = connection.execute(select(table.c.user_id, table.c.minutes).where(
+        table.c.board == GLOBAL_BOARD, table.c.week == week, table.c.user_id.in_(user_ids)
+    )).all()
+    for user_id, minutes in rows:
+        _add_score(connection, class_board(class_id), week, user_id, minutes)
+
+
+def _count_above(connection, board, week, scores):
+    """Her skor için skoru daha büyük olan kullanıcı sayısı ve tablodaki toplam kullanıcı"""
+    nodes = {node for score in scores for node in _prefix_nodes(score)}
+    nodes.update(_prefix_nodes(MAX_SCORE))
+    table = LeaderboardCount.__table__
+    counts = dict(connection.execute(select(table.c.node, table.c.count).where(
+        table.c.board == board, table.c.week == week, table.c.node.in_(nodes)
+    )).all())
+    total = sum(counts.get(node, 0) for node in _prefix_nodes(MAX_SCORE))
+    return {
+        score: total - sum(counts.get(node, 0) for node in _prefix_nodes(score)) for score in scores
+    }, total
+
+
+def _entries(connection, board, week, rows):
+    above, _ = _count_above(connection, board, week, {minutes for _, _, minutes in rows})
+    return [
+        {"rank": above[minutes] + 1, "user_id": user_id, "username": username, "minutes": minutes}
+        for user_id, username, minutes in rows
+    ]
+
+
+def _score_query(board, week):
+    table = LeaderboardScore.__table__
+    return select(table.c.user_id, User.username, table.c.minutes).join(
+        User, User.id == table.c.user_id
+    ).where(table.c.board == board, table.c.week == week)
+
+
+def top(connection, board, week, limit=10):
+    """İlk `limit` kullanıcı (eşit skorlar aynı sırada)"""
+    table = LeaderboardScore.__table__
+    rows = connection.execute(
+        _score_query(board, week).order_by(table.c.minutes.desc(), table.c.user_id).limit(limit)
+    ).all()
+    _, total = _count_above(connection, board, week, ())
+    return {"board": board, "week": week, "total": total, "entries": _entries(connection, board, week, rows)}
+
+
+def around(connection, board, week, user_id, k=3):
+    """Kullanıcının sırası ve tabloda hemen üstündeki ve altındaki k kullanıcı"""
+    table = LeaderboardScore.__table__
+    score = connection.execute(select(table.c.minutes).where(
+        table.c.board == board, table.c.week == week, table.c.user_id == user_id
+    )).scalar()
+    if score is None:
+        _, total = _count_above(connection, board, week, ())
+        return {"board": board, "week": week, "total": total, "rank": None, "minutes": 0, "entries": []}
+
+    # Sıralama: dakika azalan, eşitlikte kullanıcı kimliği artan. Her yön iki
+    # sorguyla okunur (aynı skor, sonra farklı skor); OR'lu tek koşul indekste
+    # aralık araması yapamaz ve kullanıcının üstündeki/altındaki tüm satırları tarar
+    query = _score_query(board, week)
+    above = connection.execute(
+        query.where(table.c.minutes == score, table.c.user_id < user_id).order_by(table.c.user_id.desc()).limit(k)
+    ).all()
+    if len(above) < k:
+        above += connection.execute(
+            query.where(table.c.minutes > score).order_by(table.c.minutes, table.c.user_id.desc()).limit(k - len(above))
+        ).all()
+    me = connection.execute(query.where(table.c.user_id == user_id)).all()
+    below = connection.execute(
+        query.where(table.c.minutes == score, table.c.user_id > user_id).order_by(table.c.user_id).limit(k)
+    ).all()
+    if len(below) < k:
+        below += connection.execute(
+            query.where(table.c.minutes < score).order_by(table.c.minutes.desc(), table.c.user_id).limit(k - len(below))
+        ).all()
+    ranks, total = _count_above(connection, board, week, {score})
+    return {
+        "board": board,
+        "week": week,
+        "total": total,
+        "rank": ranks[score] + 1,
+        "minutes": score,
+        "entries": _entries(connection, board, week, list(reversed(above)) + me + below),
+    }
+
+
+def prune(keep_weeks=KEEP_WEEKS, today=None):
+    """`keep_weeks` haftadan eski tabloları siler"""
+    today = today or datetime.now().date()
+    cutoff = week_key(today - timedelta(weeks=keep_weeks - 1))
+    with engine.begin() as conn:
+        deleted = conn.execute(LeaderboardScore.__table__.delete().where(LeaderboardScore.week < cutoff)).rowcount
+        conn.execute(LeaderboardCount.__table__.delete().where(LeaderboardCount.week < cutoff))
+    return deleted
+
+
+def rebuild(today=None):
+    """Bu haftanın tablolarını aktivite tablosundan yeniden kurar; yazılan skor sayısı"""
+    init_db()
+    today = today or datetime.now().date()
+    week = week_key(today)
+    monday = today - timedelta(days=today.weekday())
+    scores = LeaderboardScore.__table__
+    counts = LeaderboardCount.__table__
+    with engine.begin() as conn:
+        conn.execute(scores.delete().where(scores.c.week == week))
+        conn.execute(counts.delete().where(counts.c.week == week))
+        totals = conn.execute(
+            select(UserActivity.user_id, func.sum(UserActivity.duration))
+            .where(UserActivity.completed_at >= monday.strftime("%Y-%m-%d"), UserActivity.duration > 0)
+            .group_by(UserActivity.user_id)
+        ).all()
+        written = 0
+        for user_id, minutes in totals:
+            for board in user_boards(conn, user_id):
+                _add_score(conn, board, week, user_id, minutes)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Liderlik tabloları bakımı")
+    parser.add_argument("--rebuild", action="store_true", help="Bu haftanın tablolarını aktivitelerden yeniden kur")
+    parser.add_argument("--prune", action="store_true", help=f"{KEEP_WEEKS} haftadan eski tabloları sil")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"{rebuild()} skor yazıldı")
+    if args.prune:
+        print(f"{prune()} eski skor silindi")
@@ -0,0 +1,128 @@
+"""Yapılandırılmış (JSON) ve engellemeyen günlük kaydı.
+
+Kayıtlar istek işleyen koddan bir kuyruğa bırakılır ve ayrı bir iş
+parçacığı tarafından stdout'a yazılır; böylece istekler stdout borusunda
+beklemez ve çıktılar birbirine karışmaz. Her kayıt o anki isteğin
+korelasyon kimliğini (X-Request-ID) taşır.
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from . import metrics
+
+REQUEST_ID_HEADER = "X-Request-ID"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Başarılı isteklerin günlüğe yazılma oranı (hatalar ve yavaş istekler her zaman yazılır)
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.01"))
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
+QUEUE_SIZE = 10000
+
+# İstemciden gelen kimlikler yalnızca bu karakterleri içerebilir
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+request_id_var = ContextVar("request_id", default="-")
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Kayıtları tek satırlık JSON nesnelerine çevirir"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Kayda o anki isteğin kimliğini ekler (kayıt kuyruğa girmeden önce)"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Kuyruk doluysa beklemek yerine kaydı atar ve sayar"""
+
+    def prepare(self, record):
+        # Varsayılan hazırlık istisnayı mesaja gömer; JSON'da ayrı alan olarak kalsın
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("log_records_dropped_total")
+
+
+def setup_logging():
+    """`backend` günlükçüsünü kuyruk üzerinden JSON yazacak şekilde ayarlar"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    logger = logging.getLogger("backend")
+    logger.setLevel(LOG_LEVEL)
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Kuyrukta bekleyen kayıtları yazar ve dinleyiciyi durdurur"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def resolve_request_id(header_value):
+    """İstemcinin gönderdiği kimliği geçerliyse kullanır, değilse yenisini üretir"""
+    if header_value and _REQUEST_ID_RE.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+def should_log_access(status_code, seconds):
+    """Erişim kaydının yazılıp yazılmayacağına karar verir (başarılı istekler örneklenir)"""
+    if status_code >= 400 or seconds >= SLOW_REQUEST_SECONDS:
+        return True
+    return random.random() < ACCESS_LOG_SAMPLE_RATE
@@ -0,0 +1,385 @@
+"""Süreç içi metrikler ve Prometheus metin formatında dışa aktarım.
+
+Endpoint gecikme histogramları, durum kodu sayaçları, iç aşama süreleri
+(Wikipedia, özetleme, çeviri, veritabanı, bcrypt...) ve önbellek isabet
+oranları burada toplanır. METRICS_DIR ortam değişkeni verilirse her worker
+kendi anlık görüntüsünü bu dizine yazar ve /metrics tüm worker'ların
+değerlerini birleştirerek döndürür.
+
+Çoklu worker modunda anlık görüntüler bir zamanlayıcı iş parçacığıyla
+yazılır (boşta kalan worker'ın son sayımları da diske ulaşır). Kapanan ya
+da ölen worker'ın sayaç ve histogramları bir kez arşiv dosyasına eklenir
+ve anlık görüntüsü silinir; böylece sayaçlar yeniden başlatmalarda
+kaybolmaz ve iki kez sayılmaz, ölü worker'ın göstergeleri görünmez.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+# Saniye cinsinden histogram kovaları
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+FLUSH_INTERVAL = 5.0  # Çoklu worker modunda anlık görüntü yazma aralığı (sn)
+# Bu süredir güncellenmeyen anlık görüntünün worker'ı ölmüş sayılır (pid yeniden kullanılmış olabilir)
+STALE_SECONDS = 12 * FLUSH_INTERVAL
+ARCHIVE_FILE = "metrics_archive.json"
+SNAPSHOT_RE = re.compile(r"metrics_(\d+)\.json$")
+
+HELP = {
+    "http_requests_total": ("counter", "Route, metot ve durum koduna göre istek sayısı"),
+    "http_request_duration_seconds": ("histogram", "Route ve metoda göre istek süresi"),
+    "stage_duration_seconds": ("histogram", "İç aşama süreleri"),
+    "cache_requests_total": ("counter", "Önbellek isabet/ıskalama sayısı"),
+    "cache_hit_ratio": ("gauge", "Önbellek isabet oranı"),
+    "rate_limited_total": ("counter", "Hız/eşzamanlılık sınırı nedeniyle reddedilen istekler"),
+    "outbound_requests_total": ("counter", "Dış servis çağrıları (sonuca göre)"),
+    "circuit_breaker_state": ("gauge", "Devre kesici durumu (0 kapalı, 1 yarı açık, 2 açık)"),
+    "language_packs_loaded": ("gauge", "Worker'larda yüklü dil paketi sayısı (toplam)"),
+    "language_pack_bytes": ("gauge", "Dil paketinin tahmini bellek kullanımı (bayt, mmap hariç)"),
+    "jobs_total": ("counter", "Arka plan işleri (tür ve sonuca göre: done, retry, failed)"),
+    "pubsub_subscribers": ("gauge", "Açık olay akışı (SSE) abonelikleri (tüm worker'lar)"),
+    "pubsub_messages_total": ("counter", "Yayınlanan ilerleme olayları (türe göre)"),
+    "pubsub_dropped_total": ("counter", "Kuyruğu dolan abonelere gönderilen resync sayısı"),
+}
+
+_lock = threading.Lock()
+_counters = {}    # isim -> {etiketler: değer}
+_histograms = {}  # isim -> {etiketler: [kova sayıları..., toplam, adet]}
+_gauges = {}      # isim -> {etiketler: değer}
+
+# Worker göstergelerinin birleştirilmesi; listede olmayanlar worker başına
+# değerlerdir ve toplanır (abonelik, yüklü paket, bellek)
+GAUGE_MERGE = {
+    "circuit_breaker_state": max,  # En kötü durum
+}
+
+_flusher = None
+_flusher_lock = threading.Lock()
+_stopping = threading.Event()
+
+# O anki isteğin aşama süreleri (yavaş istek kayıtları için); istek dışında None
+request_stages = ContextVar("request_stages", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    """Etiketleri Prometheus biçiminde tek bir anahtar dizgisine çevirir"""
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _labels(**labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+    _maybe_flush()
+
+
+def set_gauge(name, value, **labels):
+    key = _labels(**labels)
+    with _lock:
+        _gauges.setdefault(name, {})[key] = value
+    _maybe_flush()
+
+
+def observe(name, seconds, **labels):
+    key = _labels(**labels)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        values = series.get(key)
+        if values is None:
+            values = series[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                values[i] += 1
+                break
+        values[-2] += seconds
+        values[-1] += 1
+    _maybe_flush()
+
+
+def observe_request(route, method, status_code, seconds):
+    """Bir HTTP isteğinin süresini ve durum kodunu kaydeder"""
+    observe("http_request_duration_seconds", seconds, route=route, method=method)
+    inc("http_requests_total", route=route, method=method, status=status_code)
+
+
+def observe_stage(stage, seconds):
+    """Bir iç aşamanın süresini kaydeder ve o anki isteğin aşama toplamına ekler"""
+    observe("stage_duration_seconds", seconds, stage=stage)
+    stages = request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def record_cache(cache, hit, count=1):
+    """Önbellek isabetini ya da ıskalamasını kaydeder (count: aynı sonuçlu istek sayısı)"""
+    inc("cache_requests_total", count, cache=cache, result="hit" if hit else "miss")
+
+
+class timed:
+    """Bir iç aşamanın süresini ölçer; bağlam yöneticisi ya da dekoratör olarak kullanılır.
+
+    with timed("wiki_fetch"): ...
+    @timed("bcrypt")
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_stage(self.stage, time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+
+def instrument_engine(engine):
+    """SQLAlchemy motorundaki her sorgunun süresini `db_query` aşaması olarak kaydeder"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            observe_stage("db_query", time.perf_counter() - starts.pop())
+
+
+def snapshot():
+    """Bu sürecin metriklerinin bir kopyasını döndürür"""
+    with _lock:
+        return {
+            "counters": {name: dict(series) for name, series in _counters.items()},
+            "histograms": {name: {key: list(values) for key, values in series.items()} for name, series in _histograms.items()},
+            "gauges": {name: dict(series) for name, series in _gauges.items()},
+        }
+
+
+def _snapshot_path(pid=None):
+    return os.path.join(METRICS_DIR, f"metrics_{pid or os.getpid()}.json")
+
+
+def flush():
+    """Çoklu worker modunda bu sürecin anlık görüntüsünü diske yazar"""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = _snapshot_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def _flush_loop():
+    while not _stopping.wait(FLUSH_INTERVAL):
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def _maybe_flush():
+    """Çoklu worker modunda ilk metrik kaydında zamanlayıcıyı başlatır"""
+    global _flusher
+    if not METRICS_DIR or _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+            _flusher.start()
+            atexit.register(shutdown)
+
+
+def shutdown():
+    """Zamanlayıcıyı durdurur; bu sürecin sayaçlarını arşive ekleyip anlık görüntüsünü siler"""
+    if not METRICS_DIR or _stopping.is_set():
+        return
+    _stopping.set()
+    try:
+        flush()
+        _retire(_snapshot_path())
+    except OSError:
+        pass
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _add(target, data):
+    """Sayaç ve histogramları hedefe ekler (göstergeler hariç)"""
+    for name, series in data.get("counters", {}).items():
+        merged = target["counters"].setdefault(name, {})
+        for key, value in series.items():
+            merged[key] = merged.get(key, 0) + value
+    for name, series in data.get("histograms", {}).items():
+        merged = target["histograms"].setdefault(name, {})
+        for key, values in series.items():
+            if key in merged:
+                merged[key] = [a + b for a, b in zip(merged[key], values)]
+            else:
+                merged[key] = list(values)
+
+
+def _retire(path):
+    """Kapanan/ölü worker'ın sayaç ve histogramlarını arşive ekler ve anlık görüntüsünü siler"""
+    # Yeniden adlandırma atomiktir: aynı dosyayı yalnızca bir worker arşive ekler
+    claimed = f"{path}.retired.{os.getpid()}"
+    try:
+        os.rename(path, claimed)
+    except OSError:
+        return
+    data = _read(claimed)
+    if data is not None:
+        archive_path = os.path.join(METRICS_DIR, ARCHIVE_FILE)
+        with open(os.path.join(METRICS_DIR, ".archive.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = _read(archive_path) or {"counters": {}, "histograms": {}}
+            _add(archive, data)
+            tmp_path = f"{archive_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(archive, f)
+            os.replace(tmp_path, archive_path)
+    os.remove(claimed)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merged():
+    """Tüm worker'ların anlık görüntülerini birleştirir"""
+    own = snapshot()
+    if not METRICS_DIR:
+        return own
+
+    snapshots = [own]
+    now = time.time()
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics_*.json")):
+        match = SNAPSHOT_RE.search(path)
+        if match is None:
+            continue
+        pid = int(match.group(1))
+        if pid == os.getpid():
+            continue
+        try:
+            stale = now - os.path.getmtime(path) > STALE_SECONDS
+        except OSError:
+            continue
+        if stale or not _alive(pid):
+            try:
+                _retire(path)
+            except OSError:
+                pass
+            continue
+        data = _read(path)
+        if data is not None:
+            snapshots.append(data)
+
+    merged = {"counters": {}, "histograms": {}, "gauges": {}}
+    archive = _read(os.path.join(METRICS_DIR, ARCHIVE_FILE))
+    for data in snapshots + ([archive] if archive else []):
+        _add(merged, data)
+    for data in snapshots:
+        for name, series in data["gauges"].items():
+            target = merged["gauges"].setdefault(name, {})
+            combine = GAUGE_MERGE.get(name)
+            for key, value in series.items():
+                if key not in target:
+                    target[key] = value
+                elif combine is None:
+                    target[key] += value
+                else:
+                    target[key] = combine(target[key], value)
+    return merged
+
+
+def _cache_ratios(counters):
+    """cache_requests_total sayaçlarından isabet oranlarını hesaplar"""
+    totals = {}
+    for key, value in counters.get("cache_requests_total", {}).items():
+        cache_label = key.split(",")[0]  # cache="..."
+        hits, total = totals.get(cache_label, (0, 0))
+        totals[cache_label] = (hits + (value if 'result="hit"' in key else 0), total + value)
+    return {label: hits / total for label, (hits, total) in totals.items() if total}
+
+
+def _series(name, key, suffix=""):
+    return f"{name}{suffix}{{{key}}}" if key else f"{name}{suffix}"
+
+
+def render():
+    """Metrikleri Prometheus metin formatında döndürür"""
+    data = _merged()
+    gauges = dict(data["gauges"])
+    gauges["cache_hit_ratio"] = _cache_ratios(data["counters"])
+    lines = []
+
+    def header(name, default_type):
+        metric_type, help_text = HELP.get(name, (default_type, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    for name in sorted(data["counters"]):
+        header(name, "counter")
+        for key, value in sorted(data["counters"][name].items()):
+            lines.append(f"{_series(name, key)} {value}")
+
+    for name in sorted(data["histograms"]):
+        header(name, "histogram")
+        for key, values in sorted(data["histograms"][name].items()):
+            cumulative = 0
+            prefix = f"{key}," if key else ""
+            for bound, count in zip(LATENCY_BUCKETS, values):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {values[-1]}')
+            lines.append(f"{_series(name, key, '_sum')} {values[-2]}")
+            lines.append(f"{_series(name, key, '_count')} {values[-1]}")
+
+    for name in sorted(gauges):
+        if not gauges[name]:
+            continue
+        header(name, "gauge")
+        for key, value in sorted(gauges[name].items()):
+            lines.append(f"{_series(name, key)} {value}")
+
+    return "\n".join(lines) + "\n"
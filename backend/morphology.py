@@ -0,0 +1,438 @@
+"""İspanyolca kelime biçimi çözümleme (lemma ve sözcük türü).
+
+Çekimli bir kelime biçimi (ör. "caracterizan", "reúne", "tienen") sözlük
+biçimine (lemma: "caracterizar", "reunir", "tener") ve sözcük türüne
+(fiil / isim-sıfat) indirgenir. Sıra:
+
+1. Önceden hesaplanmış tablo: en sık N kelime biçiminin lemma ve türü,
+   sıralı .npy dizileri olarak (mmap, ikili arama). Tablo word_rank
+   indeksindeki en sık biçimlerden ve isteğe bağlı bir lemma listesinden
+   (her satırda "lemma<TAB>biçim") üretilir.
+2. Kurallar: düzensiz fiil biçimleri, -ar/-er/-ir ile biten isimler,
+   isim türeten ekler (-ción, -dad, -miento ...),
+   mastar + zamir ekleri, fiil çekim eklerinin tersine çevrilmesi (kök
+   ünlü ve yazım değişimleriyle) ve isim/sıfat çoğul eklerinin atılması.
+   Belirsiz kısa eklerde (-a, -e, -an, -ía ...) aday mastar bilinen
+   fiillerle (yerleşik liste, tablo, frekans listesi) doğrulanır.
+
+Sonuçlar sınırlı bir LRU önbellekte tutulur.
+
+Tablo üretme: python -m backend.morphology --top 50000 [--lemmas lemmatization-es.txt] [--language es]
+"""
+import argparse
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from . import metrics, word_rank
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(__file__), "data", "es_morphology")
+TABLE_PATH = os.getenv("MORPHOLOGY_PATH", DEFAULT_TABLE_PATH)
+
+CACHE_SIZE = 50000
+
+POS_VERB = "verb"
+POS_NOUN = "noun"  # İsim ya da sıfat
+POS_CODES = {POS_NOUN: 0, POS_VERB: 1}
+POS_NAMES = {code: pos for pos, code in POS_CODES.items()}
+
+INFINITIVE_ENDINGS = ("ar", "er", "ir", "ír")
+MIN_STEM = 2
+
+# Yerleşik sık fiiller (tablo ve frekans listesi yokken doğrulama için)
+COMMON_VERBS = frozenset("""
+ser estar haber tener hacer poder decir ir ver dar saber querer llegar pasar deber poner parecer
+quedar creer hablar llevar dejar seguir encontrar llamar venir pensar salir volver tomar conocer
+vivir sentir tratar mirar contar empezar esperar buscar existir entrar trabajar escribir perder
+producir ocurrir entender pedir recibir recordar terminar permitir aparecer conseguir comenzar
+servir sacar necesitar mantener resultar leer caer cambiar presentar crear abrir considerar oír
+acabar convertir ganar formar traer partir morir aceptar realizar suponer comprender lograr
+explicar preguntar tocar reconocer estudiar alcanzar nacer dirigir correr utilizar pagar ayudar
+gustar jugar escuchar cumplir ofrecer descubrir levantar intentar usar decidir repetir olvidar
+valer comer mostrar ocupar mover continuar suceder referir acercar dedicar aprender comprar subir
+evitar interesar cerrar echar responder sufrir importar obtener observar indicar imaginar
+desarrollar señalar elegir preparar proponer demostrar significar reunir caracterizar constituir
+determinar atravesar incluir contener construir destruir dormir beber andar conducir traducir
+viajar cocinar bailar cantar nadar caminar limpiar describir compartir celebrar visitar crecer
+reproducir
+""".split())
+
+# -ar/-er/-ir ile biten isim ve sıfatlar
+NOUN_EXCEPTIONS = frozenset("""
+mujer lugar hogar mar bar par azar altar collar pilar militar popular familiar particular similar
+nuclear solar lunar singular escolar titular celular muscular molecular vulgar peculiar auxiliar
+dólar azúcar néctar ámbar hangar radar ayer taller placer alquiler cráter líder carácter cáncer
+suéter máster póster chófer elixir nadir tapir
+""".split())
+
+# Düzensiz fiil biçimleri (lemma -> biçimler); isim olarak da sık kullanılan
+# biçimler (vino, hecho, dicho, puesto, estado) bilerek dışarıda bırakıldı
+IRREGULAR_VERBS = {
+    "ser": "soy eres es somos sois son era eras éramos eran fui fuiste fue fuimos fueron sea seas "
+           "seamos sean sido siendo será serán sería serían fuera fueran fuese fuesen",
+    "estar": "estoy estás está estamos están estaba estabas estábamos estaban estuve estuvo estuvimos "
+             "estuvieron esté estés estén estando estará estarán estaría",
+    "haber": "he has ha hemos han había habías habíamos habían hubo hubieron habrá habrán habría "
+             "habrían haya hayas hayan hay habido habiendo hubiera hubieran",
+    "tener": "tengo tienes tiene tenemos tienen tenía tenías teníamos tenían tuve tuvo tuvimos "
+             "tuvieron tenga tengas tengan tendrá tendrán tendría tendrían teniendo tenido",
+    "hacer": "hago haces hace hacemos hacen hacía hacían hice hizo hicimos hicieron haga hagan hará "
+             "harán haría harían haciendo",
+    "ir": "voy vas va vamos van iba ibas íbamos iban ido yendo vaya vayas vayan irá irán iría",
+    "decir": "digo dices dice decimos dicen decía decían dije dijo dijimos dijeron diga digan dirá "
+             "dirán diría diciendo",
+    "poder": "puedo puedes puede podemos pueden podía podían pude pudo pudimos pudieron pueda puedan "
+             "podrá podrán podría podrían pudiendo",
+    "ver": "veo ves ve vemos ven veía veían vi vio vimos vieron vea vean visto viendo",
+    "dar": "doy das da damos dan daba daban di dio dimos dieron dé des den dado dando",
+    "saber": "sé sabes sabe sabemos saben sabía sabían supe supo supimos supieron sepa sepan sabrá "
+             "sabrán sabría",
+    "querer": "quiero quieres quiere queremos quieren quería querían quise quiso quisimos quisieron "
+              "quiera quieran querrá querría",
+    "poner": "pongo pones pone ponemos ponen ponía ponían puse puso pusimos pusieron ponga pongan "
+             "pondrá pondría",
+    "venir": "vengo vienes viene venimos vienen venía venían vine vino vinimos vinieron venga vengan "
+             "vendrá vendría viniendo",
+    "salir": "salgo sales sale salimos salen salía salían salió salieron salga salgan saldrá saldría",
+    "oír": "oigo oyes oye oímos oyen oía oyó oyeron oiga oído oyendo",
+}
+IRREGULAR_FORMS = {form: lemma for lemma, forms in IRREGULAR_VERBS.items() for form in forms.split()}
+IRREGULAR_FORMS.pop("vino")  # "şarap" anlamı daha sık
+
+# Fiil çekim ekleri: (ek, aday mastar ekleri, doğrulama gerekir mi). Uzun ekler önce denenir.
+VERB_SUFFIXES = sorted([
+    # Geçmiş zaman
+    ("aron", ("ar",), False), ("ieron", ("er", "ir"), False), ("yeron", ("er", "ir"), False),
+    ("aste", ("ar",), False), ("iste", ("er", "ir"), True), ("amos", ("ar",), True),
+    ("ó", ("ar",), False), ("ió", ("er", "ir"), False), ("yó", ("er", "ir"), False),
+    ("é", ("ar",), True), ("í", ("er", "ir"), True),
+    # Süreklilik ve bitmemiş geçmiş
+    ("ando", ("ar",), False), ("iendo", ("er", "ir"), False), ("yendo", ("er", "ir"), False),
+    ("aba", ("ar",), False), ("abas", ("ar",), False), ("ábamos", ("ar",), False), ("aban", ("ar",), False),
+    ("ía", ("er", "ir"), True), ("ías", ("er", "ir"), True), ("íamos", ("er", "ir"), True),
+    ("ían", ("er", "ir"), True),
+    # Geçmiş dilek kipi
+    ("ara", ("ar",), True), ("aran", ("ar",), False), ("ase", ("ar",), True), ("asen", ("ar",), False),
+    ("iera", ("er", "ir"), True), ("ieran", ("er", "ir"), False),
+    ("iese", ("er", "ir"), True), ("iesen", ("er", "ir"), False),
+    # Şimdiki zaman ve dilek kipi (kısa ekler; yalnızca doğrulanırsa)
+    ("zco", ("cer", "cir"), True), ("as", ("ar", "er", "ir"), True), ("a", ("ar", "er", "ir"), True),
+    ("an", ("ar", "er", "ir"), True), ("es", ("er", "ir", "ar"), True), ("e", ("er", "ir", "ar"), True),
+    ("en", ("er", "ir", "ar"), True), ("emos", ("er", "ar"), True), ("imos", ("ir",), True),
+], key=lambda rule: -len(rule[0]))
+
+# İsimlerde de çok sık görülen ekler: aday mastar yalnızca yerleşik liste ya da tabloyla doğrulanır
+CURATED_SUFFIXES = frozenset(("a", "as", "e", "es"))
+
+# Yalnızca isim/sıfat türeten ekler (fiil kurallarından önce denenir)
+NOUN_SUFFIXES = (
+    "ción", "ciones", "sión", "siones", "dad", "dades", "tad", "tades", "miento", "mientos", "mento",
+    "mentos", "ismo", "ismos", "ista", "istas", "ura", "uras", "eza", "ezas", "ancia", "ancias",
+    "encia", "encias", "aje", "ajes", "dor", "dores", "dora", "doras", "tud", "tudes", "logía", "logías",
+)
+
+# Gelecek zaman ve şart kipi: mastarın kendisine eklenir (hablar-á, comer-ía)
+FUTURE_SUFFIXES = (
+    ("íamos", True), ("emos", False), ("ían", True), ("ías", True), ("ía", True),
+    ("án", False), ("ás", False), ("á", False), ("é", True),
+)
+
+# Mastar ve ulaç sonundaki zamirler (hacerlo, dárselo, diciéndole)
+CLITICS = sorted(
+    ["lo", "la", "los", "las", "le", "les", "se", "me", "te", "nos",
+     "selo", "sela", "selos", "selas", "melo", "mela", "telo", "tela"],
+    key=len, reverse=True,
+)
+
+
+class Analysis(NamedTuple):
+    lemma: str
+    pos: str
+
+
+class MorphologyTable:
+    """Sıralı biçim dizisi üzerinde ikili arama ile lemma ve tür döndüren tablo"""
+
+    def __init__(self, forms, lemmas, pos):
+        self.forms = forms
+        self.lemmas = lemmas
+        self.pos = pos
+        self.verb_lemmas = frozenset(str(lemma) for lemma in np.asarray(lemmas)[np.asarray(pos) == POS_CODES[POS_VERB]])
+
+    @classmethod
+    def load(cls, path=TABLE_PATH):
+        return cls(*(np.load(f"{path}.{name}.npy", mmap_mode="r") for name in ("forms", "lemmas", "pos")))
+
+    def __len__(self):
+        return len(self.forms)
+
+    def get(self, form):
+        if not len(self.forms):
+            return None
+        position = int(np.searchsorted(self.forms, form))
+        if position < len(self.forms) and self.forms[position] == form:
+            return Analysis(str(self.lemmas[position]), POS_NAMES[int(self.pos[position])])
+        return None
+
+
+_table = None
+_table_lock = threading.Lock()
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_table():
+    """Tabloyu ilk kullanımda bir kez yükler; dosya yoksa boş tablo"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                try:
+                    _table = MorphologyTable.load()
+                except FileNotFoundError:
+                    _table = MorphologyTable(
+                        np.array([], dtype="<U1"), np.array([], dtype="<U1"), np.array([], dtype=np.int8)
+                    )
+    return _table
+
+
+def _unaccent_stem(stem):
+    # Kökteki vurgu işaretlerini kaldır (reún -> reun), ñ korunur
+    return unicodedata.normalize("NFC", "".join(
+        c for c in unicodedata.normalize("NFD", stem) if c != "\u0301"
+    ))
+
+
+def is_known_verb(lemma, curated=False):
+    """Mastarın bilinen bir fiil olup olmadığı (yerleşik liste, tablo ya da frekans listesi).
+
+    curated=True iken frekans listesine bakılmaz; listede isimlerden türemiş
+    mastar biçimleri de bulunabildiğinden kısa eklerde yalnızca yerleşik
+    liste ve tablo güvenilirdir.
+    """
+    if lemma in COMMON_VERBS or lemma in get_table().verb_lemmas:
+        return True
+    if curated or lemma in NOUN_EXCEPTIONS:
+        return False
+    index = word_rank.get_index()
+    return index is not None and int(index.lookup([lemma])[0]) != word_rank.UNKNOWN_RANK
+
+
+def _stem_variants(stem):
+    """Çekimde değişen kökün mastardaki olası biçimleri"""
+    def replace(stem, replacements):
+        variants = []
+        for old, new in replacements:
+            position = stem.rfind(old)
+            if position > 0:
+                variants.append(stem[:position] + new + stem[position + len(old):])
+        return variants
+
+    stem = _unaccent_stem(stem)
+    # Yazım değişimleri: conozco, llegue, busque, empiece, escojo, constituyen
+    spellings = [stem] + replace(stem, (
+        ("zc", "c"), ("gu", "g"), ("qu", "c"), ("c", "z"), ("j", "g"), ("uy", "u"),
+    ))
+    variants = list(spellings)
+    for spelling in spellings:
+        # Kök ünlü değişimleri: tiene, puede, pide, durmió (empiece -> empez -> empez-ar)
+        variants.extend(replace(spelling, (("ie", "e"), ("ue", "o"), ("i", "e"), ("u", "o"))))
+    return variants
+
+
+def _analyze_verb(word):
+    """Çekimli fiil biçiminin mastarını döndürür; fiil değilse None"""
+    for suffix, strict in FUTURE_SUFFIXES:
+        stem = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stem) > MIN_STEM + 1 and stem.endswith(INFINITIVE_ENDINGS):
+            lemma = _unaccent_stem(stem)
+            if not strict or is_known_verb(lemma):
+                return lemma
+
+    for suffix, endings, strict in VERB_SUFFIXES:
+        if not word.endswith(suffix) or len(word) - len(suffix) < MIN_STEM:
+            continue
+        stem = word[:-len(suffix)]
+        candidates = [variant + ending for variant in _stem_variants(stem) for ending in endings]
+        curated = suffix in CURATED_SUFFIXES
+        for candidate in candidates:
+            if is_known_verb(candidate, curated):
+                return candidate
+        if not strict:
+            return candidates[0]
+    return None
+
+
+def _nominal_lemma(word):
+    """İsim/sıfat çoğulunu tekile indirger (ciudades -> ciudad, luces -> luz, canciones -> canción)"""
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(("is", "ás", "és", "ís", "ós", "ús")):
+        return word
+    if word.endswith("ces"):
+        return word[:-3] + "z"
+    if word.endswith("iones"):
+        return word[:-5] + "ión"
+    if word.endswith("es") and word[-3] in "dlnrjy":
+        return word[:-2]
+    return word[:-1]
+
+
+def _analyze_rules(word):
+    if word in IRREGULAR_FORMS:
+        return Analysis(IRREGULAR_FORMS[word], POS_VERB)
+
+    nominal = _nominal_lemma(word)
+    if word in NOUN_EXCEPTIONS or nominal in NOUN_EXCEPTIONS:
+        return Analysis(nominal if nominal in NOUN_EXCEPTIONS else word, POS_NOUN)
+
+    if len(word) > 3 and word.endswith(INFINITIVE_ENDINGS):
+        return Analysis(word, POS_VERB)
+
+    # Mastar/ulaç + zamir (hacerlo, dárselo, diciéndole)
+    if word.endswith(NOUN_SUFFIXES):
+        return Analysis(nominal, POS_NOUN)
+
+    for clitic in CLITICS:
+        base = _unaccent_stem(word[:-len(clitic)])
+        if word.endswith(clitic) and len(base) >= 3:
+            if base.endswith(("ar", "er", "ir")) and is_known_verb(base):
+                return Analysis(base, POS_VERB)
+            if base.endswith(("ando", "iendo")):
+                lemma = _analyze_verb(base)
+                if lemma:
+                    return Analysis(lemma, POS_VERB)
+
+    lemma = _analyze_verb(word)
+    if lemma is not None:
+        return Analysis(lemma, POS_VERB)
+    return Analysis(nominal, POS_NOUN)
+
+
+def analyze(word):
+    """Kelime biçiminin (lemma, tür) çözümlemesi"""
+    word = word.lower()
+    with _cache_lock:
+        result = _cache.get(word)
+        if result is not None:
+            _cache.move_to_end(word)
+    metrics.record_cache("morphology", result is not None)
+    if result is not None:
+        return result
+
+    result = get_table().get(word) or _analyze_rules(word)
+
+    with _cache_lock:
+        _cache[word] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def analyze_many(words):
+    """Küçük harfli kelime listesinin çözümlemeleri (tokenize çıktısı).
+
+    Önbellek kilidi ve metriği kelime başına değil çağrı başına bir kez
+    alınır; metrik kaydı tek bir önbellek isabetinden pahalıdır.
+    """
+    results = [None] * len(words)
+    misses = []
+    with _cache_lock:
+        for i, word in enumerate(words):
+            result = _cache.get(word)
+            if result is None:
+                misses.append(i)
+            else:
+                _cache.move_to_end(word)
+                results[i] = result
+
+    if misses:
+        table = get_table()
+        for i in misses:
+            results[i] = table.get(words[i]) or _analyze_rules(words[i])
+        with _cache_lock:
+            for i in misses:
+                _cache[words[i]] = results[i]
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    hits = len(words) - len(misses)
+    if hits:
+        metrics.record_cache("morphology", True, hits)
+    if misses:
+        metrics.record_cache("morphology", False, len(misses))
+    return results
+
+
+def lemma(word):
+    return analyze(word).lemma
+
+
+def build_table(top=50000, lemma_file=None, path=None, language="es"):
+    """En sık `top` biçim için tabloyu üretir.
+
+    Lemma listesi verilirse listedeki biçimler listeden, diğerleri
+    kurallardan çözümlenir (kurallar yalnızca İspanyolca; diğer dillerde
+    listede olmayan biçim kendi lemmasıdır). Listede üçüncü sütun olarak
+    tür ("verb"/"noun") verilebilir. Frekans indeksi yoksa lemma
+    listesindeki ilk `top` biçim kullanılır.
+    """
+    data_dir = os.path.dirname(DEFAULT_TABLE_PATH)
+    path = path or (TABLE_PATH if language == "es" else os.path.join(data_dir, f"{language}_morphology"))
+
+    listed = {}
+    if lemma_file:
+        with open(lemma_file, encoding="utf-8-sig") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2:
+                    lemma_word, form = parts[0].lower(), parts[1].lower()
+                    if len(parts) >= 3:
+                        is_verb = parts[2].lower() == POS_VERB
+                    else:
+                        is_verb = (
+                            language == "es" and lemma_word.endswith(INFINITIVE_ENDINGS)
+                            and lemma_word not in NOUN_EXCEPTIONS
+                        )
+                    listed.setdefault(form, Analysis(lemma_word, POS_VERB if is_verb else POS_NOUN))
+
+    if language == "es":
+        index = word_rank.get_index()
+    else:
+        try:
+            index = word_rank.WordRankIndex.load(os.path.join(data_dir, f"{language}_word_rank"))
+        except FileNotFoundError:
+            index = None
+    if index is not None and len(index):
+        order = np.argsort(np.asarray(index.ranks), kind="stable")[:top]
+        forms = [str(form) for form in np.asarray(index.words)[order]]
+    else:
+        forms = list(listed)[:top]
+
+    def fallback(form):
+        return _analyze_rules(form) if language == "es" else Analysis(form, POS_NOUN)
+
+    entries = {form: listed.get(form) or fallback(form) for form in forms}
+    sorted_forms = sorted(entries)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(f"{path}.forms.npy", np.array(sorted_forms))
+    np.save(f"{path}.lemmas.npy", np.array([entries[form].lemma for form in sorted_forms]))
+    np.save(f"{path}.pos.npy", np.array([POS_CODES[entries[form].pos] for form in sorted_forms], dtype=np.int8))
+    return path, len(sorted_forms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Biçim çözümleme tablosu üretimi")
+    parser.add_argument("--top", type=int, default=50000, help="Tabloya alınacak en sık biçim sayısı")
+    parser.add_argument("--lemmas", default=None, help="lemma<TAB>biçim[<TAB>tür] satırlarından oluşan liste")
+    parser.add_argument("--language", default="es", help="Dil kodu (es dışındaki diller için lemma listesi gerekir)")
+    parser.add_argument("--output", default=None, help="Tablo dosyalarının ön eki (varsayılan backend/data/{dil}_morphology)")
+    args = parser.parse_args()
+    path, count = build_table(args.top, args.lemmas, args.output, args.language)
+    print(f"{count} biçim {path}.*.npy dosyalarına yazıldı")
+
+
+if __name__ == "__main__":
+    main()
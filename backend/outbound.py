@@ -0,0 +1,174 @@
+"""Dış servis çağrıları için ortak katman.
+
+Wikipedia ve çeviri API'si gibi dış servislere yapılan her çağrı:
+
+- bağlantı ve okuma zaman aşımıyla yapılır,
+- geçici hatalarda (bağlantı hatası, zaman aşımı, 502/503/504) sınırlı
+  sayıda, jitter'lı üstel beklemeyle tekrar denenir,
+- servis başına bir devre kesiciden geçer: art arda hatalardan sonra devre
+  açılır ve çağrılar RESET_TIMEOUT boyunca servise gitmeden hemen
+  CircuitOpenError ile döner; çağıran taraf önbellekteki ya da çevrimdışı
+  veriyi kullanır. Süre dolunca tek bir deneme çağrısına izin verilir.
+
+Devre durumları `circuit_breaker_state` metriğiyle dışa aktarılır
+(0 kapalı, 1 yarı açık, 2 açık).
+"""
+import os
+import random
+import threading
+import time
+
+import requests
+
+from . import metrics
+
+CONNECT_TIMEOUT = float(os.getenv("OUTBOUND_CONNECT_TIMEOUT", "2.0"))
+READ_TIMEOUT = float(os.getenv("OUTBOUND_READ_TIMEOUT", "5.0"))
+
+RETRY_BACKOFF = 0.2  # ilk tekrar için en fazla bekleme (sn), her denemede ikiye katlanır
+RETRY_STATUS_CODES = frozenset({502, 503, 504})
+
+FAILURE_THRESHOLD = 5  # devreyi açan art arda hata sayısı
+RESET_TIMEOUT = 30.0   # açık devrenin deneme çağrısına izin vermeden önce beklediği süre (sn)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class OutboundError(Exception):
+    """Dış servis çağrısı başarısız oldu"""
+
+
+class CircuitOpenError(OutboundError):
+    """Devre açık; servis çağrılmadı"""
+
+
+class CircuitBreaker:
+    """Art arda hatalarda açılan, süre dolunca tek deneme çağrısına izin veren devre kesici"""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._export()
+
+    def _export(self):
+        metrics.set_gauge("circuit_breaker_state", STATE_VALUES[self.state], upstream=self.name)
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self._export()
+
+    def allow(self):
+        """Çağrıya izin verilip verilmeyeceğini döndürür"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+
+class Upstream:
+    """Tek bir dış servis: bağlantı havuzu, zaman aşımları, tekrar politikası ve devre kesici"""
+
+    def __init__(self, name, retries=2, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.name = name
+        self.retries = retries
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = CircuitBreaker(name)
+        self.session = requests.Session()
+
+    def request(self, method, url, parse=None, **kwargs):
+        """İsteği gönderir; başarılı yanıtı döndürür, aksi halde OutboundError fırlatır.
+
+        `parse` verilirse yanıt gövdesi bununla çözülür ve sonucu döner.
+        ValueError fırlatırsa (ör. vekil sayfası, yarım gövde) deneme servis
+        hatası sayılır; 4xx yanıtlar devre kesiciyi etkilemeden OutboundError
+        olarak fırlatılır.
+        """
+        if not self.breaker.allow():
+            metrics.inc("outbound_requests_total", upstream=self.name, outcome="rejected")
+            raise CircuitOpenError(f"{self.name}: devre açık")
+
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                # Full jitter: [0, backoff * 2^(deneme-1)] aralığında rastgele bekleme
+                time.sleep(random.uniform(0, RETRY_BACKOFF * 2 ** (attempt - 1)))
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.Timeout as e:
+                error = e
+                metrics.inc("outbound_requests_total", upstream=self.name, outcome="timeout")
+                continue
+            except requests.RequestException as e:
+                error = e
+                metrics.inc("outbound_requests_total", upstream=self.name, outcome="connection_error")
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES:
+                error = OutboundError(f"{self.name}: HTTP {response.status_code}")
+                metrics.inc("outbound_requests_total", upstream=self.name, outcome="server_error")
+                continue
+            if response.status_code >= 500:
+                # Tekrar denemeye değmeyen sunucu hatası
+                error = OutboundError(f"{self.name}: HTTP {response.status_code}")
+                metrics.inc("outbound_requests_total", upstream=self.name, outcome="server_error")
+                break
+
+            result = response
+            if parse is not None and response.status_code < 400:
+                try:
+                    result = parse(response)
+                except ValueError as e:
+                    error = OutboundError(f"{self.name}: geçersiz yanıt gövdesi ({e})")
+                    metrics.inc("outbound_requests_total", upstream=self.name, outcome="invalid_body")
+                    continue
+
+            # 4xx istemci hatasıdır, servisin sağlığını göstermez
+            self.breaker.record_success()
+            metrics.inc("outbound_requests_total", upstream=self.name, outcome="success")
+            if parse is not None and response.status_code >= 400:
+                raise OutboundError(f"{self.name}: HTTP {response.status_code}")
+            return result
+
+        self.breaker.record_failure()
+        raise OutboundError(str(error)) from error
+
+    def get(self, url, parse=None, **kwargs):
+        return self.request("GET", url, parse=parse, **kwargs)
+
+    def post(self, url, parse=None, **kwargs):
+        return self.request("POST", url, parse=parse, **kwargs)
+
+
+# Servisler: Wikipedia okuma metni için birkaç tekrar; çeviri istek başına
+# 25 kez çağrıldığından tekrar denenmez, hata durumunda sözlüğe düşülür
+wikipedia = Upstream("wikipedia", retries=2)
+translation = Upstream("translation", retries=0, read_timeout=min(READ_TIMEOUT, 2.0))
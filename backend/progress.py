@@ -0,0 +1,147 @@
+"""Günlük toplam ve seri (streak) takibi.
+
+`user_progress` tablosunda kullanıcı başına tek satır tutulur ve her
+aktivitede tek bir UPSERT ile güncellenir; istemciye gönderilen ilerleme
+olayları (bugünkü dakika, seri değişimi) bu satırdan üretilir. Geçmiş
+tarihli (çevrimdışı eşitlenen) aktiviteler son aktif günden önceyse seriyi
+değiştirmez.
+
+Satırı olmayan kullanıcının ilk aktivitesinde satır önce geçmiş
+aktivitelerden kurulur. Tüm kullanıcıları aktivite tablosundan yeniden
+kurmak için (ilk kurulumda, /api/events/stream ilk durumları için):
+python -m backend.progress --rebuild
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .database import engine, init_db, UserActivity, UserProgress
+
+BATCH_SIZE = 1000
+
+
+def _get(connection, user_id):
+    table = UserProgress.__table__
+    return connection.execute(select(table).where(table.c.user_id == user_id)).first()
+
+
+def _progress(days):
+    """(gün, dakika) listesinden (gün sırasıyla) ilerleme satırı değerleri"""
+    streak = longest = 0
+    previous = None
+    for day, _ in days:
+        streak = streak + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, streak)
+        previous = day
+    return {
+        "streak": streak,
+        "longest_streak": longest,
+        "last_day": previous.strftime("%Y-%m-%d"),
+        "day_minutes": days[-1][1],
+    }
+
+
+def rebuild(connection=None, user_ids=None, today=None):
+    """İlerleme satırlarını aktivite tablosundan yeniden kurar; yazılan satır sayısı.
+
+    user_ids verilirse yalnızca bu kullanıcılar; gelecek tarihli aktiviteler sayılmaz.
+    """
+    if connection is None:
+        init_db()
+        with engine.begin() as conn:
+            return rebuild(conn, user_ids, today)
+
+    today = (today or datetime.now().date()).strftime("%Y-%m-%d")
+    query = select(
+        UserActivity.user_id, UserActivity.completed_at, func.coalesce(func.sum(UserActivity.duration), 0)
+    ).where(UserActivity.completed_at <= today).group_by(
+        UserActivity.user_id, UserActivity.completed_at
+    ).order_by(UserActivity.user_id, UserActivity.completed_at)
+    table = UserProgress.__table__
+    stale = table.delete()
+    if user_ids is not None:
+        query = query.where(UserActivity.user_id.in_(user_ids))
+        stale = stale.where(table.c.user_id.in_(user_ids))
+
+    history = {}
+    for user_id, completed_at, minutes in connection.execute(query):
+        try:
+            day = datetime.strptime(completed_at, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            continue  # Tarihi okunamayan eski kayıt
+        history.setdefault(user_id, []).append((day, int(minutes)))
+
+    rows = [{"user_id": user_id, **_progress(days)} for user_id, days in history.items()]
+    connection.execute(stale)
+    for offset in range(0, len(rows), BATCH_SIZE):
+        connection.execute(table.insert(), rows[offset:offset + BATCH_SIZE])
+    return len(rows)
+
+
+def record_activity(connection, user_id, minutes, day):
+    """Aktiviteyi günlük toplama ve seriye ekler; (önceki, sonraki) satırları döndürür"""
+    table = UserProgress.__table__
+    yesterday = (datetime.strptime(day, "%Y-%m-%d").date() - timedelta(days=1)).strftime("%Y-%m-%d")
+    before = _get(connection, user_id)
+    if before is None:
+        # İlk kayıt: seri, satır tutulmaya başlamadan önceki aktivitelerden kurulur
+        rebuild(connection, [user_id])
+        before = _get(connection, user_id)
+
+    # SET ifadeleri satırın eski değerlerini görür
+    streak = case(
+        (table.c.last_day == day, table.c.streak),
+        (table.c.last_day == yesterday, table.c.streak + 1),
+        (table.c.last_day < day, 1),
+        else_=table.c.streak
+    )
+    stmt = sqlite_insert(table).values(
+        user_id=user_id, streak=1, longest_streak=1, last_day=day, day_minutes=minutes
+    )
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "streak": streak,
+            "longest_streak": func.max(table.c.longest_streak, streak),
+            "day_minutes": case(
+                (table.c.last_day == day, table.c.day_minutes + minutes),
+                (table.c.last_day < day, minutes),
+                else_=table.c.day_minutes
+            ),
+            "last_day": func.max(table.c.last_day, day),
+        }
+    ))
+    return before, _get(connection, user_id)
+
+
+def snapshot(connection, user_id, today=None):
+    """Bugünkü dakika ve güncel seri (dün ya da bugün aktif değilse seri 0)"""
+    today = today or datetime.now().date()
+    row = _get(connection, user_id)
+    if row is None:
+        return {"today_minutes": 0, "streak": 0, "longest_streak": 0}
+    last_day = datetime.strptime(row.last_day, "%Y-%m-%d").date()
+    return {
+        "today_minutes": row.day_minutes if last_day == today else 0,
+        "streak": row.streak if (today - last_day).days <= 1 else 0,
+        "longest_streak": row.longest_streak,
+    }
+
+
+def events(before, after):
+    """Satır değişiminden istemci olayları: günlük toplam ve (değiştiyse) seri"""
+    result = [{"type": "totals", "date": after.last_day, "today_minutes": after.day_minutes}]
+    if before is None or before.streak != after.streak:
+        result.append({"type": "streak", "streak": after.streak, "longest_streak": after.longest_streak})
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Günlük toplam ve seri bakımı")
+    parser.add_argument("--rebuild", action="store_true", help="Tüm kullanıcıların ilerlemesini aktivitelerden yeniden kur")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"{rebuild()} kullanıcının ilerlemesi yazıldı")
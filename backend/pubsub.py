@@ -0,0 +1,242 @@
+"""Süreç içi yayın/abonelik (SSE ilerleme olayları için).
+
+Kanallar kullanıcı kapsamlarıdır (user:<id>). Her SSE bağlantısı kendi
+olay döngüsünde sınırlı bir kuyrukla abone olur; publish() herhangi bir
+iş parçacığından çağrılabilir. Kuyruğu dolan (yavaş) aboneye kuyruk
+boşaltılıp tek bir "resync" olayı gönderilir; istemci durumu yeniden
+yükler.
+
+Veritabanına yazılan olaylar publish_after_commit() ile oturuma eklenir
+ve yalnızca transaction başarıyla tamamlanınca yayınlanır.
+
+Çoklu worker: PUBSUB_SOCKET ayarlıysa her worker yerel bir Unix soketi
+üzerinden aracıya bağlanır; aracı bir worker'dan gelen olayı diğerlerine
+iletir. Aracıyı başlatmak için:
+
+    PUBSUB_SOCKET=/tmp/ai-language-pubsub.sock python -m backend.pubsub
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+
+from sqlalchemy import event
+
+from . import metrics
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PUBSUB_SOCKET = os.getenv("PUBSUB_SOCKET")  # Boşsa yalnızca süreç içi dağıtım
+QUEUE_SIZE = 100  # Abone başına bekleyen en fazla olay
+RECONNECT_SECONDS = 2.0
+
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """Tek bir bağlantının olay kuyruğu (abone olduğu olay döngüsüne bağlı)"""
+
+    def __init__(self, channel, loop):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def _put(self, message):
+        # Olay döngüsü iş parçacığında çalışır
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            metrics.inc("pubsub_dropped_total")
+            return
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Olay döngüsü kapanmış; bağlantı zaten sonlanıyor
+            pass
+
+    async def get(self, timeout):
+        """Sıradaki olay; `timeout` sn içinde olay yoksa None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _BrokerClient:
+    """Aracıya bağlı kalan iş parçacığı; gelen olayları yerel abonelere dağıtır"""
+
+    def __init__(self, path, hub):
+        self.path = path
+        self.hub = hub
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pubsub-broker", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._thread.join(2.0)
+
+    def send(self, channel, message):
+        sock = self._sock
+        if sock is None:
+            return  # Aracı yok: diğer worker'lardaki istemciler yeniden bağlanınca eşitlenir
+        line = json.dumps({"channel": channel, "message": message}, ensure_ascii=False).encode("utf-8") + b"\n"
+        try:
+            with self._send_lock:
+                sock.sendall(line)
+        except OSError:
+            logger.warning("Pubsub broker send failed", exc_info=True)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.path)
+            except OSError:
+                self._stopping.wait(RECONNECT_SECONDS)
+                continue
+            self._sock = sock
+            try:
+                for line in sock.makefile("rb"):
+                    data = json.loads(line)
+                    self.hub.deliver(data["channel"], data["message"])
+            except (OSError, ValueError):
+                logger.warning("Pubsub broker connection lost", exc_info=True)
+            finally:
+                self._sock = None
+                sock.close()
+            if not self._stopping.is_set():
+                self._stopping.wait(RECONNECT_SECONDS)
+
+
+class Hub:
+    def __init__(self):
+        self._subscriptions = {}  # kanal -> abonelikler
+        self._lock = threading.Lock()
+        self._broker = None
+
+    def subscribe(self, channel):
+        """Olay döngüsü içinden çağrılmalı"""
+        subscription = Subscription(channel, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+            count = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+        metrics.set_gauge("pubsub_subscribers", count)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+            count = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+        metrics.set_gauge("pubsub_subscribers", count)
+
+    def deliver(self, channel, message):
+        """Yalnızca bu süreçteki abonelere dağıtır"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    def publish(self, channel, message):
+        metrics.inc("pubsub_messages_total", type=message.get("type", ""))
+        self.deliver(channel, message)
+        if self._broker is not None:
+            self._broker.send(channel, message)
+
+    def start(self, socket_path=PUBSUB_SOCKET):
+        if socket_path and self._broker is None:
+            self._broker = _BrokerClient(socket_path, self)
+            self._broker.start()
+
+    def stop(self):
+        if self._broker is not None:
+            self._broker.stop()
+            self._broker = None
+
+
+hub = Hub()
+subscribe = hub.subscribe
+unsubscribe = hub.unsubscribe
+publish = hub.publish
+start = hub.start
+stop = hub.stop
+
+
+def publish_after_commit(session, channel, message):
+    """Olayı oturumun transaction'ı başarıyla tamamlanınca yayınlanmak üzere ekler"""
+    session.info.setdefault("pubsub_pending", []).append((channel, message))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_pending(session):
+    for channel, message in session.info.pop("pubsub_pending", ()):
+        publish(channel, message)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("pubsub_pending", None)
+
+
+async def _serve(path):
+    """Aracı: her bağlantıdan gelen satırı diğer tüm bağlantılara iletir"""
+    writers = set()
+
+    async def handle(reader, writer):
+        writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for other in list(writers):
+                    if other is not writer:
+                        other.write(line)
+        finally:
+            writers.discard(writer)
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(handle, path=path)
+    print(f"Pubsub aracısı dinliyor: {path}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çoklu worker için yerel soket pubsub aracısı")
+    parser.add_argument("--socket", default=PUBSUB_SOCKET, help="Unix soket yolu (varsayılan PUBSUB_SOCKET)")
+    args = parser.parse_args()
+    if not args.socket:
+        parser.error("--socket ya da PUBSUB_SOCKET gerekli")
+    try:
+        asyncio.run(_serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
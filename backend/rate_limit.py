@@ -0,0 +1,209 @@
+"""Pahalı uç noktalar için hız sınırlama ve kabul kontrolü.
+
+Her pahalı uç nokta bir route sınıfına aittir (okuma metni, kimlik
+doğrulama, dışa aktarım). Her sınıf için:
+
+- kullanıcı ve IP başına token bucket: kova boşsa 429 + Retry-After,
+- worker başına eşzamanlı istek sınırı: doluysa beklemeden 503 + Retry-After.
+
+Kovalar varsayılan olarak bellekte tutulur. Çoklu worker kurulumlarında
+RATE_LIMIT_BACKEND=sqlite ile tüm worker'ların paylaştığı bir SQLite
+dosyası (RATE_LIMIT_DB) kullanılabilir. Diğer uç noktalar bu kontrollerden
+geçmez, böylece pahalı uç noktalar doyduğunda da hızlı kalırlar.
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory, sqlite
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "./rate_limit.db")
+
+# Bellekte tutulacak en fazla kova (en uzun süredir kullanılmayanlar atılır)
+MAX_BUCKETS = 100000
+# Eşzamanlılık sınırı dolduğunda önerilen bekleme (sn)
+CONCURRENCY_RETRY_AFTER = 1
+# SQLite kovalarında eski satırların silinme aralığı (sn)
+PRUNE_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+
+class Limit(NamedTuple):
+    rate: float  # saniyede eklenen token
+    burst: int   # kova kapasitesi
+
+
+class RouteClass(NamedTuple):
+    per_user: Optional[Limit]
+    per_ip: Limit
+    max_concurrent: int  # worker başına
+
+
+ROUTE_CLASSES = {
+    # Wikipedia isteği + 25'e kadar çeviri
+    "reading": RouteClass(per_user=Limit(0.2, 5), per_ip=Limit(1.0, 20), max_concurrent=8),
+    # bcrypt (~250 ms CPU)
+    "auth": RouteClass(per_user=None, per_ip=Limit(0.5, 10), max_concurrent=4),
+    # Tüm geçmişi tarayan uzun süreli akışlar
+    "export": RouteClass(per_user=Limit(1 / 60, 3), per_ip=Limit(0.1, 5), max_concurrent=2),
+    # 500'e kadar aktiviteyi tek transaction'da yazan toplu eşitleme
+    "sync": RouteClass(per_user=Limit(0.5, 10), per_ip=Limit(2.0, 30), max_concurrent=4),
+}
+
+ROUTE_CLASS_BY_PATH = {
+    "/api/reading/text": "reading",
+    "/api/reading/text/stream": "reading",
+    "/api/register": "auth",
+    "/api/login": "auth",
+    "/api/token": "auth",
+    "/api/activities/export": "export",
+    "/api/admin/activities/export": "export",
+    "/api/activities/sync": "sync",
+}
+
+# En yavaş dolan kovanın boştan dolmasına kadar geçen süre; bundan uzun
+# süredir güncellenmeyen kova doludur, satırı silmek davranışı değiştirmez
+FULL_REFILL_SECONDS = max(
+    limit.burst / limit.rate
+    for config in ROUTE_CLASSES.values()
+    for limit in (config.per_user, config.per_ip)
+    if limit is not None
+)
+
+
+class MemoryBuckets:
+    """Süreç içi token bucket deposu"""
+
+    blocking = False
+
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()  # anahtar -> (token, son güncelleme)
+        self._lock = threading.Lock()
+
+    def take(self, key, limit):
+        """Bir token almaya çalışır; başarılıysa 0, değilse beklenecek saniyeyi döndürür"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / limit.rate
+
+
+class SQLiteBuckets:
+    """Aynı makinedeki worker'ların paylaştığı SQLite token bucket deposu.
+
+    Kilit beklemesi olay döngüsünü bloklamasın diye take() thread havuzunda
+    çağrılmalıdır (blocking). Kilit alınamazsa istek kabul edilir.
+    """
+
+    blocking = True
+
+    def __init__(self, path=RATE_LIMIT_DB):
+        self.path = path
+        self._local = threading.local()
+        self._pruned_at = 0.0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=0.5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, limit):
+        now = time.time()  # süreçler arası karşılaştırılabilir saat
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = limit.burst if row is None else min(limit.burst, row[0] + max(0.0, now - row[1]) * limit.rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                conn.execute("INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+                if now - self._pruned_at >= PRUNE_INTERVAL:
+                    conn.execute("DELETE FROM rate_limit_buckets WHERE updated < ?", (now - FULL_REFILL_SECONDS,))
+                    self._pruned_at = now
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except sqlite3.OperationalError:
+            # Kilit çekişmesi ya da disk hatası: sınırlayıcı isteği engellemez
+            logger.warning("Rate limit bucket unavailable, admitting request", exc_info=True)
+            return 0.0
+        return 0.0 if allowed else (1 - tokens) / limit.rate
+
+
+class Rejection(NamedTuple):
+    status_code: int  # 429 ya da 503
+    retry_after: int  # saniye
+    reason: str
+
+
+class Limiter:
+    """Route sınıfı başına token bucket ve eşzamanlılık kontrolü"""
+
+    def __init__(self, buckets, route_classes=ROUTE_CLASSES):
+        self.buckets = buckets
+        self.route_classes = route_classes
+        self._active = dict.fromkeys(route_classes, 0)
+        self._lock = threading.Lock()
+
+    def check(self, route_class, user=None, ip=None):
+        """Token bucket'ları kontrol eder; istek reddedilecekse Rejection döndürür"""
+        config = self.route_classes[route_class]
+        waits = []
+        if user and config.per_user:
+            waits.append(self.buckets.take(f"{route_class}:user:{user}", config.per_user))
+        if ip:
+            waits.append(self.buckets.take(f"{route_class}:ip:{ip}", config.per_ip))
+        wait = max(waits, default=0.0)
+        if wait > 0:
+            return Rejection(429, math.ceil(wait), "rate")
+        return None
+
+    def acquire(self, route_class):
+        """Eşzamanlılık yuvası alır; sınır doluysa beklemeden False döndürür"""
+        with self._lock:
+            if self._active[route_class] >= self.route_classes[route_class].max_concurrent:
+                return False
+            self._active[route_class] += 1
+            return True
+
+    def admit(self, route_class, user=None, ip=None):
+        """Hız ve eşzamanlılık kontrolü; kabul edilen istekler işlem sonunda release() çağırmalı"""
+        rejection = self.check(route_class, user, ip)
+        if rejection is None and not self.acquire(route_class):
+            rejection = Rejection(503, CONCURRENCY_RETRY_AFTER, "concurrency")
+        return rejection
+
+    def release(self, route_class):
+        with self._lock:
+            self._active[route_class] -= 1
+
+
+def create_limiter():
+    buckets = SQLiteBuckets() if RATE_LIMIT_BACKEND == "sqlite" else MemoryBuckets()
+    return Limiter(buckets)
@@ -0,0 +1,216 @@
+"""İspanyolca metin zorluğu ve CEFR seviyesi tahmini.
+
+Zorluk puanı (0 kolay - 100 zor) üç bileşenden oluşur:
+
+- okunabilirlik: Fernández-Huerta ve Szigriszt-Pazos formüllerinin
+  ortalaması (hece/kelime ve kelime/cümle oranları),
+- kelime sıklığı: frekans sırası RARE_RANK'tan büyük (ya da listede
+  olmayan) kelimelerin oranı (word_rank indeksi yüklüyse),
+- ortalama cümle uzunluğu.
+
+Hece, kelime ve cümle sayımı karakter kodları üzerinde tek bir NumPy
+geçişiyle yapılır; birden çok metin (derlem ya da bir metnin paragrafları)
+aynı geçişte puanlanır. Hece sayımı ünlü gruplarına dayanır: iki güçlü
+ünlü (a, e, o ve vurgulu í, ú) yan yanaysa ayrı hece, diğer ünlü
+birleşimleri ikili/üçlü ünlü sayılır.
+"""
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from . import word_rank
+from .text_analysis import tokenize
+
+SEGMENT_SEPARATOR = "\x00"
+
+STRONG_VOWELS = "aeoáéóíú"
+WEAK_VOWELS = "iuü"
+SENTENCE_TERMINALS = ".!?…"
+
+RARE_RANK = 3000  # Bu sıradan sonraki kelimeler "seyrek" sayılır
+
+# Bileşen ağırlıkları (kelime sıklığı indeksi yoksa diğerleri orantılı büyür)
+READABILITY_WEIGHT = 0.5
+LEXICAL_WEIGHT = 0.25
+SENTENCE_WEIGHT = 0.25
+
+# Ortalama cümle uzunluğu bu aralıkta 0-100'e ölçeklenir
+SHORT_SENTENCE_WORDS = 5
+LONG_SENTENCE_WORDS = 35
+# Seyrek kelime oranı bu değerde en yüksek zorluğa ulaşır
+MAX_RARE_SHARE = 0.5
+
+# Pasaj seçiminde uzunluk sınırının tamamen boş kalmasının zorluk puanı cinsinden cezası
+FILL_WEIGHT = 10.0
+
+# Seviye -> zorluk aralığı [alt, üst)
+LEVEL_RANGES = {
+    "a1": (0.0, 25.0),
+    "a2": (25.0, 35.0),
+    "b1": (35.0, 45.0),
+    "b2": (45.0, 55.0),
+    "c1": (55.0, 65.0),
+    "c2": (65.0, 100.1),
+}
+
+
+class ReadabilityScores(NamedTuple):
+    words: int
+    sentences: int
+    syllables: int
+    fernandez_huerta: float
+    szigriszt_pazos: float
+    rare_word_share: Optional[float]  # Kelime sıklığı indeksi yoksa None
+    avg_sentence_length: float
+    difficulty: float  # 0 (kolay) - 100 (zor)
+    level: str  # Tahmini CEFR seviyesi
+
+
+def _codes(chars):
+    return np.array([ord(c) for c in chars], dtype=np.uint32)
+
+
+_STRONG = _codes(STRONG_VOWELS)
+_VOWELS = _codes(STRONG_VOWELS + WEAK_VOWELS)
+_TERMINALS = _codes(SENTENCE_TERMINALS)
+
+
+def _is_letter(codes):
+    # a-z, Latin-1 harfleri (÷ hariç) ve Latin Genişletilmiş-A/B
+    return (
+        ((codes >= 97) & (codes <= 122))
+        | ((codes >= 0xDF) & (codes <= 0xFF) & (codes != 0xF7))
+        | ((codes >= 0x100) & (codes <= 0x24F))
+    )
+
+
+def _previous(flags):
+    shifted = np.empty_like(flags)
+    shifted[0] = False
+    shifted[1:] = flags[:-1]
+    return shifted
+
+
+def level_for(difficulty):
+    """Zorluk puanına karşılık gelen CEFR seviyesi"""
+    for level, (low, high) in LEVEL_RANGES.items():
+        if difficulty < high:
+            return level
+    return "c2"
+
+
+def level_target(level):
+    """Seviyenin zorluk aralığının ortası (seçimde hedef puan)"""
+    low, high = LEVEL_RANGES.get(level, LEVEL_RANGES["b1"])
+    return (low + min(high, 100.0)) / 2
+
+
+def score_texts(texts, index=None) -> List[ReadabilityScores]:
+    """Metinleri tek vektörel geçişte puanlar.
+
+    index verilmezse İspanyolca kelime sıklığı indeksi kullanılır; boş
+    indeks verilirse kelime sıklığı bileşeni atlanır.
+    """
+    n = len(texts)
+    if n == 0:
+        return []
+    joined = SEGMENT_SEPARATOR.join(text.lower() for text in texts)
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    segment = np.cumsum(codes == ord(SEGMENT_SEPARATOR))
+
+    letter = _is_letter(codes)
+    vowel = np.isin(codes, _VOWELS)
+    strong = np.isin(codes, _STRONG)
+    terminal = np.isin(codes, _TERMINALS)
+
+    word_starts = letter & ~_previous(letter)
+    # Önceki karakter ünlü değilse ya da ikisi de güçlü ünlüyse (ayrı hece) yeni hece çekirdeği
+    nuclei = vowel & ~(_previous(vowel) & ~(strong & _previous(strong)))
+    sentence_ends = terminal & ~_previous(terminal)
+
+    words = np.bincount(segment[word_starts], minlength=n)
+    syllables = np.bincount(segment[nuclei], minlength=n)
+    sentences = np.maximum(np.bincount(segment[sentence_ends], minlength=n), 1)
+
+    safe_words = np.maximum(words, 1)
+    syllables_per_word = syllables / safe_words
+    words_per_sentence = words / sentences
+    fernandez_huerta = 206.84 - 60.0 * syllables_per_word - 102.0 * sentences / safe_words
+    szigriszt_pazos = 206.835 - 62.3 * syllables_per_word - words_per_sentence
+
+    readability = np.clip(100.0 - (fernandez_huerta + szigriszt_pazos) / 2, 0, 100)
+    sentence_length = np.clip(
+        (words_per_sentence - SHORT_SENTENCE_WORDS) * 100.0 / (LONG_SENTENCE_WORDS - SHORT_SENTENCE_WORDS), 0, 100
+    )
+
+    if index is None:
+        index = word_rank.get_index()
+    if index is not None and len(index):
+        token_lists = [tokenize(text) for text in texts]
+        ranks = index.lookup([token for tokens in token_lists for token in tokens])
+        token_segments = np.repeat(np.arange(n), [len(tokens) for tokens in token_lists])
+        rare = np.bincount(token_segments[ranks > RARE_RANK], minlength=n)
+        rare_share = rare / np.maximum([len(tokens) for tokens in token_lists], 1)
+        lexical = np.clip(rare_share * 100.0 / MAX_RARE_SHARE, 0, 100)
+        difficulty = READABILITY_WEIGHT * readability + LEXICAL_WEIGHT * lexical + SENTENCE_WEIGHT * sentence_length
+    else:
+        rare_share = [None] * n
+        difficulty = (READABILITY_WEIGHT * readability + SENTENCE_WEIGHT * sentence_length) / (
+            READABILITY_WEIGHT + SENTENCE_WEIGHT
+        )
+
+    return [
+        ReadabilityScores(
+            words=int(words[i]),
+            sentences=int(sentences[i]),
+            syllables=int(syllables[i]),
+            fernandez_huerta=round(float(fernandez_huerta[i]), 2),
+            szigriszt_pazos=round(float(szigriszt_pazos[i]), 2),
+            rare_word_share=None if rare_share[i] is None else round(float(rare_share[i]), 4),
+            avg_sentence_length=round(float(words_per_sentence[i]), 2),
+            difficulty=round(float(difficulty[i]), 2),
+            level=level_for(float(difficulty[i])),
+        )
+        for i in range(n)
+    ]
+
+
+def score_text(text, index=None) -> ReadabilityScores:
+    return score_texts([text], index)[0]
+
+
+def select_passage(text, level, max_chars, index=None):
+    """Metinden seviyeye en uygun, en fazla max_chars uzunluğundaki ardışık paragrafları seçer.
+
+    Başlıklar ("== Tarih ==") ve çok kısa satırlar atlanır; paragraflar tek
+    geçişte puanlanır ve uzunluk sınırının en az yarısını dolduran pencereler
+    arasından kelime sayısıyla ağırlıklı zorluğu hedefe en yakın olan seçilir
+    (boş kalan uzunluk FILL_WEIGHT ile cezalandırılır).
+    Uygun paragraf yoksa metnin başı döner.
+    """
+    paragraphs = [
+        line.strip() for line in text.split("\n")
+        if len(line.strip()) >= 40 and not line.strip().startswith("=")
+    ]
+    if not paragraphs:
+        return text[:max_chars]
+
+    scores = score_texts(paragraphs, index)
+    target = level_target(level)
+    min_chars = min(max_chars, sum(len(paragraph) + 1 for paragraph in paragraphs)) // 2
+    best, best_distance = (0, 1), None
+    for start in range(len(paragraphs)):
+        length, words, weighted = 0, 0, 0.0
+        end = start
+        while end < len(paragraphs) and (end == start or length + len(paragraphs[end]) + 1 <= max_chars):
+            length += len(paragraphs[end]) + 1
+            words += scores[end].words
+            weighted += scores[end].difficulty * scores[end].words
+            end += 1
+        if length < min_chars:
+            continue
+        distance = abs(weighted / max(words, 1) - target) + FILL_WEIGHT * (1 - min(length, max_chars) / max_chars)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = (start, end), distance
+
+    return "\n".join(paragraphs[best[0]:best[1]])[:max_chars]
@@ -0,0 +1,119 @@
+"""Okuma geçmişi ve içerik adresli metin deposu.
+
+Okunan her metin (metin, özet, kelimeler ve anlamları) seviye ve metnin
+sha256 özetiyle anahtarlanan `text_blobs` tablosuna zlib ile sıkıştırılmış
+JSON olarak bir kez yazılır; kullanıcının okuma kaydı (`reading_sessions`)
+yalnızca bu özete başvurur. Geçmişteki bir metni yeniden açmak birincil
+anahtar üzerinden tek bir birleştirme sorgusudur; Wikipedia'ya, özetleyiciye
+ya da çeviri servisine gidilmez.
+"""
+import hashlib
+import json
+import zlib
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .database import SessionLocal, ReadingSession, TextBlob
+from .responses import rows_to_dicts
+from .srs import DATETIME_FORMAT
+
+COMPRESSION_LEVEL = 6
+MAX_PAGE_SIZE = 100
+
+# Sıkıştırılmış gövdede saklanan alanlar (başlık, adres, kaynak ve seviye ayrı sütunlarda)
+BODY_FIELDS = ("text", "summary", "unknown_words", "verbs", "nouns", "word_meanings", "readability", "lemmas", "language")
+
+
+def text_hash(level, text):
+    """Metnin içerik adresi; seviye özet uzunluğunu ve kelime seçimini değiştirdiğinden anahtara dahildir"""
+    return hashlib.sha256(f"{level}\n{text}".encode("utf-8")).hexdigest()
+
+
+def pack(reading):
+    body = json.dumps({field: reading[field] for field in BODY_FIELDS}, ensure_ascii=False).encode("utf-8")
+    return zlib.compress(body, COMPRESSION_LEVEL), len(body)
+
+
+def unpack(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def save_reading(db, user_id, reading):
+    """Metni (yoksa) depoya ve okuma kaydını kullanıcının geçmişine yazar; kayıt kimliğini döndürür"""
+    now = datetime.now().strftime(DATETIME_FORMAT)
+    digest = text_hash(reading["level"], reading["text"])
+    data, size = pack(reading)
+    db.execute(
+        sqlite_insert(TextBlob).values(
+            hash=digest,
+            title=reading["title"],
+            url=reading["url"],
+            source=reading["source"],
+            level=reading["level"],
+            data=data,
+            size=size,
+            created_at=now
+        ).on_conflict_do_nothing(index_elements=["hash"])
+    )
+    reading_session = ReadingSession(user_id=user_id, text_hash=digest, read_at=now)
+    db.add(reading_session)
+    db.commit()
+    return reading_session.id
+
+
+def record_reading(user_id, reading):
+    """save_reading'in kendi veritabanı oturumunu açan sürümü (akışlı yanıtın sonunda kullanılır)"""
+    db = SessionLocal()
+    try:
+        return save_reading(db, user_id, reading)
+    finally:
+        db.close()
+
+
+def get_history(db, user_id, before=None, limit=20):
+    """Kullanıcının okuma geçmişinden bir sayfa (yeniden eskiye) döndürür.
+
+    Sayfalama anahtar tabanlıdır: sonraki sayfa için dönen `next_before`
+    değeri `before` olarak verilir.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(
+        ReadingSession.id,
+        ReadingSession.read_at,
+        TextBlob.title,
+        TextBlob.source,
+        TextBlob.level
+    ).join(TextBlob, TextBlob.hash == ReadingSession.text_hash).filter(ReadingSession.user_id == user_id)
+    if before is not None:
+        query = query.filter(ReadingSession.id < before)
+    rows = query.order_by(ReadingSession.id.desc()).limit(limit + 1).all()
+
+    items = rows_to_dicts(rows[:limit])
+    next_before = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_before": next_before}
+
+
+def load_reading(db, user_id, session_id):
+    """Geçmişteki metni okuma uç noktasıyla aynı biçimde döndürür; kayıt yoksa None"""
+    row = db.query(
+        ReadingSession.id,
+        TextBlob.title,
+        TextBlob.url,
+        TextBlob.source,
+        TextBlob.level,
+        TextBlob.data
+    ).join(TextBlob, TextBlob.hash == ReadingSession.text_hash).filter(
+        ReadingSession.id == session_id,
+        ReadingSession.user_id == user_id
+    ).first()
+    if row is None:
+        return None
+    return {
+        "title": row.title,
+        "url": row.url,
+        "level": row.level,
+        "source": row.source,
+        "session_id": row.id,
+        **unpack(row.data)
+    }
@@ -0,0 +1,283 @@
+"""Aktivite önerilerinin toplu (vektörel) hesaplanması.
+
+Gece çalışan iş tüm kullanıcıların aktivite toplamlarını ve profillerini
+NumPy dizilerine yükler, öneri kurallarını tek seferde tüm kullanıcılar için
+değerlendirir ve sonuçları `user_recommendations` tablosuna yazar. Özet
+endpoint'i önerileri doğrudan bu tablodan okur.
+
+Çalıştırma: python -m backend.recommendations --period all
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from .database import engine, init_db, bump_versions, UserRecommendation, RECOMMENDATIONS_SCOPE
+
+# Özette takip edilen aktivite türleri (öneriler bu sırayla üretilir)
+ACTIVITY_TYPES = [
+    "konuşma",
+    "yazma",
+    "dinleme",
+    "okuma",
+    "gramer öğrenme",
+    "kelime dağarcığı geliştirme",
+]
+
+# Periyot -> gün sayısı
+PERIOD_DAYS = {"week": 7, "month": 30, "year": 365}
+
+# Kural eşikleri
+TARGET_LOW_RATIO = 0.5      # Hedef aktivitenin günlük ortalaması hedefin yarısından azsa
+BALANCE_MAX_SHARE = 10      # Toplam içindeki payı %10'dan az ...
+BALANCE_MAX_MINUTES = 30    # ... ve 30 dakikadan az olan aktiviteler
+ROUTINE_MIN_MINUTES = 30    # Periyottaki toplam çalışma 30 dakikadan azsa
+TARGET_HIGH_RATIO = 1.2     # Günlük ortalama hedefin 1.2 katını geçerse
+INACTIVE_DAYS = 3           # Son aktiviteden bu yana geçen gün sayısı
+DOMINANT_MIN_SHARE = 70     # Tek bir aktivitenin toplam içindeki payı
+DOMINANT_MIN_MINUTES = 60   # Baskınlık kuralı için gereken en az toplam süre
+
+BATCH_SIZE = 50000
+
+
+def period_start(period, today=None):
+    """Periyodun başlangıç tarihini ve gün sayısını döndürür"""
+    today = today or datetime.now().date()
+    days = PERIOD_DAYS.get(period, PERIOD_DAYS["week"])
+    return (today - timedelta(days=days)).strftime("%Y-%m-%d"), days
+
+
+# Mesaj şablonları
+def _target_low_message(activity_type):
+    return f"{activity_type.capitalize()} hedefinize ulaşmak için daha fazla zaman ayırmalısınız."
+
+def _balance_message(activity_type):
+    return f"{activity_type.capitalize()} pratiği eksik görünüyor, daha fazla zaman ayırın."
+
+def _dominant_message(activity_type):
+    return f"Çalışmalarınızın büyük kısmı {activity_type} üzerine. Diğer becerileri de ihmal etmeyin."
+
+ROUTINE_MESSAGE = "Düzenli çalışma alışkanlığı geliştirmelisiniz. Her gün en az 15 dakika ayırın."
+INACTIVE_MESSAGE = f"Son {INACTIVE_DAYS} gündür aktivite kaydınız yok. Bugün kısa bir tekrarla yeniden başlayın."
+SUCCESS_MESSAGE = "Harika ilerliyorsunuz! Hedeflerinizi biraz daha yükseltmeyi düşünebilirsiniz."
+
+
+def build_recommendations(summary, days, target_activity, target_minutes, days_since_last=None):
+    """Tek bir kullanıcı için önerileri üretir (toplu işin skaler karşılığı)"""
+    recommendations = []
+    total = summary["total"]
+
+    # Hedef aktivite kontrolü
+    if target_activity in ACTIVITY_TYPES:
+        if summary[target_activity] / days < target_minutes * TARGET_LOW_RATIO:
+            recommendations.append(_target_low_message(target_activity))
+
+    # Aktivite dengesi
+    if total > 0:
+        for activity_type in ACTIVITY_TYPES:
+            minutes = summary[activity_type]
+            if (minutes / total) * 100 < BALANCE_MAX_SHARE and minutes < BALANCE_MAX_MINUTES:
+                recommendations.append(_balance_message(activity_type))
+
+        # Tek bir aktiviteye yığılma
+        dominant = max(ACTIVITY_TYPES, key=lambda a: summary[a])
+        if (total >= DOMINANT_MIN_MINUTES and dominant != target_activity
+                and (summary[dominant] / total) * 100 >= DOMINANT_MIN_SHARE):
+            recommendations.append(_dominant_message(dominant))
+
+    # Çalışma rutini
+    if total < ROUTINE_MIN_MINUTES:
+        recommendations.append(ROUTINE_MESSAGE)
+
+    # Ara verme
+    if total > 0 and days_since_last is not None and days_since_last >= INACTIVE_DAYS:
+        recommendations.append(INACTIVE_MESSAGE)
+
+    # Başarı durumu
+    if total / days > target_minutes * TARGET_HIGH_RATIO:
+        recommendations.append(SUCCESS_MESSAGE)
+
+    return recommendations
+
+
+def _user_filter(user_ids):
+    """user_ids verilmişse SQL koşulu ve parametreleri; aksi halde boş"""
+    if user_ids is None:
+        return "", {}
+    params = {f"user_{i}": user_id for i, user_id in enumerate(user_ids)}
+    return f"user_id IN ({', '.join(':' + name for name in params)})", params
+
+
+def load_profiles(conn, user_ids=None):
+    """Profili olan kullanıcıları yükler (user_ids verilmezse tümü)"""
+    condition, params = _user_filter(user_ids)
+    profiles = pd.read_sql(
+        text("SELECT user_id, learning_purpose, daily_minutes FROM user_profiles"
+             + (f" WHERE {condition}" if condition else "")),
+        conn,
+        params=params,
+    )
+    profiles["learning_purpose"] = profiles["learning_purpose"].fillna("").str.lower()
+    profiles["daily_minutes"] = profiles["daily_minutes"].fillna(0)
+    return profiles
+
+
+def load_aggregates(conn, start_date, end_date, user_ids=None):
+    """Kullanıcı ve aktivite türü bazında toplam süreleri yükler"""
+    condition, params = _user_filter(user_ids)
+    # SQLite lower() yalnızca ASCII harfleri küçülttüğü için türler pandas'ta küçültülür
+    return pd.read_sql(
+        text(
+            "SELECT user_id, activity_type, SUM(duration) AS minutes, MAX(completed_at) AS last_date "
+            "FROM user_activities "
+            "WHERE completed_at >= :start_date AND completed_at <= :end_date "
+            + (f"AND {condition} " if condition else "")
+            + "GROUP BY user_id, activity_type"
+        ),
+        conn,
+        params={"start_date": start_date, "end_date": end_date, **params},
+    )
+
+
+def compute_batch(profiles, aggregates, days, today):
+    """Tüm kullanıcılar için kuralları vektörel olarak değerlendirir.
+
+    Her kullanıcı için öneri listesini `profiles` sırasıyla döndürür.
+    """
+    n_users = len(profiles)
+    n_types = len(ACTIVITY_TYPES)
+    type_index = {activity_type: i for i, activity_type in enumerate(ACTIVITY_TYPES)}
+    user_index = pd.Index(profiles["user_id"].to_numpy())
+
+    # Kullanıcı x aktivite türü süre matrisi
+    minutes = np.zeros((n_users, n_types), dtype=np.float64)
+    last_active = np.full(n_users, np.datetime64("NaT"), dtype="datetime64[D]")
+    if len(aggregates):
+        rows = user_index.get_indexer(aggregates["user_id"].to_numpy())
+        cols = aggregates["activity_type"].fillna("").str.lower().map(type_index).fillna(-1).to_numpy(dtype=np.int64)
+        mask = (rows >= 0) & (cols >= 0)
+        np.add.at(minutes, (rows[mask], cols[mask]), aggregates["minutes"].to_numpy(dtype=np.float64)[mask])
+
+        # Kullanıcı başına son aktivite tarihi
+        last_dates = pd.to_datetime(aggregates["last_date"], errors="coerce").to_numpy().astype("datetime64[D]")
+        last_by_user = pd.Series(last_dates[mask]).groupby(rows[mask]).max()
+        last_active[last_by_user.index.to_numpy()] = last_by_user.to_numpy().astype("datetime64[D]")
+
+    total = minutes.sum(axis=1)
+    has_total = total > 0
+    safe_total = np.where(has_total, total, 1.0)
+    share = minutes / safe_total[:, None] * 100
+    target_minutes = profiles["daily_minutes"].to_numpy(dtype=np.float64)
+    target_idx = profiles["learning_purpose"].map(type_index).fillna(-1).to_numpy(dtype=np.int64)
+    has_target = target_idx >= 0
+
+    # Kurallar
+    target_daily = minutes[np.arange(n_users), np.where(has_target, target_idx, 0)] / days
+    target_low = has_target & (target_daily < target_minutes * TARGET_LOW_RATIO)
+    balance = has_total[:, None] & (share < BALANCE_MAX_SHARE) & (minutes < BALANCE_MAX_MINUTES)
+    dominant_idx = minutes.argmax(axis=1)
+    dominant = (
+        has_total
+        & (total >= DOMINANT_MIN_MINUTES)
+        & (dominant_idx != target_idx)
+        & (share[np.arange(n_users), dominant_idx] >= DOMINANT_MIN_SHARE)
+    )
+    routine = total < ROUTINE_MIN_MINUTES
+    days_since_last = (np.datetime64(today, "D") - last_active).astype(np.int64)
+    inactive = has_total & ~np.isnat(last_active) & (days_since_last >= INACTIVE_DAYS)
+    success = total / days > target_minutes * TARGET_HIGH_RATIO
+
+    # Mesajları kullanıcı bazında birleştir (kural sırası skaler sürümle aynı)
+    target_messages = [_target_low_message(a) for a in ACTIVITY_TYPES]
+    balance_messages = [_balance_message(a) for a in ACTIVITY_TYPES]
+    dominant_messages = [_dominant_message(a) for a in ACTIVITY_TYPES]
+
+    results = [[] for _ in range(n_users)]
+    for i in np.flatnonzero(target_low):
+        results[i].append(target_messages[target_idx[i]])
+    balance_rows, balance_cols = np.nonzero(balance)
+    for i, j in zip(balance_rows, balance_cols):
+        results[i].append(balance_messages[j])
+    for i in np.flatnonzero(dominant):
+        results[i].append(dominant_messages[dominant_idx[i]])
+    for i in np.flatnonzero(routine):
+        results[i].append(ROUTINE_MESSAGE)
+    for i in np.flatnonzero(inactive):
+        results[i].append(INACTIVE_MESSAGE)
+    for i in np.flatnonzero(success):
+        results[i].append(SUCCESS_MESSAGE)
+    return results
+
+
+def run_batch(periods=("week", "month", "year"), today=None, user_ids=None):
+    """Önerileri hesaplar ve tabloya yazar; periyot başına kullanıcı sayısını döndürür.
+
+    user_ids verilirse yalnızca bu kullanıcıların önerileri yeniden hesaplanır.
+    """
+    init_db()
+    today = today or datetime.now().date()
+    end_date = today.strftime("%Y-%m-%d")
+    table = UserRecommendation.__table__
+    counts = {}
+
+    with engine.connect() as conn:
+        profiles = load_profiles(conn, user_ids)
+
+    for period in periods:
+        start_date, days = period_start(period, today)
+        with engine.connect() as conn:
+            aggregates = load_aggregates(conn, start_date, end_date, user_ids)
+        results = compute_batch(profiles, aggregates, days, today)
+
+        profile_ids = profiles["user_id"].tolist()
+        with engine.begin() as conn:
+            stale = table.delete().where(table.c.period == period)
+            if user_ids is not None:
+                stale = stale.where(table.c.user_id.in_(user_ids))
+            conn.execute(stale)
+            for offset in range(0, len(profile_ids), BATCH_SIZE):
+                conn.execute(table.insert(), [
+                    {
+                        "user_id": user_id,
+                        "period": period,
+                        "recommendations": json.dumps(recommendations, ensure_ascii=False),
+                        "computed_at": end_date,
+                    }
+                    for user_id, recommendations in zip(
+                        profile_ids[offset:offset + BATCH_SIZE], results[offset:offset + BATCH_SIZE]
+                    )
+                ])
+            bump_versions(conn, [RECOMMENDATIONS_SCOPE])
+        counts[period] = len(profile_ids)
+
+    return counts
+
+
+def get_stored_recommendations(db, user_id, period, today=None):
+    """Bugün hesaplanmış önerileri döndürür; yoksa None"""
+    today = today or datetime.now().date()
+    row = db.query(UserRecommendation).filter(
+        UserRecommendation.user_id == user_id,
+        UserRecommendation.period == period,
+        UserRecommendation.computed_at == today.strftime("%Y-%m-%d"),
+    ).first()
+    if row is None:
+        return None
+    return json.loads(row.recommendations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Toplu öneri hesaplama işi")
+    parser.add_argument("--period", default="all", choices=["all"] + list(PERIOD_DAYS))
+    args = parser.parse_args()
+
+    periods = tuple(PERIOD_DAYS) if args.period == "all" else (args.period,)
+    started = time.perf_counter()
+    counts = run_batch(periods)
+    for period, count in counts.items():
+        print(f"{period}: {count} kullanıcı için öneri hesaplandı")
+    print(f"Süre: {time.perf_counter() - started:.1f} sn")
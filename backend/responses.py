@@ -0,0 +1,40 @@
+"""Hızlı JSON yanıtları.
+
+Büyük yanıt gövdeleri (aktivite listeleri, okuma metinleri) için
+jsonable_encoder ve Pydantic dönüşümünü atlayan yanıt sınıfı. orjson
+kuruluysa onu, değilse kompakt standart json'u kullanır. Uç noktalar bu
+sınıfı açıkça seçer (response_class) ve içeriği hazır sözlükler olarak
+döndürür.
+"""
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # İsteğe bağlı bağımlılık
+    orjson = None
+
+
+def dumps(content):
+    """İçeriği kompakt UTF-8 JSON baytlarına çevirir"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def ndjson_line(content):
+    """NDJSON akışı için tek satır"""
+    return dumps(content) + b"\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """İçeriği doğrudan (doğrulama ve kodlama yapmadan) JSON'a çevirir"""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def rows_to_dicts(rows):
+    """Sütun sorgusu sonuçlarını (Row) sözlük listesine çevirir"""
+    return [dict(row._mapping) for row in rows]
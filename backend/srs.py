@@ -0,0 +1,35 @@
+"""SM-2 aralıklı tekrar hesaplamaları."""
+from datetime import datetime, timedelta
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+MIN_EASE_FACTOR = 1.3
+MAX_QUALITY = 5
+PASSING_QUALITY = 3
+
+
+def sm2(quality, repetitions, interval, ease_factor):
+    """Bir tekrar sonucuna göre yeni (tekrar sayısı, aralık, kolaylık katsayısı) döndürür.
+
+    quality: 0 (hiç hatırlamadı) - 5 (kusursuz hatırladı)
+    """
+    if quality < PASSING_QUALITY:
+        repetitions = 0
+        interval = 1
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease_factor)
+        repetitions += 1
+
+    ease_factor += 0.1 - (MAX_QUALITY - quality) * (0.08 + (MAX_QUALITY - quality) * 0.02)
+    return repetitions, interval, max(MIN_EASE_FACTOR, ease_factor)
+
+
+def next_due(interval, now=None):
+    """Aralık (gün) sonrasındaki tekrar zamanını döndürür"""
+    now = now or datetime.now()
+    return (now + timedelta(days=interval)).strftime(DATETIME_FORMAT)
@@ -0,0 +1,154 @@
+"""İspanyolca cümle bölme ve çıkarımsal özetleme.
+
+Cümleler kısaltmaları ve baş harfleri dikkate alan bir bölücü ile ayrılır.
+Özet, TF-IDF cümle vektörleri üzerinde NumPy matris işlemleriyle çalışan
+TextRank puanlarına göre seçilir. Sonuçlar metnin özeti (hash) ve cümle
+sayısına göre önbelleğe alındığı için aynı metin tekrar özetlenmez.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import metrics
+from .text_analysis import tokenize, BASIC_SPANISH_WORDS
+
+# Cümle sonu adayı: noktalama, ardından gelen kapanış işaretleri ve boşluk
+BOUNDARY_RE = re.compile(r"[.!?…]+[\"'»”’)\]]*\s+")
+
+# Sonrasında cümle bölünmeyen kısaltmalar (noktasız, küçük harf)
+ABBREVIATIONS = frozenset({
+    "sr", "sra", "srta", "sres", "sras", "dr", "dra", "dres", "lic", "ing", "arq", "prof",
+    "profa", "d", "dña", "ud", "uds", "vd", "vds", "etc", "pág", "págs", "pp", "núm",
+    "nº", "vol", "vols", "cap", "art", "fig", "ej", "aprox", "av", "avda", "ee", "uu",
+    "gral", "cía", "dpto", "depto", "tel", "máx", "mín", "admón", "adj", "lat", "long",
+    "st", "sta", "sto", "op", "cit", "ibíd", "íd", "vs",
+})
+
+# TextRank ayarları
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+MIN_SENTENCE_WORDS = 4
+
+# Özet önbelleği (hash, cümle sayısı) -> özet
+CACHE_SIZE = 1024
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _is_abbreviation(text, end):
+    """`end` konumundaki noktadan önceki kelime kısaltma ya da baş harf mi"""
+    start = end
+    while start > 0 and not text[start - 1].isspace() and text[start - 1] not in "(«\"'":
+        start -= 1
+    word = text[start:end].lower()
+    if not word:
+        return False
+    # Tek harfli baş harfler (J. R. R., a. C.) ve bilinen kısaltmalar
+    return (len(word) == 1 and word.isalpha()) or word in ABBREVIATIONS
+
+
+def split_sentences(text):
+    """Metni cümlelere böler; paragraf sonları da cümle sınırıdır"""
+    sentences = []
+    for paragraph in text.splitlines():
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        start = 0
+        for match in BOUNDARY_RE.finditer(paragraph):
+            # Tek nokta ile biten adaylarda kısaltma kontrolü yapılır
+            if match.group().rstrip() == "." and _is_abbreviation(paragraph, match.start()):
+                continue
+            # Küçük harfle devam eden metin aynı cümlenin parçasıdır
+            if paragraph[match.end()].islower():
+                continue
+            sentences.append(paragraph[start:match.end()].strip())
+            start = match.end()
+        if start < len(paragraph):
+            sentences.append(paragraph[start:].strip())
+    return sentences
+
+
+def textrank_scores(token_lists, stopwords=BASIC_SPANISH_WORDS):
+    """Cümle token listelerinden TextRank puanlarını hesaplar"""
+    vocabulary = {}
+    rows = []
+    cols = []
+    for i, tokens in enumerate(token_lists):
+        for token in tokens:
+            if token not in stopwords:
+                rows.append(i)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    n = len(token_lists)
+    if not vocabulary:
+        return np.full(n, 1.0 / n)
+
+    # TF-IDF matrisi (cümle x kelime), satırlar L2 normalize
+    tf = np.zeros((n, len(vocabulary)))
+    np.add.at(tf, (np.array(rows), np.array(cols)), 1.0)
+    df = np.count_nonzero(tf, axis=0)
+    tfidf = tf * (np.log((1.0 + n) / (1.0 + df)) + 1.0)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf /= np.where(norms > 0, norms, 1.0)
+
+    # Kosinüs benzerlik matrisi -> satır-stokastik geçiş matrisi
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(row_sums > 0, similarity / np.where(row_sums > 0, row_sums, 1.0), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def _summarize(text, sentence_count, stopwords):
+    sentences = split_sentences(text)
+    if len(sentences) <= sentence_count:
+        return text
+
+    # Başlık gibi çok kısa parçalar özet adayı değildir
+    token_lists = [tokenize(sentence) for sentence in sentences]
+    candidates = [i for i, tokens in enumerate(token_lists) if len(tokens) >= MIN_SENTENCE_WORDS]
+    if len(candidates) <= sentence_count:
+        return " ".join(sentences[i] for i in candidates) or text
+
+    scores = textrank_scores([token_lists[i] for i in candidates], stopwords)
+    best = np.argsort(-scores, kind="stable")[:sentence_count]
+    return " ".join(sentences[candidates[i]] for i in sorted(best))
+
+
+def summarize(text, sentence_count=3, stopwords=BASIC_SPANISH_WORDS):
+    """Metnin en önemli `sentence_count` cümlesini orijinal sırasıyla döndürür"""
+    # Aynı metin farklı dilin durdurma kelimeleriyle farklı özetlenir; dil
+    # paketlerinin kümeleri frozenset olduğundan hash'leri bir kez hesaplanır
+    key = (hashlib.sha1(text.encode("utf-8")).hexdigest(), sentence_count, frozenset(stopwords))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            metrics.record_cache("summary", True)
+            return _cache[key]
+    metrics.record_cache("summary", False)
+
+    summary = _summarize(text, sentence_count, stopwords)
+
+    with _cache_lock:
+        _cache[key] = summary
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return summary
+
+
+def lead_summary(text, sentence_count=3):
+    """İlk `sentence_count` cümleden oluşan basit özet (yedek yol)"""
+    return " ".join(split_sentences(text)[:sentence_count])
@@ -0,0 +1,148 @@
+"""Arka plan işlerinin işleyicileri.
+
+Worker süreçleri bu modülü içe aktararak işleyicileri kaydeder. Yerel
+önbellekleri ısıtan işler (Wikipedia ön yüklemesi) yalnızca local=True ile
+eklenmelidir; ayrı bir worker sürecinde çalışırsa uygulamanın önbelleğine
+etkisi olmaz.
+"""
+import logging
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from . import cohorts, exports, jobs, language_packs, leaderboards
+from .outbound import OutboundError
+from .recommendations import run_batch
+from .wikipedia import fetch_page
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports")
+EXPORT_RETENTION = float(os.getenv("EXPORT_RETENTION_HOURS", "24")) * 3600  # Dışa aktarım dosyalarının saklanma süresi (sn)
+EXPORT_CLEANUP_INTERVAL = 3600
+EXPORT_ID_PATTERN = re.compile(r"[0-9a-f]{32}")  # uuid4().hex
+ROLLUP_INTERVAL = 24 * 3600  # Toplu öneri hesaplama aralığı (sn)
+ROLLUP_TIME = os.getenv("ROLLUP_TIME", "03:00")  # Gece toplu işlerinin yerel saati (SS:DD)
+REFRESH_DELAY = 30.0  # Aktivite sonrası öneri yenileme gecikmesi; ardışık kayıtlar tek işte birleşir
+
+
+def seconds_until(clock, now=None):
+    """Bir sonraki yerel `clock` (SS:DD) anına kalan saniye"""
+    now = now or datetime.now()
+    hour, minute = map(int, clock.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def schedule_periodic_jobs():
+    """Periyodik işleri zamanlar.
+
+    Gece işleri ilk kez bir sonraki ROLLUP_TIME'da çalışır, sonra o saate
+    hizalı olarak günde bir tekrarlanır. Tek kopya garantisi kalıcı kuyruğun
+    tekilleştirmesinden gelir; bu yüzden yalnızca tüm süreçlerin paylaştığı
+    SQLite kuyruğunda zamanlanır ve her süreç açılışında çağrılabilir. Bellek
+    kuyruğunda her uvicorn worker'ı işleri ayrı ayrı çalıştıracağından
+    zamanlanmaz.
+    """
+    if jobs.JOB_BACKEND != "sqlite":
+        logger.info("Periyodik işler zamanlanmadı: tek kopya için JOB_BACKEND=sqlite gerekir")
+        return
+    delay = seconds_until(ROLLUP_TIME)
+    jobs.schedule_periodic("recommendations.rollup", ROLLUP_INTERVAL, delay=delay)
+    jobs.schedule_periodic("cohorts.rollup", ROLLUP_INTERVAL, delay=delay)
+    jobs.schedule_periodic("leaderboards.prune", ROLLUP_INTERVAL, delay=delay)
+    jobs.schedule_periodic("exports.cleanup", EXPORT_CLEANUP_INTERVAL, delay=EXPORT_CLEANUP_INTERVAL)
+
+
+@jobs.handler("recommendations.rollup")
+def rollup_recommendations(payload):
+    return run_batch()
+
+
+@jobs.handler("cohorts.rollup")
+def rollup_cohort_totals(payload):
+    return cohorts.rollup()
+
+
+@jobs.handler("leaderboards.prune")
+def prune_leaderboards(payload):
+    return leaderboards.prune()
+
+
+@jobs.handler("recommendations.refresh_user")
+def refresh_user_recommendations(payload):
+    return run_batch(user_ids=[payload["user_id"]])
+
+
+def enqueue_recommendation_refresh(user_id):
+    """Kullanıcının önerilerini gecikmeli yeniler; bekleyen yenileme varsa yeni iş eklenmez"""
+    return jobs.enqueue(
+        "recommendations.refresh_user", {"user_id": user_id}, priority=jobs.PRIORITY_LOW,
+        delay=REFRESH_DELAY, dedup_key=f"recommendations:{user_id}"
+    )
+
+
+def export_path(export_id, export_format):
+    return os.path.join(EXPORT_DIR, f"{export_id}.{export_format}")
+
+
+def find_export(export_id):
+    """Tamamlanmış dışa aktarım dosyası: (yol, biçim); yoksa ya da kimlik geçersizse None"""
+    if not EXPORT_ID_PATTERN.fullmatch(export_id):
+        return None
+    for export_format in exports.FORMATS:
+        path = export_path(export_id, export_format)
+        if os.path.isfile(path):
+            return path, export_format
+    return None
+
+
+@jobs.handler("activities.export")
+def export_activities(payload):
+    """Dışa aktarımı dosyaya yazar; sonuç dosya kimliği, biçimi ve boyutu (indirme yönetici endpoint'inden)"""
+    export_format = payload["format"]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = export_path(payload["export_id"], export_format)
+    batches = exports.iter_batches(payload.get("user_id"), payload.get("start_date"), payload.get("end_date"))
+    size = 0
+    # Yarım dosya görünmesin: önce geçici dosyaya yaz, bitince yeniden adlandır
+    with open(path + ".part", "wb") as f:
+        for chunk in exports.CHUNK_WRITERS[export_format](batches):
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(path + ".part", path)
+    return {"export_id": payload["export_id"], "format": export_format, "bytes": size}
+
+
+@jobs.handler("exports.cleanup")
+def cleanup_exports(payload):
+    """Saklama süresini aşan dışa aktarım dosyalarını (ve yarım kalmış .part dosyalarını) siler"""
+    if not os.path.isdir(EXPORT_DIR):
+        return {"removed": 0}
+    cutoff = time.time() - EXPORT_RETENTION
+    removed = 0
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            # Başka bir worker aynı anda sildi
+            continue
+    return {"removed": removed}
+
+
+@jobs.handler("wikipedia.prefetch")
+def prefetch_wikipedia(payload):
+    """Seviyeye uygun rastgele bir konunun sayfasını önbelleğe alır"""
+    topic = payload.get("topic") or random.choice(language_packs.get_pack(payload["language"]).topics(payload["level"]))
+    try:
+        page = fetch_page(topic, payload["language"])
+    except OutboundError:
+        # Servis yok: ön yükleme isteğe bağlı, yeniden denemeye gerek yok
+        return None
+    return {"topic": topic, "found": page is not None}
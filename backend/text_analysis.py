@@ -0,0 +1,83 @@
+"""Okuma metinleri için tokenizasyon ve metin analizi.
+
+Metni tek seferde kelimelere ayırır; kelime frekanslarını, bilinmeyen kelime
+adaylarını ve adayların lemma ve sözcük türlerini (morphology) aynı geçişte
+üretir.
+"""
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple
+
+from . import morphology
+from .morphology import POS_VERB, POS_NOUN
+
+# Harflerden oluşan kelimeler (rakam ve alt çizgi hariç, aksanlı harfler dahil)
+TOKEN_RE = re.compile(r"[^\W\d_]+")
+
+# Kelime başı/sonundan atılan noktalama işaretleri
+STRIP_CHARS = ".,;:!?()[]{}\"'-¿¡«»“”‘’—–…"
+
+# Bilinmeyen kelime seçiminde atlanan temel İspanyolca kelimeler
+BASIC_SPANISH_WORDS = frozenset({
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "y", "o", "pero", "porque",
+    "como", "qué", "quién", "cuándo", "dónde", "por", "para", "con", "sin", "en", "de",
+    "a", "al", "del", "es", "son", "estar", "ser", "haber", "tener", "hacer", "ir",
+    "venir", "ver", "oír", "decir", "hablar", "comer", "beber", "dormir", "vivir",
+    "trabajar", "estudiar", "sí", "no", "tal", "vez", "quizás", "hoy", "ayer", "mañana",
+    "ahora", "luego", "después", "antes", "siempre", "nunca", "todo", "nada", "mucho",
+    "poco", "más", "menos", "bien", "mal",
+})
+
+
+class TextAnalysis(NamedTuple):
+    tokens: List[str]          # Metindeki tüm kelimeler (küçük harf, sırayla)
+    counts: Dict[str, int]     # Kelime -> frekans (ilk geçiş sırasıyla)
+    candidates: List[str]      # Temel kelime olmayan benzersiz kelimeler (ilk geçiş sırasıyla)
+    pos_hints: Dict[str, str]  # Aday kelime -> "verb" / "noun"
+    lemmas: Dict[str, str]     # Aday kelime -> sözlük biçimi (reúne -> reunir)
+
+
+def tokenize(text):
+    """Metni küçük harfli kelimelere ayırır.
+
+    Sonucu TOKEN_RE.findall ile aynıdır; ancak kelimelerin çoğu boşlukla
+    ayırma ile çözüldüğü için noktalama atma yalnızca harf dışı karakter
+    içeren parçalarda, düzenli ifade de ancak bundan sonra hâlâ harf dışı
+    karakter kalan parçalarda çalışır.
+    """
+    tokens = []
+    append = tokens.append
+    for raw in text.lower().split():
+        if raw.isalpha():
+            append(raw)
+            continue
+        word = raw.strip(STRIP_CHARS)
+        if word.isalpha():
+            append(word)
+        elif word:
+            tokens.extend(TOKEN_RE.findall(word))
+    return tokens
+
+
+def pos_hint(word):
+    """Kelimenin çekim çözümlemesine göre fiil/isim ipucu döndürür"""
+    return morphology.analyze(word).pos
+
+
+def analyze_text(text, basic_words=BASIC_SPANISH_WORDS, analyzer=None, tokenizer=tokenize):
+    """Metni tek geçişte analiz eder (varsayılanlar İspanyolca; diğer diller language_packs üzerinden).
+
+    `analyzer` kelime listesini alıp çözümleme listesi döndürür.
+    """
+    analyzer = analyzer or morphology.analyze_many
+    tokens = tokenizer(text)
+    counts = Counter(tokens)
+
+    candidates = [word for word in counts if word not in basic_words]
+    pos_hints = {}
+    lemmas = {}
+    for word, analysis in zip(candidates, analyzer(candidates)):
+        pos_hints[word] = analysis.pos
+        lemmas[word] = analysis.lemma
+
+    return TextAnalysis(tokens, counts, candidates, pos_hints, lemmas)
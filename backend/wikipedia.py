@@ -0,0 +1,93 @@
+"""Wikipedia sayfa metni istemcisi.
+
+Sayfalar MediaWiki API'sinden (extracts) düz metin olarak alınır ve
+sınırlı bir LRU önbellekte tutulur. Taze kayıtlar doğrudan önbellekten
+döner; Wikipedia'ya ulaşılamadığında ya da devre açıkken süresi geçmiş
+kayıtlar da kullanılır. WIKIPEDIA_API_URL ile API adresi (ör. yerel test
+sunucusu) değiştirilebilir.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics, outbound
+
+API_URL = os.getenv("WIKIPEDIA_API_URL", "https://{language}.wikipedia.org/w/api.php")
+USER_AGENT = "AI-Language/1.0 (language learning app)"
+
+CACHE_SIZE = 512
+CACHE_TTL = 6 * 3600  # sn; bu süreden eski kayıtlar yalnızca servis yokken kullanılır
+
+_cache = OrderedDict()  # (dil, başlık) -> (alınma zamanı, sayfa ya da None)
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+
+def _cache_put(key, page):
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), page)
+        _cache.move_to_end(key)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _parse_pages(response):
+    """Sorgu yanıtındaki sayfalar; gövde JSON değilse ValueError"""
+    data = response.json()
+    if not isinstance(data, dict):
+        raise ValueError("beklenmeyen JSON yapısı")
+    return data.get("query", {}).get("pages", [])
+
+
+def _fetch(title, language):
+    pages = outbound.wikipedia.get(
+        API_URL.format(language=language),
+        params={
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "extracts|info",
+            "explaintext": 1,
+            "inprop": "url",
+            "redirects": 1,
+            "titles": title,
+        },
+        headers={"User-Agent": USER_AGENT},
+        # Vekil/captive portal sayfası ya da yarım gövde servis hatası sayılır
+        parse=_parse_pages,
+    )
+    if not pages or pages[0].get("missing") or not pages[0].get("extract"):
+        return None
+    page = pages[0]
+    return {"title": page["title"], "text": page["extract"], "url": page.get("fullurl", "")}
+
+
+def fetch_page(title, language="es"):
+    """Sayfanın başlık, metin ve adresini döndürür; sayfa yoksa None.
+
+    Servise ulaşılamazsa ve önbellekte (eski de olsa) kayıt yoksa
+    outbound.OutboundError fırlatır.
+    """
+    key = (language, title)
+    entry = _cache_get(key)
+    if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+        metrics.record_cache("wikipedia", True)
+        return entry[1]
+    metrics.record_cache("wikipedia", False)
+
+    try:
+        page = _fetch(title, language)
+    except outbound.OutboundError:
+        if entry is not None:
+            return entry[1]
+        raise
+    _cache_put(key, page)
+    return page
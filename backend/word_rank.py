@@ -0,0 +1,148 @@
+"""Kelime zorluk indeksi (kelime -> frekans sırası).
+
+İndeks bir frekans listesinden çevrimdışı olarak üretilir ve iki .npy
+dosyası olarak saklanır: sıralı kelime dizisi ve her kelimenin frekans
+sırası. Dosyalar bellek eşlemeli (mmap) açıldığı için aynı makinedeki tüm
+worker'lar işletim sisteminin sayfa önbelleğini paylaşır.
+
+İndeks üretme: python -m backend.word_rank frekans_listesi.txt
+"""
+import argparse
+import heapq
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "es_word_rank")
+INDEX_PATH = os.getenv("WORD_RANK_PATH", DEFAULT_INDEX_PATH)
+
+# Frekans listesinde olmayan kelimelerin sırası (özel isim, yazım hatası vb.)
+UNKNOWN_RANK = np.iinfo(np.int32).max
+
+# Seviyeye göre öğrenilmesi beklenen frekans sırası aralıkları
+LEVEL_BANDS = {
+    "a1": (100, 1000),
+    "a2": (500, 2000),
+    "b1": (1000, 4000),
+    "b2": (2000, 8000),
+    "c1": (4000, 15000),
+    "c2": (8000, 50000),
+}
+
+# Seçim öncelikleri: seviye aralığında, aralıktan zor, aralıktan kolay, listede yok
+TIER_IN_BAND = 0
+TIER_HARDER = 1
+TIER_EASIER = 2
+TIER_UNKNOWN = 3
+
+
+class WordRankIndex:
+    """Sıralı kelime dizisi üzerinde ikili arama ile sıra sorgulayan indeks"""
+
+    def __init__(self, words, ranks):
+        self.words = words
+        self.ranks = ranks
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        words = np.load(f"{path}.words.npy", mmap_mode="r")
+        ranks = np.load(f"{path}.ranks.npy", mmap_mode="r")
+        return cls(words, ranks)
+
+    def __len__(self):
+        return len(self.words)
+
+    def lookup(self, words):
+        """Kelime listesinin frekans sıralarını döndürür (bilinmeyenler UNKNOWN_RANK)"""
+        if not words or not len(self.words):
+            return np.full(len(words), UNKNOWN_RANK, dtype=np.int32)
+        # İndeksin dtype'ına çevirmek uzun kelimeleri kırpar ve yanlış eşleştirir
+        query = np.asarray(words, dtype=str)
+        positions = np.searchsorted(self.words, query)
+        positions = np.minimum(positions, len(self.words) - 1)
+        found = self.words[positions] == query
+        return np.where(found, self.ranks[positions], UNKNOWN_RANK).astype(np.int32)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """İndeksi ilk kullanımda bir kez yükler; dosya yoksa None döndürür"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    _index = WordRankIndex.load()
+                except FileNotFoundError:
+                    _index = WordRankIndex(np.array([], dtype="<U1"), np.array([], dtype=np.int32))
+    return _index if len(_index) else None
+
+
+def select_words(counts, candidates, level, k, index=None):
+    """Aday kelimelerden seviyeye en uygun k tanesini deterministik olarak seçer.
+
+    Öncelik sırası: seviye aralığındaki kelimeler (sık olandan seyreğe),
+    aralıktan zor olanlar, aralıktan kolay olanlar (aralığa yakın olandan
+    uzağa) ve son olarak frekans listesinde bulunmayanlar (metinde sık
+    geçenden aza). Eşitlikler kelimenin kendisiyle bozulur. O(n log k).
+    """
+    index = index if index is not None else get_index()
+    low, high = LEVEL_BANDS.get(level, LEVEL_BANDS["b1"])
+    ranks = index.lookup(candidates) if index is not None else None
+
+    def key(i):
+        word = candidates[i]
+        rank = int(ranks[i]) if ranks is not None else UNKNOWN_RANK
+        if rank == UNKNOWN_RANK:
+            return (TIER_UNKNOWN, -counts[word], word)
+        if rank < low:
+            return (TIER_EASIER, -rank, word)
+        if rank > high:
+            return (TIER_HARDER, rank, word)
+        return (TIER_IN_BAND, rank, word)
+
+    return [candidates[i] for i in heapq.nsmallest(k, range(len(candidates)), key=key)]
+
+
+def build_index(source, path=INDEX_PATH):
+    """Frekans listesinden indeks dosyalarını üretir.
+
+    Her satırda bir kelime ve isteğe bağlı olarak frekansı bulunur. Frekans
+    verilmişse liste frekansa göre, verilmemişse dosyadaki sıraya göre
+    sıralanır. Aynı kelime birden fazla geçerse ilk (en sık) sırası kalır.
+    """
+    entries = []
+    with open(source, encoding="utf-8") as f:
+        for line_no, line in enumerate(f):
+            parts = line.split()
+            if not parts:
+                continue
+            count = float(parts[1]) if len(parts) > 1 else -line_no
+            entries.append((parts[0].lower(), count))
+
+    entries.sort(key=lambda entry: -entry[1])
+    ranks = {}
+    for word, _ in entries:
+        ranks.setdefault(word, len(ranks) + 1)
+
+    words = np.array(sorted(ranks))
+    rank_array = np.array([ranks[word] for word in words], dtype=np.int32)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(f"{path}.words.npy", words)
+    np.save(f"{path}.ranks.npy", rank_array)
+    return len(words)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kelime zorluk indeksi üretir")
+    parser.add_argument("source", help="Frekans listesi (satır başına: kelime [frekans])")
+    parser.add_argument("--out", default=INDEX_PATH, help="İndeks dosyalarının ön eki")
+    args = parser.parse_args()
+
+    count = build_index(args.source, args.out)
+    print(f"{count} kelimelik indeks oluşturuldu: {args.out}.words.npy, {args.out}.ranks.npy")
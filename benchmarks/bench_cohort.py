@@ -0,0 +1,86 @@
+"""Sınıf analizi benchmark'ı.
+
+Büyük bir sınıf (varsayılan 5.000 öğrenci) ve öğrenci başına bir yıllık
+aktivite oluşturur, periyot toplamlarını bir kez hesaplar ve sınıf
+analizinin süresini periyot başına ölçer: önbellek boşken (soğuk) ve
+sınıfın verisi değişmemişken (sıcak). Karşılaştırma için her öğrenci için
+ayrı özet sorgusu çalıştıran yol da haftalık periyotta ölçülür (özet
+endpoint'inin öğrenci başına yaptığı sorgu).
+
+Çalıştırma: python -m benchmarks.bench_cohort --students 5000 --activities 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.load_test import seed_database
+
+
+def timings(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sınıf analizi benchmark'ı")
+    parser.add_argument("--students", type=int, default=5000, help="Sınıftaki öğrenci sayısı")
+    parser.add_argument("--activities", type=int, default=50, help="Öğrenci başına aktivite (son bir yıla dağıtılır)")
+    parser.add_argument("--repeat", type=int, default=20, help="Ölçüm tekrarı")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_cohort_'), 'bench.db')}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    from backend import cohorts
+    from backend.database import engine, init_db, Classroom, ClassMember, SessionLocal, UserActivity
+    from backend.recommendations import PERIOD_DAYS, period_start
+
+    init_db()
+    seed_database(args.students, args.activities, seed=42)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with engine.begin() as conn:
+        conn.execute(Classroom.__table__.insert(), [{"id": 1, "name": "bench", "teacher_id": 1, "created_at": now}])
+        conn.execute(ClassMember.__table__.insert(), [
+            {"class_id": 1, "user_id": i, "joined_at": now} for i in range(1, args.students + 1)
+        ])
+
+    start = time.perf_counter()
+    cohorts.rollup()
+    print(f"Periyot toplamları: {time.perf_counter() - start:.2f} sn")
+
+    def cold(conn, period):
+        cohorts._cache.clear()
+        cohorts.cohort_analytics(conn, 1, period)
+
+    print(f"{'periyot':<8}{'soğuk (ms)':>12}{'sıcak (ms)':>12}")
+    for period in PERIOD_DAYS:
+        with engine.connect() as conn:
+            cold_ms = timings(lambda: cold(conn, period), args.repeat)
+            warm_ms = timings(lambda: cohorts.cohort_analytics(conn, 1, period), args.repeat)
+        print(f"{period:<8}{cold_ms:>12.1f}{warm_ms:>12.1f}")
+
+    start_date, _ = period_start("week")
+
+    def per_student():
+        db = SessionLocal()
+        try:
+            for user_id in range(1, args.students + 1):
+                db.query(UserActivity).filter(
+                    UserActivity.user_id == user_id,
+                    UserActivity.completed_at >= start_date
+                ).all()
+        finally:
+            db.close()
+
+    print(f"Öğrenci başına sorgu (week): {timings(per_student, 1):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
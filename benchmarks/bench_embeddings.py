@@ -0,0 +1,102 @@
+"""Kelime vektörü araması benchmark'ı.
+
+Kümelenmiş sentetik vektörlerden (gensim ve gerçek vektör dosyası
+gerekmez) ya da --vectors ile verilen gerçek bir .npy vektör dosyasından
+bir sözlük oluşturur; okuma metnindeki kelime listesi büyüklüğünde toplu
+sorgular için tam tarama ve IVF aramasının sorgu başına süresini ve IVF'in
+tam taramaya göre isabet oranını (recall@k) ölçer. Vektörler diskte bir
+.npy dosyasından mmap ile açılır.
+
+Sentetik veride küme merkezi gürültüye göre belirgin olursa (--noise
+küçükse) her komşu kendi bölümünde kalır ve en az bölümle bile recall 1.0
+çıkar; varsayılan gürültü kümeleri gerçek kelime vektörlerindeki gibi
+örtüştürür, böylece bölüm sayısı ile recall arasındaki ödünleşim görünür.
+
+Çalıştırma: python -m benchmarks.bench_embeddings --vocab 1000000
+            python -m benchmarks.bench_embeddings --vectors vektorler.npy
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from backend import embeddings
+from backend.embeddings import EmbeddingIndex, IVFIndex, normalize
+
+BATCH = 25  # C2 okuma metnindeki bilinmeyen kelime sayısı
+K = 16
+
+
+def make_vectors(vocab, dim, clusters, noise, seed=0):
+    """Kümelenmiş, normalize sentetik vektörler.
+
+    Merkez ve gürültü bileşenleri standart normaldir; `noise` gürültünün
+    merkeze göre ölçeğidir (1.0'ın altında kümeler kolayca ayrılır).
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.empty((vocab, dim), dtype=np.float32)
+    for start in range(0, vocab, 100000):
+        end = min(start + 100000, vocab)
+        labels = rng.integers(0, clusters, end - start)
+        vectors[start:end] = centers[labels] + noise * rng.standard_normal((end - start, dim)).astype(np.float32)
+    return normalize(vectors)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vocab", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=300)
+    parser.add_argument("--lists", type=int, default=1024)
+    parser.add_argument("--noise", type=float, default=1.5, help="Sentetik verinin gürültü/merkez ölçeği")
+    parser.add_argument("--vectors", help="Sentetik veri yerine kullanılacak (sözlük x boyut) .npy vektör dosyası")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_embeddings_")
+    path = os.path.join(directory, "vectors.npy")
+    if args.vectors:
+        np.save(path, normalize(np.load(args.vectors, mmap_mode="r")[:args.vocab].astype(np.float32)))
+    else:
+        np.save(path, make_vectors(args.vocab, args.dim, clusters=args.lists * 2, noise=args.noise))
+    vectors = np.load(path, mmap_mode="r")
+    args.vocab, args.dim = vectors.shape
+    words = [f"w{i}" for i in range(args.vocab)]
+    index = EmbeddingIndex(words, {word: i for i, word in enumerate(words)}, vectors)
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(vectors, args.lists)
+    build_seconds = time.perf_counter() - start
+    ivf.save(path + ".ivf")
+    ivf = IVFIndex.load(path + ".ivf")
+
+    rng = np.random.default_rng(1)
+    queries = rng.choice(args.vocab, size=BATCH, replace=False)
+
+    exact_seconds, (exact_ids, _) = timed(lambda: index.search(queries, K, exact=True), args.repeat)
+    print(f"sözlük {args.vocab} x {args.dim}, toplu sorgu {BATCH} kelime, k={K}, IVF kurulumu {build_seconds:.1f} sn\n")
+    print(f"{'yöntem':<22}{'toplu (ms)':>12}{'sorgu başına (ms)':>20}{'recall@k':>10}")
+    print(f"{'tam tarama':<22}{exact_seconds * 1e3:>12.2f}{exact_seconds * 1e3 / BATCH:>20.3f}{1.0:>10.3f}")
+
+    index.ivf = ivf
+    for probes in (4, 8, 16, 32, 64, 128):
+        embeddings.IVF_PROBES = probes
+        seconds, (ivf_ids, _) = timed(lambda: index.search(queries, K), args.repeat)
+        recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(exact_ids, ivf_ids)])
+        label = f"IVF ({probes}/{args.lists} bölüm)"
+        print(f"{label:<22}{seconds * 1e3:>12.2f}{seconds * 1e3 / BATCH:>20.3f}{recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
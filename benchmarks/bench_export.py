@@ -0,0 +1,85 @@
+"""Aktivite dışa aktarımı bellek benchmark'ı.
+
+Farklı satır sayıları için dışa aktarım akışını sonuna kadar tüketir ve
+tracemalloc ile en yüksek Python bellek kullanımını, süreyi ve üretilen
+bayt sayısını ölçer. Akış sunucu tarafı imleçten gruplar halinde
+okunduğu için en yüksek bellek kullanımı satır sayısıyla artmamalıdır.
+Karşılaştırma için tüm satırları bellekte listeleyen yol da ölçülür.
+
+Çalıştırma: python -m benchmarks.bench_export --rows 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.load_test import seed_database
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def fill_activities(rows):
+    """1 numaralı kullanıcının aktivitelerini `rows` satırla değiştirir"""
+    from backend.database import engine, UserActivity
+
+    with engine.begin() as conn:
+        conn.execute(UserActivity.__table__.delete())
+        for start in range(0, rows, 10000):
+            conn.execute(UserActivity.__table__.insert(), [
+                {"user_id": 1, "activity_type": "okuma", "duration": i % 90 + 1,
+                 "notes": "not" if i % 7 == 0 else None, "completed_at": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}
+                for i in range(start, min(start + 10000, rows))
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dışa aktarım bellek benchmark'ı")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="Satır sayıları")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_export_'), 'bench.db')}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    from backend import exports
+    from backend.database import SessionLocal, UserActivity, init_db
+    from backend.responses import dumps, rows_to_dicts
+
+    init_db()
+    seed_database(1, 0, seed=42)
+
+    def in_memory():
+        db = SessionLocal()
+        try:
+            result = db.query(
+                UserActivity.id, UserActivity.user_id, UserActivity.activity_type, UserActivity.duration,
+                UserActivity.notes, UserActivity.completed_at
+            ).filter(UserActivity.user_id == 1).all()
+            return len(dumps(rows_to_dicts(result)))
+        finally:
+            db.close()
+
+    print(f"{'satır':>8}  {'yol':<20}{'süre (sn)':>10}{'en yüksek bellek (MB)':>24}{'çıktı (MB)':>12}")
+    for rows in args.rows:
+        fill_activities(rows)
+        for export_format in exports.FORMATS:
+            if export_format == "parquet" and not exports.parquet_available():
+                continue
+            chunks = exports.CHUNK_WRITERS[export_format]
+            elapsed, peak, size = measure(lambda: sum(len(chunk) for chunk in chunks(exports.iter_batches(1))))
+            print(f"{rows:>8}  {'akış ' + export_format:<20}{elapsed:>10.2f}{peak / 2**20:>24.1f}{size / 2**20:>12.1f}")
+
+        elapsed, peak, size = measure(in_memory)
+        print(f"{rows:>8}  {'liste (bellekte)':<20}{elapsed:>10.2f}{peak / 2**20:>24.1f}{size / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
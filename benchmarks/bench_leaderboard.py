@@ -0,0 +1,84 @@
+"""Liderlik tablosu benchmark'ı.
+
+Farklı kullanıcı sayıları için bu haftanın genel tablosunu aktivite
+kayıtlarıyla doldurur ve ilk N ile "benim sıram ± k" sorgularının
+süresini ölçer. Karşılaştırma için tüm kullanıcıların haftalık
+toplamlarını her istekte hesaplayıp sıralayan yol da ölçülür. Tablo
+sorgularının süresi kullanıcı sayısıyla neredeyse sabit kalmalıdır.
+
+Çalıştırma: python -m benchmarks.bench_leaderboard --users 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def timings(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Liderlik tablosu benchmark'ı")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 50000], help="Kullanıcı sayıları")
+    parser.add_argument("--repeat", type=int, default=50, help="Ölçüm tekrarı")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_leaderboard_'), 'bench.db')}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    from backend import leaderboards
+    from backend.database import engine, init_db, LeaderboardCount, LeaderboardScore, User, UserActivity
+    from sqlalchemy import func, select
+
+    init_db()
+    rng = random.Random(42)
+    today = date.today()
+    monday = (today - timedelta(days=today.weekday())).strftime("%Y-%m-%d")
+    week = leaderboards.week_key(today)
+
+    print(f"{'kullanıcı':>10}{'ilk 10 (ms)':>14}{'sıram ± 3 (ms)':>17}{'toplayıp sıralama (ms)':>25}")
+    for users in args.users:
+        with engine.begin() as conn:
+            for table in (UserActivity, User, LeaderboardScore, LeaderboardCount):
+                conn.execute(table.__table__.delete())
+            conn.execute(User.__table__.insert(), [
+                {"id": i, "email": f"bench{i}@example.com", "username": f"bench{i}", "hashed_password": "", "is_active": True}
+                for i in range(1, users + 1)
+            ])
+            rows = [
+                {"user_id": i, "activity_type": "okuma", "duration": rng.randint(5, 90), "notes": None,
+                 "completed_at": today.strftime("%Y-%m-%d")}
+                for i in range(1, users + 1) for _ in range(3)
+            ]
+            for start in range(0, len(rows), 10000):
+                conn.execute(UserActivity.__table__.insert(), rows[start:start + 10000])
+        leaderboards.rebuild(today)
+
+        with engine.connect() as conn:
+            top_ms = timings(lambda: leaderboards.top(conn, leaderboards.GLOBAL_BOARD, week, 10), args.repeat)
+            around_ms = timings(
+                lambda: leaderboards.around(conn, leaderboards.GLOBAL_BOARD, week, rng.randint(1, users), 3), args.repeat
+            )
+
+            def full_sort():
+                totals = conn.execute(
+                    select(UserActivity.user_id, func.sum(UserActivity.duration))
+                    .where(UserActivity.completed_at >= monday).group_by(UserActivity.user_id)
+                ).all()
+                return sorted(totals, key=lambda row: -row[1])[:10]
+
+            sort_ms = timings(full_sort, max(args.repeat // 10, 1))
+        print(f"{users:>10}{top_ms:>14.2f}{around_ms:>17.2f}{sort_ms:>25.2f}")
+
+
+if __name__ == "__main__":
+    main()
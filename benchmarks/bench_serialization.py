@@ -0,0 +1,104 @@
+"""Yanıt serileştirme ve sıkıştırma benchmark'ı.
+
+1. Aktivite listesi için eski yol (ORM nesnesi -> Pydantic orm_mode ->
+   jsonable_encoder -> json) ile yeni yolun (sütun sorgusu -> sözlük ->
+   FastJSONResponse) istek başına CPU süresi.
+2. /api/activities ve /api/reading/text uç noktalarında istek başına CPU
+   süresi ve sıkıştırmalı/sıkıştırmasız hatta giden bayt sayısı.
+
+Çalıştırma: python -m benchmarks.bench_serialization --activities 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.load_test import PASSWORD, seed_database
+from benchmarks.stub_upstreams import start_stub
+
+
+def cpu_per_call(func, number):
+    start = time.process_time()
+    for _ in range(number):
+        func()
+    return (time.process_time() - start) / number
+
+
+def bench_activity_serialization(user_id, number):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from backend.database import SessionLocal, UserActivity
+    from backend.fastapi_app import ActivityResponse
+    from backend.responses import FastJSONResponse, rows_to_dicts
+
+    db = SessionLocal()
+    try:
+        def legacy():
+            activities = db.query(UserActivity).filter(UserActivity.user_id == user_id).order_by(UserActivity.completed_at.desc()).all()
+            models = [ActivityResponse.from_orm(activity) for activity in activities]
+            return JSONResponse(jsonable_encoder(models)).body
+
+        def fast():
+            rows = db.query(
+                UserActivity.id, UserActivity.activity_type, UserActivity.duration,
+                UserActivity.notes, UserActivity.completed_at
+            ).filter(UserActivity.user_id == user_id).order_by(UserActivity.completed_at.desc()).all()
+            return FastJSONResponse(rows_to_dicts(rows)).body
+
+        assert len(legacy()) >= len(fast())
+        return cpu_per_call(legacy, number), cpu_per_call(fast, number)
+    finally:
+        db.close()
+
+
+def bench_endpoint(client, path, headers, number):
+    """İstek başına CPU süresini ve gzip'li/gzip'siz gövde boyutunu döndürür"""
+    sizes = {}
+    for encoding in ("identity", "gzip"):
+        response = client.get(path, headers={**headers, "Accept-Encoding": encoding}, stream=True)
+        sizes[encoding] = len(response.raw.read(decode_content=False))
+    cpu = cpu_per_call(lambda: client.get(path, headers={**headers, "Accept-Encoding": "gzip"}), number)
+    return cpu, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serileştirme ve sıkıştırma benchmark'ı")
+    parser.add_argument("--activities", type=int, default=500, help="Kullanıcı başına aktivite sayısı")
+    parser.add_argument("--number", type=int, default=50, help="Ölçüm başına tekrar")
+    args = parser.parse_args()
+
+    stub = start_stub()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_serialization_'), 'bench.db')}"
+    os.environ["WIKIPEDIA_API_URL"] = f"{stub.url}/w/api.php"
+    os.environ["TRANSLATION_API_URL"] = stub.url
+    os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+    from fastapi.testclient import TestClient
+    from backend import fastapi_app
+
+    seed_database(1, args.activities, seed=42)
+
+    legacy, fast = bench_activity_serialization(1, args.number)
+    print(f"aktivite listesi ({args.activities} satır) serileştirme, istek başına CPU:")
+    print(f"  ORM + orm_mode + jsonable_encoder : {legacy * 1e3:8.2f} ms")
+    print(f"  sütun sorgusu + FastJSONResponse  : {fast * 1e3:8.2f} ms  ({legacy / fast:.1f}x)")
+
+    client = TestClient(fastapi_app.app)
+    token = client.post("/api/token", data={"username": "bench1", "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"\n{'uç nokta':<28}{'CPU (ms)':>10}{'ham (B)':>10}{'gzip (B)':>10}")
+    for name, path in [("/api/activities", "/api/activities"),
+                       ("/api/reading/text (b1)", "/api/reading/text?level=b1"),
+                       ("/api/reading/text (c2)", "/api/reading/text?level=c2")]:
+        random.seed(0)
+        cpu, sizes = bench_endpoint(client, path, headers, args.number)
+        print(f"{name:<28}{cpu * 1e3:>10.2f}{sizes['identity']:>10}{sizes['gzip']:>10}")
+
+
+if __name__ == "__main__":
+    main()
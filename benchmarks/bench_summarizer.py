@@ -0,0 +1,36 @@
+"""Özetleyici benchmark'ı.
+
+Seviye uzunluklarındaki metinlerde önbelleksiz (ilk) ve önbellekli (tekrar)
+özetleme sürelerini ölçer. Hedef: 8000 karakterlik C2 metni birkaç
+milisaniyenin altında.
+
+Çalıştırma: python -m benchmarks.bench_summarizer
+"""
+import timeit
+
+from backend import summarizer
+from benchmarks.bench_text_analysis import LEVEL_LENGTHS, make_text
+
+# Seviyeye göre özet cümle sayısı (get_reading_text ile aynı)
+SUMMARY_LENGTHS = {"a1": 2, "a2": 3, "b1": 4, "b2": 5, "c1": 6, "c2": 8}
+
+
+def cold(text, sentence_count):
+    summarizer._cache.clear()
+    return summarizer.summarize(text, sentence_count)
+
+
+def main(repeat=5, number=50):
+    print(f"{'seviye':<8}{'karakter':>10}{'cümle':>8}{'ilk (ms)':>12}{'önbellek (µs)':>16}")
+    for level, length in LEVEL_LENGTHS.items():
+        text = make_text(length)
+        count = SUMMARY_LENGTHS[level]
+        sentences = len(summarizer.split_sentences(text))
+        first = min(timeit.repeat(lambda: cold(text, count), repeat=repeat, number=number)) / number
+        summarizer.summarize(text, count)
+        cached = min(timeit.repeat(lambda: summarizer.summarize(text, count), repeat=repeat, number=number * 10)) / (number * 10)
+        print(f"{level:<8}{length:>10}{sentences:>8}{first * 1e3:>12.2f}{cached * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
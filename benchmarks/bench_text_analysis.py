@@ -0,0 +1,61 @@
+"""Metin analizi mikro benchmark'ı.
+
+Seviye sınırlarına karşılık gelen 500-8000 karakterlik girdilerde eski
+tokenizasyon akışını ve `backend.text_analysis.analyze_text` fonksiyonunu,
+ayrıca yalnızca tokenizasyon aşamasını (`tokenize`) karşılaştırır.
+
+Çalıştırma: python -m benchmarks.bench_text_analysis
+"""
+import timeit
+
+from backend.text_analysis import analyze_text, tokenize, BASIC_SPANISH_WORDS
+
+# Seviyelere göre metin uzunlukları (get_reading_text ile aynı)
+LEVEL_LENGTHS = {"a1": 500, "a2": 800, "b1": 1500, "b2": 2500, "c1": 4000, "c2": 8000}
+
+SAMPLE = (
+    "Los animales constituyen un amplio grupo de organismos eucariotas, heterótrofos y "
+    "pluricelulares. Se caracterizan por su capacidad de movimiento, por carecer de "
+    "cloroplasto y de pared celular, y por su desarrollo embrionario, que atraviesa una "
+    "fase de blástula y determina un plan corporal fijo. La zoología (del griego «zoon», "
+    "animal) estudia el reino Animalia desde el siglo XVIII; hoy reúne más de 1,5 millones "
+    "de especies descritas. ¿Cuántas quedan por descubrir? Nadie lo sabe con certeza. "
+)
+
+
+def legacy_pipeline(text):
+    """Eski akış: strip'li tokenizasyon, isalpha filtresi ve küme farkı"""
+    words = [w.strip('.,;:!?()[]{}"\'-').lower() for w in text.lower().split() if w.strip('.,;:!?()[]{}"\'-')]
+    unique_words = set([w for w in words if w.isalpha()])
+    unknown = list(unique_words - set(BASIC_SPANISH_WORDS))
+    return [(w, w.endswith(("ar", "er", "ir")) and len(w) > 2) for w in unknown]
+
+
+def legacy_tokenize(text):
+    """Eski tokenizasyon: her parçada strip, ardından isalpha filtresi"""
+    words = [w.strip('.,;:!?()[]{}"\'-').lower() for w in text.lower().split() if w.strip('.,;:!?()[]{}"\'-')]
+    return [w for w in words if w.isalpha()]
+
+
+def make_text(length):
+    return (SAMPLE * (length // len(SAMPLE) + 1))[:length]
+
+
+def compare(title, legacy_func, new_func, repeat, number):
+    print(title)
+    print(f"{'seviye':<8}{'karakter':>10}{'eski (µs)':>14}{'yeni (µs)':>14}{'hızlanma':>10}")
+    for level, length in LEVEL_LENGTHS.items():
+        text = make_text(length)
+        legacy = min(timeit.repeat(lambda: legacy_func(text), repeat=repeat, number=number)) / number
+        new = min(timeit.repeat(lambda: new_func(text), repeat=repeat, number=number)) / number
+        print(f"{level:<8}{length:>10}{legacy * 1e6:>14.1f}{new * 1e6:>14.1f}{legacy / new:>9.1f}x")
+
+
+def main(repeat=5, number=200):
+    compare("Tokenizasyon", legacy_tokenize, tokenize, repeat, number)
+    print()
+    compare("Metin analizi", legacy_pipeline, analyze_text, repeat, number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Dış servis hata enjeksiyonu senaryoları.
+
+Uygulamayı yerel sahte Wikipedia ve çeviri sunucularına yönlendirir,
+sunuculara gecikme, takılma, 503 ve bağlantı kopması enjekte eder ve
+/api/reading/text isteklerinin durum kodlarını, gecikmelerini ve devre
+kesici durumlarını raporlar. Beklenen davranış: takılan servis istekleri
+zaman aşımıyla sınırlı tutar, birkaç hatadan sonra devre açılır ve
+istekler önbellekteki/çevrimdışı veriyle hızlıca yanıtlanır; servis
+düzelince devre yeniden kapanır.
+
+Çalıştırma: python -m benchmarks.fault_injection
+"""
+import os
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.load_test import PASSWORD, seed_database
+from benchmarks.stub_upstreams import Faults, start_stub
+
+READ_TIMEOUT = 0.5
+RESET_TIMEOUT = 1.0
+
+
+def run_scenario(client, headers, name, count, params_for):
+    from backend import outbound
+
+    statuses = Counter()
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        response = client.get("/api/reading/text", params=params_for(i), headers=headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+    latencies_ms = np.array(latencies) * 1000
+    print(
+        f"{name:<34}{dict(sorted(statuses.items()))!s:<20}"
+        f"{np.percentile(latencies_ms, 50):>9.1f}{np.percentile(latencies_ms, 95):>9.1f}{latencies_ms.max():>9.1f}"
+        f"  {outbound.wikipedia.breaker.state:<10}{outbound.translation.breaker.state:<10}"
+    )
+
+
+def main():
+    wiki_stub = start_stub()
+    translation_stub = start_stub()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='fault_injection_'), 'bench.db')}"
+    os.environ["WIKIPEDIA_API_URL"] = f"{wiki_stub.url}/w/api.php"
+    os.environ["TRANSLATION_API_URL"] = translation_stub.url
+    os.environ["OUTBOUND_READ_TIMEOUT"] = str(READ_TIMEOUT)
+    os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+    from fastapi.testclient import TestClient
+    from backend import fastapi_app, outbound
+
+    for upstream in (outbound.wikipedia, outbound.translation):
+        upstream.breaker.reset_timeout = RESET_TIMEOUT
+
+    seed_database(1, 0, seed=42)
+    client = TestClient(fastapi_app.app)
+    token = client.post("/api/token", data={"username": "bench1", "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def new_topic(prefix):
+        # Her istekte farklı konu: Wikipedia önbelleği devreye girmez
+        return lambda i: {"level": "b1", "topic": f"{prefix} {i}"}
+
+    def cached_topic(i):
+        return {"level": "b1", "topic": "Tema en caché"}
+
+    def offline_level(i):
+        # A1 için hazır metinler var; Wikipedia yoksa onlara düşülür
+        return {"level": "a1", "topic": f"Sin conexión {i}"}
+
+    def reset():
+        wiki_stub.faults = Faults()
+        translation_stub.faults = Faults()
+        fastapi_app.translation_cache.clear()
+
+    print(f"okuma zaman aşımı {READ_TIMEOUT}s, devre {outbound.FAILURE_THRESHOLD} hatada açılır, {RESET_TIMEOUT}s sonra dener\n")
+    print(f"{'senaryo':<34}{'durum kodları':<20}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}  {'wikipedia':<10}{'çeviri':<10}")
+
+    reset()
+    run_scenario(client, headers, "sağlıklı", 10, new_topic("Sano"))
+    run_scenario(client, headers, "sağlıklı (önbelleği ısıt)", 1, cached_topic)
+
+    wiki_stub.faults = Faults(hang=5.0)
+    run_scenario(client, headers, "wikipedia takılıyor", 10, new_topic("Colgado"))
+    run_scenario(client, headers, "  önbellekteki konu", 5, cached_topic)
+    run_scenario(client, headers, "  hazır metni olan seviye", 5, offline_level)
+
+    wiki_stub.faults = Faults(error_rate=1.0)
+    time.sleep(RESET_TIMEOUT)
+    run_scenario(client, headers, "wikipedia 503 (yarı açık deneme)", 5, new_topic("Error"))
+
+    wiki_stub.faults = Faults(drop=True)
+    time.sleep(RESET_TIMEOUT)
+    run_scenario(client, headers, "wikipedia bağlantıyı kesiyor", 5, new_topic("Cortado"))
+
+    reset()
+    time.sleep(RESET_TIMEOUT)
+    translation_stub.faults = Faults(hang=5.0)
+    run_scenario(client, headers, "çeviri takılıyor (sözlüğe düşer)", 5, new_topic("Traducción"))
+
+    reset()
+    time.sleep(RESET_TIMEOUT)
+    run_scenario(client, headers, "servisler düzeldi", 10, new_topic("Recuperado"))
+
+    print("\n" + "\n".join(line for line in client.get("/metrics").text.splitlines()
+                           if line.startswith(("circuit_breaker_state", "outbound_requests_total"))))
+
+
+if __name__ == "__main__":
+    main()
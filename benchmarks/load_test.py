@@ -0,0 +1,251 @@
+"""Uçtan uca yük testi.
+
+Uygulamayı geçici bir SQLite veritabanıyla aynı süreçte (uvicorn, localhost)
+başlatır, veritabanını ayarlanabilir sayıda kullanıcı ve aktiviteyle
+doldurur, Wikipedia ve çeviri API'sini gecikmesi ayarlanabilir yerel
+sahte sunucularla (benchmarks.stub_upstreams) değiştirir ve belirlenen eşzamanlılıkta karışık istekler
+gönderir. Sonuçlar (throughput, p50/p95/p99, hata oranı) CI'ın
+karşılaştırabileceği sıralı anahtarlı JSON olarak yazılır.
+
+Çalıştırma:
+    python -m benchmarks.load_test --users 200 --activities 50 \\
+        --concurrency 16 --requests 2000 --out load_test.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import requests
+
+from benchmarks.stub_upstreams import Faults, start_stub
+
+PASSWORD = "bench-password"
+LEVELS = ["a1", "a2", "b1", "b2", "c1", "c2"]
+
+# Uç nokta adı -> ağırlık (varsayılan karışım)
+DEFAULT_MIX = {
+    "token": 5,
+    "activities_list": 30,
+    "activities_create": 10,
+    "summary": 30,
+    "reading": 25,
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_database(users, activities_per_user, seed):
+    """Kullanıcıları, profilleri ve son bir yıla yayılmış aktiviteleri ekler"""
+    from backend.auth import get_password_hash
+    from backend.database import engine, User, UserProfile, UserActivity
+    from backend.recommendations import ACTIVITY_TYPES
+
+    rng = random.Random(seed)
+    today = date.today()
+    hashed = get_password_hash(PASSWORD)  # bcrypt pahalı; tüm kullanıcılar aynı şifreyi kullanır
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": i, "email": f"bench{i}@example.com", "username": f"bench{i}",
+             "hashed_password": hashed, "is_active": True}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(UserProfile.__table__.insert(), [
+            {"user_id": i, "learning_purpose": rng.choice(ACTIVITY_TYPES),
+             "daily_minutes": rng.choice([15, 30, 45, 60]), "created_at": today.strftime("%Y-%m-%d")}
+            for i in range(1, users + 1)
+        ])
+        rows = [
+            {"user_id": i, "activity_type": rng.choice(ACTIVITY_TYPES), "duration": rng.randint(5, 90),
+             "notes": None, "completed_at": (today - timedelta(days=rng.randint(0, 364))).strftime("%Y-%m-%d")}
+            for i in range(1, users + 1)
+            for _ in range(activities_per_user)
+        ]
+        for start in range(0, len(rows), 10000):
+            conn.execute(UserActivity.__table__.insert(), rows[start:start + 10000])
+
+
+def start_server(app, port):
+    import uvicorn
+
+    class Server(uvicorn.Server):
+        def install_signal_handlers(self):
+            pass
+
+    server = Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Sunucu başlatılamadı")
+        time.sleep(0.05)
+    return server, thread
+
+
+class Client:
+    """Tek bir sanal kullanıcı: kendi oturumu ve token'ı ile istek gönderir"""
+
+    def __init__(self, base_url, username, rng):
+        self.base_url = base_url
+        self.username = username
+        self.rng = rng
+        self.session = requests.Session()
+        self.headers = {"Authorization": f"Bearer {self.login().json()['access_token']}"}
+
+    def login(self):
+        return self.session.post(f"{self.base_url}/api/token", data={"username": self.username, "password": PASSWORD})
+
+    def call(self, endpoint):
+        url = self.base_url
+        if endpoint == "token":
+            return self.login()
+        if endpoint == "activities_list":
+            return self.session.get(f"{url}/api/activities", headers=self.headers)
+        if endpoint == "activities_create":
+            return self.session.post(f"{url}/api/activities", headers=self.headers, json={
+                "activity_type": "okuma", "duration": self.rng.randint(5, 60), "notes": "load test"})
+        if endpoint == "summary":
+            period = self.rng.choice(["week", "month", "year"])
+            return self.session.get(f"{url}/api/activities/summary", headers=self.headers, params={"period": period})
+        if endpoint == "reading":
+            return self.session.get(f"{url}/api/reading/text", headers=self.headers, params={"level": self.rng.choice(LEVELS)})
+        raise ValueError(f"Bilinmeyen uç nokta: {endpoint}")
+
+
+def run_worker(base_url, worker_id, args, mix, samples):
+    rng = random.Random(args.seed * 1000 + worker_id)
+    client = Client(base_url, f"bench{rng.randint(1, args.users)}", rng)
+    endpoints = list(mix)
+    weights = [mix[name] for name in endpoints]
+    count = args.requests // args.concurrency + (1 if worker_id < args.requests % args.concurrency else 0)
+
+    for _ in range(count):
+        endpoint = rng.choices(endpoints, weights)[0]
+        start = time.perf_counter()
+        try:
+            ok = client.call(endpoint).status_code < 400
+        except requests.RequestException:
+            ok = False
+        samples.append((endpoint, time.perf_counter() - start, ok))
+
+
+def summarize_samples(samples, elapsed):
+    def stats(latencies, errors):
+        latencies_ms = np.array(latencies) * 1000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "error_rate": round(errors / len(latencies), 4),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "mean_ms": round(float(latencies_ms.mean()), 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+        }
+
+    by_endpoint = {}
+    for endpoint, seconds, ok in samples:
+        latencies, errors = by_endpoint.get(endpoint, ([], 0))
+        latencies.append(seconds)
+        by_endpoint[endpoint] = (latencies, errors + (0 if ok else 1))
+
+    return {
+        "overall": stats([s for _, s, _ in samples], sum(1 for *_, ok in samples if not ok)),
+        "endpoints": {name: stats(latencies, errors) for name, (latencies, errors) in sorted(by_endpoint.items())},
+    }
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Bilinmeyen uç nokta: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FastAPI uygulaması için yük testi")
+    parser.add_argument("--users", type=int, default=200, help="Oluşturulacak kullanıcı sayısı")
+    parser.add_argument("--activities", type=int, default=50, help="Kullanıcı başına aktivite sayısı")
+    parser.add_argument("--concurrency", type=int, default=16, help="Eşzamanlı sanal kullanıcı sayısı")
+    parser.add_argument("--requests", type=int, default=2000, help="Toplam istek sayısı")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="İstek karışımı, ör. token=5,activities_list=30,summary=30,reading=25")
+    parser.add_argument("--wiki-latency", type=float, default=0.2, help="Sahte Wikipedia gecikmesi (sn)")
+    parser.add_argument("--translate-latency", type=float, default=0.02, help="Sahte çeviri API gecikmesi (sn)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Sonuç JSON dosyası (verilmezse stdout)")
+    args = parser.parse_args(argv)
+
+    # Uygulama içe aktarılmadan önce geçici veritabanı, sahte servisler ve sessiz günlük ayarlanmalı
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    wiki_stub = start_stub(Faults(latency=args.wiki_latency), seed=args.seed)
+    translation_stub = start_stub(Faults(latency=args.translate_latency), seed=args.seed)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["WIKIPEDIA_API_URL"] = f"{wiki_stub.url}/w/api.php"
+    os.environ["TRANSLATION_API_URL"] = translation_stub.url
+    os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+    from backend import fastapi_app
+
+    random.seed(args.seed)
+
+    seed_database(args.users, args.activities, args.seed)
+    port = free_port()
+    server, thread = start_server(fastapi_app.app, port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    samples = []  # list.append iş parçacıkları arasında güvenli
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(run_worker, base_url, i, args, args.mix, samples) for i in range(args.concurrency)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    result = {
+        "config": {
+            "users": args.users,
+            "activities_per_user": args.activities,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "mix": args.mix,
+            "wiki_latency": args.wiki_latency,
+            "translate_latency": args.translate_latency,
+            "seed": args.seed,
+        },
+        "duration_s": round(elapsed, 3),
+        **summarize_samples(samples, elapsed),
+    }
+    output = json.dumps(result, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+"""Yerel sahte dış servisler (Wikipedia API ve çeviri API'si).
+
+Benchmark'lar ve hata enjeksiyonu senaryoları için localhost'ta çalışan
+tek bir HTTP sunucusu. `faults` alanları çalışırken değiştirilebilir:
+
+- latency: her yanıttan önceki bekleme (sn)
+- error_rate: 503 döndürülen isteklerin oranı
+- hang: yanıt vermeden bekleme süresi (okuma zaman aşımını tetikler)
+- drop: bağlantıyı yanıt vermeden kapatma
+
+Uygulamayı bu sunucuya yönlendirmek için (backend içe aktarılmadan önce):
+    WIKIPEDIA_API_URL=<url>/w/api.php  TRANSLATION_API_URL=<url>
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.bench_text_analysis import make_text
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0
+    error_rate: float = 0.0
+    hang: float = 0.0
+    drop: bool = False
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, payload):
+        server = self.server
+        server.requests += 1
+        faults = server.faults
+        if faults.drop:
+            self.close_connection = True
+            self.connection.close()
+            return
+        if faults.hang:
+            time.sleep(faults.hang)
+        if faults.latency:
+            time.sleep(faults.latency)
+        if faults.error_rate and server.rng.random() < faults.error_rate:
+            status, body = 503, b'{"error": "unavailable"}'
+        else:
+            status, body = 200, json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci zaman aşımıyla bağlantıyı bırakmış
+            self.close_connection = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        title = parse_qs(url.query).get("titles", ["Página"])[0]
+        self._respond({"query": {"pages": [{
+            "title": title,
+            "extract": self.server.text,
+            "fullurl": f"https://es.wikipedia.org/wiki/{title.replace(' ', '_')}",
+        }]}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self._respond({"result": "çeviri"})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.faults = faults or Faults()
+        self.rng = random.Random(seed)
+        self.text = make_text(8000)
+        self.requests = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def start_stub(faults=None, seed=0):
+    """Sahte sunucuyu arka planda başlatır"""
+    server = StubServer(faults, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -19,6 +19,36 @@ if "logged_in" not in st.session_state:
     st.session_state.access_token = None
     st.session_state.has_profile = False
 
+# Koşullu GET önbelleği: (url, parametreler, token) -> (ETag, yanıt gövdesi)
+if "etag_cache" not in st.session_state:
+    st.session_state.etag_cache = {}
+
+class CachedResponse:
+    """304 yanıtında önbellekteki gövdeyi taşıyan basit yanıt nesnesi"""
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+def api_get(path, params=None, headers=None):
+    """GET isteği gönderir; daha önce alınan ETag'i If-None-Match olarak ekler"""
+    headers = dict(headers or {})
+    key = (path, tuple(sorted((params or {}).items())), headers.get("Authorization"))
+    cached = st.session_state.etag_cache.get(key)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    
+    response = requests.get(f"{API_URL}{path}", params=params, headers=headers)
+    
+    if response.status_code == 304 and cached:
+        return CachedResponse(cached[1])
+    if response.status_code == 200 and response.headers.get("ETag"):
+        st.session_state.etag_cache[key] = (response.headers["ETag"], response.content)
+    return response
+
 # Title and description
 st.title("Dil Öğrenme Uygulaması")
 
@@ -213,8 +243,8 @@ def main_app():
     # Kullanıcı profilini kontrol et
     if not st.session_state.has_profile:
         try:
-            response = requests.get(
-                f"{API_URL}/profile",
+            response = api_get(
+                "/profile",
                 headers={"Authorization": f"Bearer {st.session_state.access_token}"}
             )
             
@@ -247,7 +277,7 @@ def main_app():
     # Sidebar with page navigation
     page = st.sidebar.radio(
         "Sayfalar",
-        ["Ana Sayfa", "Profil", "Motivasyon", "İlerleme Takibi", "Okuma Pratiği", "Öğeler Listesi", "Yeni Öğe Ekle"]
+        ["Ana Sayfa", "Profil", "Motivasyon", "İlerleme Takibi", "Okuma Pratiği", "Kelime Tekrarı", "Öğeler Listesi", "Yeni Öğe Ekle"]
     )
     
     # Show username and logout button in sidebar
@@ -622,8 +652,8 @@ def main_app():
             st.subheader("Son Aktiviteler")
             
             try:
-                activities_response = requests.get(
-                    f"{API_URL}/activities",
+                activities_response = api_get(
+                    "/activities",
                     headers={"Authorization": f"Bearer {st.session_state.access_token}"}
                 )
                 
@@ -642,7 +672,28 @@ def main_app():
                     st.error("Aktiviteler alınamadı.")
             except Exception as e:
                 st.error(f"Aktivite verisi alınamadı: {str(e)}")
-        
+
+            # Tüm çalışma geçmişini dışa aktar
+            export_format = st.selectbox("Geçmişi dışa aktarma biçimi:", options=["csv", "ndjson", "parquet"])
+            if st.button("Geçmişi Hazırla"):
+                try:
+                    export_response = requests.get(
+                        f"{API_URL}/activities/export",
+                        params={"format": export_format},
+                        headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+                    )
+                    if export_response.status_code == 200:
+                        st.download_button(
+                            label="Geçmişi İndir",
+                            data=export_response.content,
+                            file_name=f"aktiviteler.{export_format}",
+                            mime=export_response.headers.get("Content-Type")
+                        )
+                    else:
+                        st.error(f"Dışa aktarım başarısız: {export_response.text}")
+                except Exception as e:
+                    st.error(f"Bağlantı hatası: {str(e)}")
+
         with tab2:
             st.subheader("İlerleme Analizi")
             
@@ -660,8 +711,8 @@ def main_app():
             }
             
             try:
-                summary_response = requests.get(
-                    f"{API_URL}/activities/summary",
+                summary_response = api_get(
+                    "/activities/summary",
                     params={"period": period_map[period]},
                     headers={"Authorization": f"Bearer {st.session_state.access_token}"}
                 )
@@ -730,8 +781,8 @@ def main_app():
             try:
                 # Özet verisini kullan
                 if 'summary_data' not in locals():
-                    summary_response = requests.get(
-                        f"{API_URL}/activities/summary",
+                    summary_response = api_get(
+                        "/activities/summary",
                         params={"period": "week"},
                         headers={"Authorization": f"Bearer {st.session_state.access_token}"}
                     )
@@ -782,7 +833,7 @@ def main_app():
         # Fetch items from API
         try:
             headers = {"Authorization": f"Bearer {st.session_state.access_token}"} if st.session_state.access_token else {}
-            response = requests.get(f"{API_URL}/items", headers=headers)
+            response = api_get("/items", headers=headers)
             
             if response.status_code == 200:
                 items = response.json()
@@ -828,12 +879,25 @@ def main_app():
     elif page == "Okuma Pratiği":
         reading_practice_page()
 
+    elif page == "Kelime Tekrarı":
+        vocabulary_review_page()
+
 # Okuma pratiği sayfasını güncelle
 def reading_practice_page():
     st.header("AI Destekli Okuma Pratiği")
     
-    # Seviye ve konu seçimi
-    col1, col2 = st.columns(2)
+    # Dil, seviye ve konu seçimi
+    col0, col1, col2 = st.columns(3)
+    
+    language_map = {
+        "İspanyolca": "es",
+        "İngilizce": "en",
+        "Almanca": "de",
+        "Fransızca": "fr"
+    }
+    
+    with col0:
+        language = st.selectbox("Öğrenilen Dil:", options=list(language_map))
     
     with col1:
         level = st.selectbox(
@@ -856,23 +920,108 @@ def reading_practice_page():
     
     # Metin getir butonu
     if st.button("Okuma Metni Getir"):
-        with st.spinner("Metin getiriliyor..."):
-            try:
+        try:
+            # Akışlı uç nokta: metin hemen gelir, kelime anlamları hazır oldukça eklenir
+            with st.spinner("Metin getiriliyor..."):
                 response = requests.get(
-                    f"{API_URL}/reading/text",
-                    params={"level": level_map[level], "topic": topic if topic else None},
-                    headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+                    f"{API_URL}/reading/text/stream",
+                    params={
+                        "level": level_map[level],
+                        "language": language_map[language],
+                        "topic": topic if topic else None
+                    },
+                    headers={"Authorization": f"Bearer {st.session_state.access_token}"},
+                    stream=True
                 )
+            
+            if response.status_code == 200:
+                text_placeholder = st.empty()
+                progress = st.empty()
+                meanings_placeholder = st.empty()
+                reading_data = None
+                word_meanings = {}
                 
-                if response.status_code == 200:
-                    reading_data = response.json()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    
+                    if event["type"] == "text":
+                        reading_data = {key: value for key, value in event.items() if key != "type"}
+                        with text_placeholder.container():
+                            st.subheader(reading_data["title"])
+                            st.markdown("### Metin")
+                            st.markdown(reading_data["text"])
+                            st.markdown("### Özet")
+                            st.markdown(reading_data["summary"])
+                    elif event["type"] == "meaning":
+                        word_meanings[event["word"]] = event["meaning"]
+                        total = len(reading_data["unknown_words"]) or 1
+                        progress.progress(len(word_meanings) / total)
+                        meanings_placeholder.markdown(
+                            "\n".join(f"- **{word}**: {meaning}" for word, meaning in word_meanings.items())
+                        )
+                    elif event["type"] == "done":
+                        reading_data["verbs"] = event["verbs"]
+                        reading_data["nouns"] = event["nouns"]
+                        reading_data["session_id"] = event.get("session_id")
+                    elif event["type"] == "error":
+                        st.warning(event["detail"])
+                
+                if reading_data is not None:
+                    reading_data.setdefault("verbs", [])
+                    reading_data.setdefault("nouns", [])
+                    reading_data["word_meanings"] = word_meanings
                     st.session_state.reading_data = reading_data
                     st.success("Metin başarıyla getirildi!")
                     st.experimental_rerun()
-                else:
-                    st.error(f"Metin getirilemedi: {response.text}")
-            except Exception as e:
-                st.error(f"Bağlantı hatası: {str(e)}")
+            else:
+                st.error(f"Metin getirilemedi: {response.text}")
+        except Exception as e:
+            st.error(f"Bağlantı hatası: {str(e)}")
+    
+    # Okuma geçmişi: daha önce okunan metinler yeniden getirilmeden ve analiz edilmeden açılır
+    with st.expander("Okuma Geçmişi"):
+        auth_headers = {"Authorization": f"Bearer {st.session_state.access_token}"}
+        before = st.session_state.get("history_before")
+        try:
+            response = requests.get(
+                f"{API_URL}/reading/history",
+                params={"before": before, "limit": 10},
+                headers=auth_headers
+            )
+            
+            if response.status_code == 200:
+                page = response.json()
+                if not page["items"]:
+                    st.info("Henüz okuma geçmişiniz yok.")
+                
+                for entry in page["items"]:
+                    entry_col, open_col = st.columns([4, 1])
+                    with entry_col:
+                        st.markdown(f"**{entry['title']}** ({entry['level'].upper()}, {entry['source']}) - {entry['read_at']}")
+                    with open_col:
+                        if st.button("Aç", key=f"history_{entry['id']}"):
+                            entry_response = requests.get(f"{API_URL}/reading/history/{entry['id']}", headers=auth_headers)
+                            if entry_response.status_code == 200:
+                                st.session_state.reading_data = entry_response.json()
+                                st.experimental_rerun()
+                            else:
+                                st.error(f"Metin açılamadı: {entry_response.text}")
+                
+                newer_col, older_col = st.columns(2)
+                with newer_col:
+                    if before is not None and st.button("En Yeniler", key="history_newest"):
+                        st.session_state.history_before = None
+                        st.experimental_rerun()
+                with older_col:
+                    if page["next_before"] is not None and st.button("Daha Eski", key="history_older"):
+                        st.session_state.history_before = page["next_before"]
+                        st.experimental_rerun()
+            else:
+                st.error(f"Okuma geçmişi alınamadı: {response.text}")
+        except Exception as e:
+            st.error(f"Bağlantı hatası: {str(e)}")
     
     # Metin varsa göster
     if "reading_data" in st.session_state:
@@ -880,6 +1029,12 @@ def reading_practice_page():
         
         st.subheader(data["title"])
         st.markdown(f"**Seviye:** {level}")
+        if data.get("readability"):
+            readability = data["readability"]
+            st.caption(
+                f"Tahmini zorluk: {readability['level'].upper()} ({readability['difficulty']:.0f}/100) · "
+                f"{readability['words']} kelime · ortalama cümle {readability['avg_sentence_length']:.0f} kelime"
+            )
         
         # Kelime anlamlarını görmek için işaretlenen kelimeleri takip et
         if "marked_words" not in st.session_state:
@@ -892,6 +1047,21 @@ def reading_practice_page():
         # Kelime anlamlarını göster
         st.markdown("### Öğrenilecek Kelimeler")
         
+        # Benzer kelimeler (İspanyolca kelime vektörleri yüklüyse) metin başına tek toplu istekle bir kez alınır
+        reading_language = data.get("language", "es")
+        if data["unknown_words"] and "related_words" not in data and reading_language == "es":
+            data["related_words"] = {}
+            try:
+                response = requests.post(
+                    f"{API_URL}/words/related",
+                    json={"words": data["unknown_words"], "count": 5},
+                    headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+                )
+                if response.status_code == 200:
+                    data["related_words"] = response.json()["related"]
+            except Exception:
+                pass
+        
         # Kelimeler ve fiiller için sekme oluştur
         if data["unknown_words"]:
             word_tab1, word_tab2 = st.tabs(["Tüm Kelimeler", "Fiiller ve İsimler"])
@@ -906,6 +1076,12 @@ def reading_practice_page():
                             # Otomatik olarak anlamı göster
                             meaning = data['word_meanings'].get(word, 'Anlam bulunamadı')
                             st.success(f"**{word}**: {meaning}")
+                            lemma = data.get("lemmas", {}).get(word)
+                            if lemma and lemma != word:
+                                st.caption(f"Sözlük biçimi: {lemma}")
+                            related = data.get("related_words", {}).get(word)
+                            if related:
+                                st.caption("Benzer kelimeler: " + ", ".join(related))
             
             with word_tab2:
                 verb_col, noun_col = st.columns(2)
@@ -933,6 +1109,29 @@ def reading_practice_page():
                 for word in st.session_state.marked_words:
                     st.markdown(f"**{word}**: {data['word_meanings'].get(word, 'Anlam bulunamadı')}")
                     
+                # İşaretlenen kelimeleri kelime defterine kaydet
+                if st.button("Kelime Defterine Kaydet"):
+                    try:
+                        save_response = requests.post(
+                            f"{API_URL}/vocabulary",
+                            json={
+                                "words": [
+                                    {"word": word, "meaning": data['word_meanings'].get(word)}
+                                    for word in st.session_state.marked_words
+                                ],
+                                "language": reading_language
+                            },
+                            headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+                        )
+                        
+                        if save_response.status_code == 200:
+                            result = save_response.json()
+                            st.success(f"{result['added']} kelime kaydedildi ({result['skipped']} kelime zaten kayıtlıydı).")
+                        else:
+                            st.error(f"Kelimeler kaydedilemedi: {save_response.text}")
+                    except Exception as e:
+                        st.error(f"Bağlantı hatası: {str(e)}")
+                
                 # Kelime listesini temizle butonu
                 if st.button("Kelime Listesini Temizle"):
                     st.session_state.marked_words = set()
@@ -964,46 +1163,123 @@ def reading_practice_page():
         
         if user_text:
             if st.button("Dili Algıla"):
-                try:
-                    lang_response = requests.post(
-                        f"{API_URL}/reading/detect-language",
-                        json={"text": user_text},
-                        headers={"Authorization": f"Bearer {st.session_state.access_token}"}
-                    )
-                    
-                    if lang_response.status_code == 200:
-                        lang_data = lang_response.json()
-                        
-                        lang_map = {
-                            "es": "İspanyolca",
-                            "en": "İngilizce",
-                            "tr": "Türkçe",
-                            "de": "Almanca",
-                            "fr": "Fransızca",
-                            "it": "İtalyanca",
-                            "pt": "Portekizce",
-                            "ru": "Rusça",
-                            "ja": "Japonca",
-                            "zh-cn": "Çince",
-                            "ko": "Korece",
-                            "ar": "Arapça"
-                        }
-                        
-                        detected_lang = lang_map.get(lang_data["language"], lang_data["language"])
+                # Aynı metin daha önce algılandıysa tekrar sorma
+                if "language_checks" not in st.session_state:
+                    st.session_state.language_checks = {}
+                
+                lang_data = st.session_state.language_checks.get(user_text)
+                
+                if lang_data is None:
+                    try:
+                        lang_response = requests.post(
+                            f"{API_URL}/reading/detect-language",
+                            json={"text": user_text, "with_confidence": True},
+                            headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+                        )
                         
-                        if lang_data["language"] == "es":
-                            st.success(f"Tebrikler! Metniniz {detected_lang} olarak algılandı.")
+                        if lang_response.status_code == 200:
+                            lang_data = lang_response.json()
+                            st.session_state.language_checks[user_text] = lang_data
                         else:
-                            st.warning(f"Metniniz {detected_lang} olarak algılandı. İspanyolca yazmaya çalışın!")
+                            st.error(f"Dil algılanamadı: {lang_response.text}")
+                    except Exception as e:
+                        st.error(f"Bağlantı hatası: {str(e)}")
+                
+                if lang_data is not None:
+                    lang_map = {
+                        "es": "İspanyolca",
+                        "en": "İngilizce",
+                        "tr": "Türkçe",
+                        "de": "Almanca",
+                        "fr": "Fransızca",
+                        "it": "İtalyanca",
+                        "pt": "Portekizce",
+                        "ru": "Rusça",
+                        "ja": "Japonca",
+                        "zh-cn": "Çince",
+                        "ko": "Korece",
+                        "ar": "Arapça"
+                    }
+                    
+                    detected_lang = lang_map.get(lang_data["language"], lang_data["language"])
+                    confidence = lang_data.get("confidence", 0) * 100
+                    
+                    if lang_data["language"] == reading_language:
+                        st.success(f"Tebrikler! Metniniz {detected_lang} olarak algılandı (güven: %{confidence:.0f}).")
                     else:
-                        st.error(f"Dil algılanamadı: {lang_response.text}")
-                except Exception as e:
-                    st.error(f"Bağlantı hatası: {str(e)}")
+                        expected_lang = lang_map.get(reading_language, reading_language)
+                        st.warning(f"Metniniz {detected_lang} olarak algılandı (güven: %{confidence:.0f}). {expected_lang} yazmaya çalışın!")
         
         # Wikipedia bağlantısı
         st.markdown("### Kaynak")
         st.markdown(f"Bu metin [Wikipedia]({data['url']}) kaynağından alınmıştır.")
 
+# Kelime tekrarı sayfası
+def vocabulary_review_page():
+    st.header("Kelime Tekrarı")
+    st.write("Okuma pratiğinde kaydettiğiniz kelimeleri aralıklı tekrar ile çalışın.")
+    
+    try:
+        response = requests.get(
+            f"{API_URL}/vocabulary/due",
+            params={"limit": 20},
+            headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+        )
+        
+        if response.status_code != 200:
+            st.error(f"Tekrar kartları alınamadı: {response.text}")
+            return
+        
+        cards = response.json()
+    except Exception as e:
+        st.error(f"Bağlantı hatası: {str(e)}")
+        return
+    
+    if not cards:
+        st.info("Şu anda tekrar edilecek kelime yok. Okuma pratiğinde yeni kelimeler kaydedebilirsiniz.")
+        return
+    
+    st.caption(f"Sırada {len(cards)} kart var")
+    card = cards[0]
+    
+    st.markdown(f"## {card['word']}")
+    
+    if st.session_state.get("revealed_card") != card["id"]:
+        if st.button("Anlamını Göster"):
+            st.session_state.revealed_card = card["id"]
+            st.experimental_rerun()
+        return
+    
+    st.success(card["meaning"] or "Anlam kaydedilmemiş")
+    st.write("Ne kadar iyi hatırladınız?")
+    
+    quality_labels = {
+        0: "Hatırlamadım",
+        2: "Zor",
+        3: "İdare eder",
+        4: "İyi",
+        5: "Çok kolay"
+    }
+    
+    cols = st.columns(len(quality_labels))
+    for col, (quality, label) in zip(cols, quality_labels.items()):
+        with col:
+            if st.button(label, key=f"review_{card['id']}_{quality}"):
+                try:
+                    review_response = requests.post(
+                        f"{API_URL}/vocabulary/{card['id']}/review",
+                        json={"quality": quality},
+                        headers={"Authorization": f"Bearer {st.session_state.access_token}"}
+                    )
+                    
+                    if review_response.status_code == 200:
+                        st.session_state.revealed_card = None
+                        st.experimental_rerun()
+                    else:
+                        st.error(f"Tekrar kaydedilemedi: {review_response.text}")
+                except Exception as e:
+                    st.error(f"Bağlantı hatası: {str(e)}")
+
 # Main flow based on login status
 if st.session_state.logged_in:
     main_app()